@@ -0,0 +1,216 @@
+"""
+Achievement rules.
+
+Awards are decided by a background worker (``manage.py
+process_achievements``), never on the request path. Writes only leave a
+trail: new ``Progress`` rows are followed by id past a stored cursor, and
+task completions — which have no row of their own to follow — are queued
+as ``AchievementEvent`` rows. ``process_batch`` consumes a batch of both:
+
+* per-user counters (hifz records, muraja records, completed tasks) are
+  incremented from the batch, never recounted from history;
+* a task counts once however often it is reopened and completed again:
+  its event is unique per task and kept, marked processed, once counted;
+* only the rules listening to the kinds of event in the batch are
+  evaluated, only for the users those events belong to, and only if the
+  user doesn't hold the award yet;
+* a rule that needs a streak or coverage reads the existing rollups
+  (``UserActivitySummary``, ``MemorizationCoverage``), and only when such a
+  rule is actually a candidate;
+* awards are keyed by ``(user, code)``, so replaying a batch — a worker
+  crashing after inserting but before committing, or two workers — can't
+  award twice.
+
+The cursor row is locked for the whole batch, so concurrent workers take
+turns rather than counting the same events twice.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import dashboard, quran
+from .coverage import count_between, to_int
+from .models import (
+    Achievement, AchievementCounter, AchievementCursor, AchievementEvent, MemorizationCoverage,
+    Progress, UserActivitySummary
+)
+from .sync import SETTLE_WINDOW
+
+BATCH_SIZE = 1000
+
+PROGRESS_STREAM = 'progress'
+
+
+class Rule:
+    def __init__(self, code, title, description, icon, events, test, needs=()):
+        self.code = code
+        self.title = title
+        self.description = description
+        self.icon = icon
+        self.events = events
+        self.test = test
+        # Rollups beyond the counters the test reads: 'streak' and/or 'coverage'
+        self.needs = frozenset(needs)
+
+
+def _juz_complete(juz):
+    first, last = quran.juz_bounds(juz)
+    return lambda state: count_between(state['coverage'], first, last) == last - first + 1
+
+
+RULES = [
+    Rule('first-hifz', 'أول آية', 'حفظت أول آية', 'star',
+         ['hifz'], lambda state: state['counters']['hifz'] >= 1),
+    Rule('hifz-100', 'مئة آية', 'سجلت حفظ مئة آية', 'book',
+         ['hifz'], lambda state: state['counters']['hifz'] >= 100),
+    Rule('muraja-500', 'مراجع مثابر', 'سجلت خمسمئة مراجعة', 'repeat',
+         ['muraja'], lambda state: state['counters']['muraja'] >= 500),
+    Rule('streak-7', 'أسبوع متواصل', 'سبعة أيام متتالية من الحفظ أو المراجعة', 'fire',
+         ['hifz', 'muraja'], lambda state: state['streak'] >= 7, needs=['streak']),
+    Rule('streak-30', 'شهر متواصل', 'ثلاثون يوماً متتالية من الحفظ أو المراجعة', 'calendar',
+         ['hifz', 'muraja'], lambda state: state['streak'] >= 30, needs=['streak']),
+    Rule('juz-amma', 'جزء عم', 'أتممت حفظ جزء عم', 'medal',
+         ['hifz'], _juz_complete(30), needs=['coverage']),
+    Rule('khatma', 'ختمة', 'أتممت حفظ القرآن كاملاً', 'crown',
+         ['hifz'], lambda state: state['coverage'].bit_count() == quran.AYAH_COUNT, needs=['coverage']),
+    Rule('tasks-10', 'عشر مهام', 'أنجزت عشر مهام', 'check',
+         ['task_completed'], lambda state: state['counters']['task_completed'] >= 10),
+]
+
+# Event kind -> rules it can change the outcome of
+RULES_BY_EVENT = defaultdict(list)
+for _rule in RULES:
+    for _event in _rule.events:
+        RULES_BY_EVENT[_event].append(_rule)
+
+
+def record_task_completed(user_id, task_id):
+    # A task already counted, or queued, keeps its one event
+    AchievementEvent.objects.bulk_create(
+        [AchievementEvent(user_id=user_id, kind='task_completed', task_id=task_id)], ignore_conflicts=True
+    )
+
+
+# ============ Worker ============
+
+def _read_progress(position, batch_size, horizon):
+    """Progress past ``position``, stopping at rows younger than the settle window."""
+    rows = (
+        Progress.objects.filter(id__gt=position).order_by('id')
+        .values_list('id', 'user_id', 'type', 'updated_at')[:batch_size]
+    )
+    settled = []
+    for row in rows:
+        # A lower id may still be uncommitted in another transaction; give it time
+        if row[3] >= horizon:
+            break
+        settled.append(row[:3])
+    return settled
+
+
+def _add_counters(deltas):
+    """Apply ``{user_id: Counter(name=delta)}`` and return the new values."""
+    names = {name for counts in deltas.values() for name in counts}
+    existing = AchievementCounter.objects.filter(user_id__in=deltas, name__in=names)
+    counters = {(counter.user_id, counter.name): counter for counter in existing}
+
+    changed, created = [], []
+    for user_id, counts in deltas.items():
+        for name, delta in counts.items():
+            counter = counters.get((user_id, name))
+            if counter is None:
+                counter = counters[user_id, name] = AchievementCounter(user_id=user_id, name=name, value=0)
+                created.append(counter)
+            else:
+                changed.append(counter)
+            counter.value += delta
+    AchievementCounter.objects.bulk_update(changed, ['value'])
+    AchievementCounter.objects.bulk_create(created)
+
+    values = defaultdict(Counter)
+    for (user_id, name), counter in counters.items():
+        values[user_id][name] = counter.value
+    return values
+
+
+def _award(triggered, counters):
+    """Evaluate the rules ``triggered`` by each user's events; return the new awards."""
+    candidates = {
+        user_id: {rule.code: rule for kind in kinds for rule in RULES_BY_EVENT[kind]}
+        for user_id, kinds in triggered.items()
+    }
+    codes = {code for rules in candidates.values() for code in rules}
+    held = Achievement.objects.filter(user_id__in=candidates, code__in=codes).values_list('user_id', 'code')
+    for user_id, code in held:
+        candidates[user_id].pop(code, None)
+
+    def needing(need):
+        return [
+            user_id for user_id, rules in candidates.items()
+            if any(need in rule.needs for rule in rules.values())
+        ]
+
+    streaks, coverage = {}, {}
+    if ids := needing('streak'):
+        streaks = dict(
+            UserActivitySummary.objects.filter(user_id__in=ids).values_list('user_id', 'longest_streak')
+        )
+    if ids := needing('coverage'):
+        coverage = dict(
+            MemorizationCoverage.objects.filter(user_id__in=ids).values_list('user_id', 'bitmap')
+        )
+
+    awards = []
+    for user_id, rules in candidates.items():
+        state = {
+            'counters': counters[user_id],
+            'streak': streaks.get(user_id, 0),
+            'coverage': to_int(coverage.get(user_id)),
+        }
+        awards.extend(
+            Achievement(user_id=user_id, code=rule.code, title=rule.title,
+                        description=rule.description, icon=rule.icon)
+            for rule in rules.values() if rule.test(state)
+        )
+    return awards
+
+
+def process_batch(batch_size=BATCH_SIZE, now=None):
+    """
+    Consume up to ``batch_size`` progress rows and queued events.
+
+    Returns ``(events, awarded)``: how many events were consumed and how
+    many achievements were awarded.
+    """
+    horizon = (now or timezone.now()) - SETTLE_WINDOW
+    with transaction.atomic():
+        cursor, _ = AchievementCursor.objects.select_for_update().get_or_create(name=PROGRESS_STREAM)
+        progress = _read_progress(cursor.position, batch_size, horizon)
+        events = list(
+            AchievementEvent.objects.filter(processed_at__isnull=True).order_by('id')
+            .values_list('id', 'user_id', 'kind')[:batch_size]
+        )
+        if not progress and not events:
+            return 0, 0
+
+        deltas = defaultdict(Counter)
+        for _, user_id, kind in progress + events:
+            deltas[user_id][kind] += 1
+        counters = _add_counters(deltas)
+
+        awards = _award({user_id: set(counts) for user_id, counts in deltas.items()}, counters)
+        Achievement.objects.bulk_create(awards, ignore_conflicts=True)
+
+        if progress:
+            cursor.position = progress[-1][0]
+            cursor.save(update_fields=['position', 'updated_at'])
+        if events:
+            AchievementEvent.objects.filter(id__in=[event[0] for event in events]).update(
+                processed_at=timezone.now()
+            )
+
+        # bulk_create sends no post_save; recent achievements are on the dashboard
+        for user_id in {award.user_id for award in awards}:
+            dashboard.invalidate_snapshot(user_id)
+    return len(progress) + len(events), len(awards)
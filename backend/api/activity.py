@@ -0,0 +1,206 @@
+"""
+Daily activity rollup.
+
+Keeps ``UserDailyActivity`` and ``UserActivitySummary`` in step with
+``Progress`` so streaks and today's activity never have to scan a user's
+full history.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Progress, UserDailyActivity, UserActivitySummary
+
+
+def activity_date(value):
+    """Calendar day a ``completed_at`` timestamp counts towards."""
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date()
+
+
+def _group_by_day(entries):
+    """Sum ``(completed_at, type)`` pairs into ``{date: [hifz, muraja, total]}``."""
+    days = defaultdict(lambda: [0, 0, 0])
+    for completed_at, progress_type in entries:
+        counts = days[activity_date(completed_at)]
+        if progress_type == 'hifz':
+            counts[0] += 1
+        elif progress_type == 'muraja':
+            counts[1] += 1
+        counts[2] += 1
+    return days
+
+
+def record_activity(user_id, entries):
+    """
+    Add newly written Progress rows to the user's rollup.
+
+    ``entries`` is an iterable of ``(completed_at, type)`` pairs, so this
+    serves both single saves and bulk inserts.
+    """
+    days = _group_by_day(entries)
+    if not days:
+        return
+
+    needs_rebuild = False
+    with transaction.atomic():
+        summary, _ = UserActivitySummary.objects.select_for_update().get_or_create(user_id=user_id)
+        changed = False
+
+        for day in sorted(days):
+            hifz, muraja, total = days[day]
+            updated = UserDailyActivity.objects.filter(user_id=user_id, date=day).update(
+                hifz_count=F('hifz_count') + hifz,
+                muraja_count=F('muraja_count') + muraja,
+                total_count=F('total_count') + total,
+            )
+            if updated:
+                continue
+
+            last = summary.last_active_date
+            if last and day < last:
+                # A new day in the past changes every streak after it
+                needs_rebuild = True
+                streak = 0
+            elif last and day == last + timedelta(days=1):
+                streak = summary.current_streak + 1
+            else:
+                streak = 1
+
+            UserDailyActivity.objects.create(
+                user_id=user_id, date=day,
+                hifz_count=hifz, muraja_count=muraja, total_count=total,
+                streak=streak,
+            )
+            if not needs_rebuild:
+                summary.last_active_date = day
+                summary.current_streak = streak
+                summary.longest_streak = max(summary.longest_streak, streak)
+                changed = True
+
+        if changed:
+            summary.save()
+
+    if needs_rebuild:
+        rebuild_user_activity(user_id)
+
+
+def remove_activity(user_id, entries):
+    """Take deleted Progress rows back out of the user's rollup."""
+    days = _group_by_day(entries)
+    if not days:
+        return
+
+    with transaction.atomic():
+        for day, (hifz, muraja, total) in days.items():
+            UserDailyActivity.objects.filter(user_id=user_id, date=day).update(
+                hifz_count=F('hifz_count') - hifz,
+                muraja_count=F('muraja_count') - muraja,
+                total_count=F('total_count') - total,
+            )
+        emptied, _ = UserDailyActivity.objects.filter(user_id=user_id, total_count__lte=0).delete()
+
+    if emptied:
+        rebuild_user_activity(user_id)
+
+
+def _daily_rows(progress_queryset):
+    """Yield ``(user_id, date, hifz, muraja, total)`` ordered by user and date."""
+    grouped = (
+        progress_queryset
+        .annotate(day=TruncDate('completed_at'))
+        .values('user_id', 'day', 'type')
+        .annotate(n=Count('id'))
+        .order_by('user_id', 'day')
+    )
+    current = None
+    for row in grouped.iterator(chunk_size=2000):
+        key = (row['user_id'], row['day'])
+        if current is None or tuple(current[:2]) != key:
+            if current is not None:
+                yield tuple(current)
+            current = [row['user_id'], row['day'], 0, 0, 0]
+        if row['type'] == 'hifz':
+            current[2] += row['n']
+        elif row['type'] == 'muraja':
+            current[3] += row['n']
+        current[4] += row['n']
+    if current is not None:
+        yield tuple(current)
+
+
+def rebuild_activity(progress_queryset, batch_size=1000):
+    """
+    Recompute rollups from scratch for every user in ``progress_queryset``.
+
+    Returns the number of users rebuilt.
+    """
+    users = 0
+    current_user = None
+    day_rows = []
+    summary = None
+
+    def flush():
+        UserDailyActivity.objects.filter(user_id=current_user).delete()
+        UserDailyActivity.objects.bulk_create(day_rows, batch_size=batch_size)
+        UserActivitySummary.objects.update_or_create(user_id=current_user, defaults=summary)
+
+    with transaction.atomic():
+        for user_id, day, hifz, muraja, total in _daily_rows(progress_queryset):
+            if user_id != current_user:
+                if current_user is not None:
+                    flush()
+                current_user = user_id
+                users += 1
+                day_rows = []
+                summary = {'last_active_date': None, 'current_streak': 0, 'longest_streak': 0}
+
+            last = summary['last_active_date']
+            streak = summary['current_streak'] + 1 if last and day == last + timedelta(days=1) else 1
+            day_rows.append(UserDailyActivity(
+                user_id=user_id, date=day,
+                hifz_count=hifz, muraja_count=muraja, total_count=total,
+                streak=streak,
+            ))
+            summary['last_active_date'] = day
+            summary['current_streak'] = streak
+            summary['longest_streak'] = max(summary['longest_streak'], streak)
+
+        if current_user is not None:
+            flush()
+
+    return users
+
+
+def rebuild_user_activity(user_id):
+    """Recompute one user's rollup, clearing it if they have no progress left."""
+    with transaction.atomic():
+        if not rebuild_activity(Progress.objects.filter(user_id=user_id)):
+            UserDailyActivity.objects.filter(user_id=user_id).delete()
+            UserActivitySummary.objects.filter(user_id=user_id).delete()
+
+
+# ============ Reads ============
+
+def get_streaks(user):
+    """Return ``(current_streak, longest_streak)`` from the summary row."""
+    summary = UserActivitySummary.objects.filter(user=user).first()
+    if summary is None:
+        return 0, 0
+
+    # The current streak only counts while today is still active
+    current = summary.current_streak if summary.last_active_date == timezone.localdate() else 0
+    return current, summary.longest_streak
+
+
+def get_today_activity(user):
+    today = UserDailyActivity.objects.filter(
+        user=user,
+        date=timezone.localdate()
+    ).values_list('total_count', flat=True).first()
+    return today or 0
@@ -0,0 +1,69 @@
+"""
+Async versions of the aggregate read endpoints, routed in place of the
+DRF views when the project runs under ASGI (``quranreview/asgi.py`` sets
+``ASYNC_VIEWS``).
+
+DRF views are synchronous, so these are plain Django async views that
+authenticate with the same JWT class and render the same JSON. While a
+query or a slow client is pending, the event loop keeps serving other
+requests instead of holding a worker. Nothing blocking runs on the loop
+itself: authentication runs in a pool thread, and cache reads go through
+the cache's async API (``aget_version``), which a file or Redis cache
+serves off the loop.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import exceptions
+from rest_framework.utils.encoders import JSONEncoder
+
+from authentication.jwt import CachedJWTAuthentication
+from .conditional import astats_etag
+from .dashboard import aget_snapshot, dashboard_payload, stats_payload
+
+_authenticator = CachedJWTAuthentication()
+
+
+def _json(data, status=200):
+    # Same bytes as DRF's JSONRenderer
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False, json_dumps_params={
+        'ensure_ascii': False, 'separators': (',', ':')
+    })
+
+
+def _auth_error(request, exc):
+    response = _json({'detail': exc.detail}, status=exc.status_code)
+    response['WWW-Authenticate'] = _authenticator.authenticate_header(request)
+    return response
+
+
+def async_api_view(view):
+    """GET-only async view requiring a valid JWT, like ``IsAuthenticated``."""
+    async def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        try:
+            result = await sync_to_async(_authenticator.authenticate)(request)
+        except exceptions.AuthenticationFailed as exc:
+            return _auth_error(request, exc)
+        if result is None:
+            return _auth_error(request, exceptions.NotAuthenticated())
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+    return wrapped
+
+
+@async_api_view
+async def progress_stats(request):
+    etag = await astats_etag(request)
+    response = get_conditional_response(request, etag=f'"{etag}"')
+    if response is None:
+        response = _json(stats_payload(await aget_snapshot(request.user)))
+        response['ETag'] = f'"{etag}"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@async_api_view
+async def dashboard_stats(request):
+    return _json(dashboard_payload(await aget_snapshot(request.user)))
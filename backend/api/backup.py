@@ -0,0 +1,305 @@
+"""
+Full-account export and import as NDJSON.
+
+An export is a header line followed by one line per row of every
+collection below. Rows are read with ``.iterator()`` and written out a
+chunk at a time, so a streamed export holds at most one chunk in memory
+however long the history is.
+
+Import reads the same format in two passes. The first reads the upload
+line by line and validates every record, spooling the cleaned rows to a
+temporary file, without touching the database: however slowly the client
+sends the body, no transaction is open. The second bulk-inserts the
+user's own collections (tasks, progress, review schedules) from the spool
+in chunks, each in its own short transaction, and queues a background job
+(see api.jobs) to rebuild the rollups that bulk inserts bypass, so a large
+import never holds the write lock for long.
+"""
+import json
+import pickle
+import tempfile
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from . import conditional, dashboard, jobs, quran
+from .models import Task, Progress, ReviewSchedule, Achievement, CompetitionScore
+from .serializers import validate_ayah_range
+
+FORMAT = 'quranreview-export'
+VERSION = 1
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_BYTES = 64 * 1024 * 1024
+# Cleaned rows beyond this are spooled to disk rather than kept in memory
+IMPORT_SPOOL_SIZE = 4 * 1024 * 1024
+
+# Exported columns per collection; ids and updated_at are assigned afresh on import
+COLLECTIONS = {
+    'tasks': (Task, [
+        'title', 'description', 'type', 'priority', 'status', 'surah', 'start_ayah', 'end_ayah',
+        'due_date', 'completed_at', 'created_at',
+    ]),
+    'progress': (Progress, [
+        'surah', 'ayah', 'type', 'accuracy', 'duration', 'client_id', 'completed_at',
+    ]),
+    'review_schedules': (ReviewSchedule, [
+        'surah', 'start_ayah', 'end_ayah', 'next_review_date', 'review_count', 'last_reviewed',
+        'created_at',
+    ]),
+    'achievements': (Achievement, ['title', 'description', 'icon', 'code', 'earned_at']),
+    'competition_scores': (CompetitionScore, ['competition_id', 'score', 'ayah_count', 'last_activity']),
+}
+
+
+# Collections an import writes. The rest are exported for the user's own
+# records only: accepting them from a client-supplied file would let anyone
+# forge competition scores and awards.
+IMPORTED = ('tasks', 'progress', 'review_schedules')
+
+
+class InvalidExport(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'Line {line}: {message}')
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _dumps(payload):
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+# ============ Export ============
+
+def export_lines(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the export of ``user`` as encoded NDJSON, ``chunk_size`` rows per piece."""
+    yield _dumps({
+        'format': FORMAT, 'version': VERSION,
+        'username': user.username, 'exported_at': timezone.now(),
+    }).encode()
+
+    for name, (model, fields) in COLLECTIONS.items():
+        rows = model.objects.filter(user=user).order_by('id').values_list(*fields)
+        lines = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            lines.append(_dumps({'collection': name, 'data': dict(zip(fields, row))}))
+            if len(lines) == chunk_size:
+                yield ''.join(lines).encode()
+                lines = []
+        if lines:
+            yield ''.join(lines).encode()
+
+
+# ============ Import ============
+
+def _fields(model, names):
+    """Model fields that clean each exported column; relations clean as their key."""
+    fields = {}
+    for name in names:
+        field = model._meta.get_field(name)
+        fields[name] = field.target_field if field.is_relation else field
+    return fields
+
+
+def _clean(fields, data):
+    if not isinstance(data, dict):
+        raise ValueError('"data" must be an object')
+    if set(data) != set(fields):
+        missing, unknown = set(fields) - set(data), set(data) - set(fields)
+        raise ValueError('; '.join(
+            f'{label} fields {", ".join(sorted(names))}'
+            for label, names in (('missing', missing), ('unknown', unknown)) if names
+        ))
+
+    values = {}
+    for name, value in data.items():
+        field = fields[name]
+        if value is None and not field.null:
+            raise ValueError(f'{name} may not be null')
+        try:
+            # Like Field.clean() without the blank check: stored rows may
+            # legitimately hold blanks the model would refuse from a form
+            value = field.to_python(value)
+            if value is not None:
+                if field.choices and value not in dict(field.flatchoices):
+                    raise DjangoValidationError(f'invalid choice {value!r}')
+                field.run_validators(value)
+        except DjangoValidationError as error:
+            raise ValueError(f'{name}: {" ".join(error.messages)}')
+        values[name] = value
+
+    try:
+        if 'ayah' in values:
+            if not quran.is_valid(values.get('surah', 0), values['ayah']):
+                raise ValueError('invalid ayah')
+        elif values.get('surah') is not None:
+            validate_ayah_range(values['surah'], values.get('start_ayah'), values.get('end_ayah'))
+    except ValidationError as error:
+        raise ValueError(f'invalid ayah range {error.detail}')
+    return values
+
+
+def _parse(line_number, raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        raise InvalidExport(line_number, 'not valid JSON')
+
+
+class _Importer:
+    def __init__(self, user, chunk_size):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.fields = {name: _fields(model, names) for name, (model, names) in COLLECTIONS.items()}
+        self.pending = {name: [] for name in COLLECTIONS}
+        self.imported = dict.fromkeys(COLLECTIONS, 0)
+        self.skipped = dict.fromkeys(COLLECTIONS, 0)
+
+    def clean(self, line_number, record):
+        """Validate one record; returns ``(collection, values)``."""
+        if not isinstance(record, dict) or record.get('collection') not in COLLECTIONS:
+            raise InvalidExport(line_number, 'expected {"collection": ..., "data": {...}}')
+        name = record['collection']
+        try:
+            return name, _clean(self.fields[name], record.get('data'))
+        except ValueError as error:
+            raise InvalidExport(line_number, str(error))
+
+    def add(self, name, values):
+        self.pending[name].append(values)
+        if len(self.pending[name]) >= self.chunk_size:
+            self.flush(name)
+
+    def flush(self, name):
+        rows, self.pending[name] = self.pending[name], []
+        if name not in IMPORTED:
+            self.skipped[name] += len(rows)
+            return
+        with transaction.atomic():
+            if name == 'progress':
+                rows = self._new_progress(rows)
+            self._insert(COLLECTIONS[name][0], rows)
+        self.imported[name] += len(rows)
+
+    def _new_progress(self, rows):
+        """Drop records whose client_id is already stored or repeated in this chunk."""
+        client_ids = {row['client_id'] for row in rows if row['client_id']}
+        seen = set(
+            Progress.objects.filter(user=self.user, client_id__in=client_ids)
+            .values_list('client_id', flat=True)
+        )
+        new_rows = []
+        for row in rows:
+            client_id = row['client_id'] = row['client_id'] or None
+            if client_id is not None:
+                if client_id in seen:
+                    continue
+                seen.add(client_id)
+            new_rows.append(row)
+        self.skipped['progress'] += len(rows) - len(new_rows)
+        return new_rows
+
+    def _insert(self, model, rows):
+        if not rows:
+            return
+        created = model.objects.bulk_create([model(user=self.user, **row) for row in rows])
+        # bulk_create stamps auto_now/auto_now_add fields with now(); put the
+        # exported times back. Toggling the fields' flags instead would race
+        # with other requests served by this process.
+        stamped = [
+            field.name for field in model._meta.concrete_fields
+            if (getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False))
+            and field.name in rows[0]
+        ]
+        if stamped:
+            for instance, row in zip(created, rows):
+                for name in stamped:
+                    setattr(instance, name, row[name])
+            model.objects.bulk_update(created, stamped, batch_size=self.chunk_size)
+
+    def finish(self):
+        for name in COLLECTIONS:
+            self.flush(name)
+
+    def schedule_rollups(self):
+        """Queue the rollup rebuild for whatever was inserted, even by an import that failed midway."""
+        user_id = self.user.id
+        rollups = {
+            'progress': bool(self.imported['progress']),
+            'schedules': bool(self.imported['progress'] or self.imported['review_schedules']),
+            'points': bool(self.imported['progress']),
+        }
+        if any(rollups.values()):
+            jobs.enqueue('rebuild_rollups', {'user_id': user_id, **rollups})
+        if self.imported['tasks']:
+            conditional.invalidate_tasks(user_id)
+        dashboard.invalidate_snapshot(user_id)
+
+
+def _spool(lines, importer):
+    """
+    Validate every line of an export, spooling the cleaned rows.
+
+    Returns a temporary file of pickled ``(collection, values)`` pairs
+    positioned at its start; raises ``InvalidExport`` on the first bad line.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+    try:
+        header = None
+        size = 0
+        for line_number, raw in enumerate(lines, start=1):
+            size += len(raw)
+            if size > IMPORT_MAX_BYTES:
+                raise InvalidExport(line_number, f'export is larger than {IMPORT_MAX_BYTES // 2**20} MB')
+            if not raw.strip():
+                continue
+            record = _parse(line_number, raw)
+            if header is None:
+                header = record
+                if not isinstance(header, dict) or header.get('format') != FORMAT:
+                    raise InvalidExport(line_number, 'not a QuranReview export')
+                if header.get('version') != VERSION:
+                    raise InvalidExport(line_number, f'unsupported export version {header.get("version")}')
+                continue
+            pickle.dump(importer.clean(line_number, record), spool, pickle.HIGHEST_PROTOCOL)
+        if header is None:
+            raise InvalidExport(1, 'empty export')
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def import_lines(user, lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Load an export from an iterable of NDJSON lines into ``user``'s account.
+
+    The whole export is validated before anything is written: an invalid
+    line raises ``InvalidExport`` and imports nothing. Rows are then
+    inserted a chunk per transaction. Progress records whose client_id is
+    already stored are skipped. Achievements and competition scores are
+    validated but never imported: scores are server-authoritative and
+    awards are re-derived from the imported progress by the achievements
+    worker. Returns ``(imported, skipped)`` counts per collection.
+    """
+    importer = _Importer(user, chunk_size)
+    with _spool(lines, importer) as spool:
+        try:
+            while True:
+                try:
+                    importer.add(*pickle.load(spool))
+                except EOFError:
+                    break
+            importer.finish()
+        finally:
+            importer.schedule_rollups()
+    return importer.imported, importer.skipped
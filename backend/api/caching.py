@@ -0,0 +1,66 @@
+"""
+Shared cache helpers.
+
+Version counters live in the Django cache; anything derived from a scope
+(cached payloads, in-process structures, ETags) keys itself on the
+current version instead of being deleted one entry at a time.
+
+A bump is only seen by every worker when the cache is shared (Redis,
+Memcached, file-based). The default LocMemCache is per process, so there
+each counter expires after ``CACHE_VERSION_TIMEOUT`` seconds and is
+re-seeded with a fresh value: another worker's bump then reaches this
+one within that window instead of never.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never repeats an old value
+        cache.add(key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(scope):
+    """``get_version`` through the cache's async API, for async views."""
+    key = _version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+        version = await cache.aget(key)
+    return version
+
+
+def get_versions(scopes):
+    """``{scope: version}`` for many scopes in one cache round trip."""
+    keys = {_version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    seed = time.time_ns()
+    if missing:
+        for key in missing:
+            cache.add(key, seed, settings.CACHE_VERSION_TIMEOUT)
+        found.update(cache.get_many(missing))
+    # A key evicted straight away reads as the seed; a later read just misses
+    return {scope: found.get(key, seed) for key, scope in keys.items()}
+
+
+def bump_version(scope):
+    """Advance ``scope``'s version once the current transaction commits."""
+    def bump():
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+    transaction.on_commit(bump)
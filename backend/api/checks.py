@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """The SQLite profile is for several workers, which need one cache between them."""
+    if settings.SQLITE_PROFILE != 'production':
+        return []
+    if not settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return []
+    return [Warning(
+        'SQLITE_PROFILE=production runs several workers, but the default cache is per process.',
+        hint='Point CACHE_BACKEND at a shared backend (e.g. file-based or Redis) so cached '
+             'payloads and users are invalidated in every worker at once.',
+        id='api.W001',
+    )]
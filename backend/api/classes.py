@@ -0,0 +1,102 @@
+"""
+Teacher class overviews.
+
+Every student's memorized count, streak, open tasks and last active day
+come from the per-user rollups, read for the whole class in two grouped
+queries however many students it has. The result is cached per teacher
+under a tag built from the class roster and each student's dashboard
+version, which every write by the student already bumps, so the writes
+themselves do no extra work to keep teachers' overviews fresh.
+
+A teacher's class only holds students who accepted the teacher's
+invitation; until then the teacher sees none of the student's data.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .caching import get_version, get_versions, bump_version
+from .dashboard import dashboard_scope
+from .models import Task, TeacherStudent
+
+User = get_user_model()
+
+OVERVIEW_TIMEOUT = 60 * 60
+OPEN_TASK_STATUSES = ['pending', 'in_progress']
+
+
+def class_scope(teacher_id):
+    return f'class:{teacher_id}'
+
+
+def student_ids(teacher_id):
+    """Ids of the teacher's enrolled students, cached until the roster changes."""
+    key = f'class-roster:{teacher_id}:{get_version(class_scope(teacher_id))}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(
+            TeacherStudent.objects.filter(teacher_id=teacher_id, accepted_at__isnull=False)
+            .order_by('student_id').values_list('student_id', flat=True)
+        )
+        cache.set(key, ids, OVERVIEW_TIMEOUT)
+    return ids
+
+
+def overview_tag(teacher_id, ids, day=None):
+    """Changes whenever any student's numbers (or the roster, or the day) would."""
+    day = day or timezone.localdate()
+    versions = get_versions([dashboard_scope(pk) for pk in ids])
+    state = ','.join(f'{pk}:{versions[dashboard_scope(pk)]}' for pk in ids)
+    return f'{teacher_id}-{day.isoformat()}-{hashlib.md5(state.encode()).hexdigest()}'
+
+
+def build_overview(ids, today):
+    """One row per student, ordered by username."""
+    open_tasks = dict(
+        Task.objects.filter(user_id__in=ids, status__in=OPEN_TASK_STATUSES)
+        .order_by().values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+    )
+    rows = User.objects.filter(pk__in=ids).order_by('username').values(
+        'id', 'username', 'first_name', 'last_name',
+        'coverage__ayah_count',
+        'activity_summary__last_active_date',
+        'activity_summary__current_streak',
+        'activity_summary__longest_streak',
+    )
+
+    overview = []
+    for row in rows:
+        last_active = row['activity_summary__last_active_date']
+        overview.append({
+            'id': row['id'],
+            'username': row['username'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'memorized': row['coverage__ayah_count'] or 0,
+            # Same rule as the student's own dashboard: a streak lapses once a day is missed
+            'streak': row['activity_summary__current_streak'] if last_active == today else 0,
+            'longest_streak': row['activity_summary__longest_streak'] or 0,
+            'pending_tasks': open_tasks.get(row['id'], 0),
+            'last_activity': last_active,
+        })
+    return overview
+
+
+def get_overview(teacher):
+    ids = student_ids(teacher.pk)
+    if not ids:
+        return []
+    today = timezone.localdate()
+    key = f'class-overview:{overview_tag(teacher.pk, ids, today)}'
+    overview = cache.get(key)
+    if overview is None:
+        overview = build_overview(ids, today)
+        cache.set(key, overview, OVERVIEW_TIMEOUT)
+    return overview
+
+
+def invalidate_roster(teacher_id):
+    bump_version(class_scope(teacher_id))
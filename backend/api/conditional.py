@@ -0,0 +1,106 @@
+"""
+Conditional GETs and shared response caching.
+
+Read endpoints the frontend polls get an ETag built from version counters
+(see ``caching``), so answering ``If-None-Match`` with 304 costs a cache
+lookup and no SQL or serialization. Payloads that are the same for every
+user, like the active competitions, are also cached server-side under the
+same version, so a bump on write invalidates both at once. Competitions
+also close on their own at ``end_date``, so the version additionally moves
+once the earliest-ending competition in the cached list has ended.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .caching import get_version, bump_version
+from .dashboard import asnapshot_tag, snapshot_tag
+
+COMPETITIONS_SCOPE = 'competitions'
+
+RESPONSE_TIMEOUT = 5 * 60
+
+
+def tasks_scope(user_id):
+    return f'tasks:{user_id}'
+
+
+def _etag(request, tag):
+    # Filters, ordering and cursors all produce different bodies
+    query = hashlib.md5(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:12]
+    return f'{tag}-{query}'
+
+
+def _next_end_key(version):
+    return f'competitions-next-end:{version}'
+
+
+def competitions_version():
+    version = get_version(COMPETITIONS_SCOPE)
+    next_end = cache.get(_next_end_key(version))
+    if next_end is not None and timezone.now() >= next_end:
+        # A listed competition has closed since the payloads were cached
+        invalidate_competitions()
+        version = get_version(COMPETITIONS_SCOPE)
+    return version
+
+
+def competitions_etag(request, *args, **kwargs):
+    return _etag(request, f'competitions-{competitions_version()}')
+
+
+def tasks_etag(request, *args, **kwargs):
+    return _etag(request, f'tasks-{request.user.pk}-{get_version(tasks_scope(request.user.pk))}')
+
+
+def stats_etag(request, *args, **kwargs):
+    return _etag(request, f'stats-{snapshot_tag(request.user.pk)}')
+
+
+async def astats_etag(request):
+    return _etag(request, f'stats-{await asnapshot_tag(request.user.pk)}')
+
+
+def conditional(etag_func):
+    """
+    Decorate a view handler method with ETag validation.
+
+    DRF authenticates before calling the handler, so ``etag_func`` can rely
+    on ``request.user``. Responses are marked private and must be
+    revalidated, so the browser always asks and mostly receives a 304.
+    """
+    def decorator(handler):
+        def wrapped(self, request, *args, **kwargs):
+            response = condition(etag_func=etag_func)(
+                lambda request, *args, **kwargs: handler(self, request, *args, **kwargs)
+            )(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapped
+    return decorator
+
+
+def competitions_data(name, build):
+    """Shared competitions payload ``name``, rebuilt only after a competition write."""
+    key = f'response:{name}:{competitions_version()}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, RESPONSE_TIMEOUT)
+    return data
+
+
+def expire_competitions_at(end):
+    """Move the competitions version once ``end``, the next listed end date, passes."""
+    cache.set(_next_end_key(get_version(COMPETITIONS_SCOPE)), end, None)
+
+
+def invalidate_competitions():
+    bump_version(COMPETITIONS_SCOPE)
+
+
+def invalidate_tasks(user_id):
+    bump_version(tasks_scope(user_id))
@@ -0,0 +1,157 @@
+"""
+Memorization coverage bitmaps.
+
+Each user's memorized ayahs are a fixed 6236-bit bitmap (780 bytes) in
+global-id order: bit ``n - 1`` is set once ayah ``n`` has a hifz record.
+It is updated incrementally as hifz progress arrives, and every count —
+unique ayahs, per surah, per juz, what is left in a range — is a mask and
+a popcount on a Python int rather than SQL over ``Progress``.
+"""
+import base64
+
+from django.db import transaction
+
+from . import quran
+from .models import MemorizationCoverage, Progress
+
+BITMAP_BYTES = (quran.AYAH_COUNT + 7) // 8
+
+
+def to_int(bitmap):
+    return int.from_bytes(bytes(bitmap or b''), 'little')
+
+
+def to_bytes(bits):
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def bits_for(pairs):
+    """Bitmap int with a bit set for every valid ``(surah, ayah)``."""
+    bits = 0
+    for surah, ayah in pairs:
+        if quran.is_valid(surah, ayah):
+            bits |= 1 << (quran.ayah_id(surah, ayah) - 1)
+    return bits
+
+
+def count_between(bits, first, last):
+    """Memorized ayahs with global ids ``first..last`` inclusive."""
+    width = last - first + 1
+    return ((bits >> (first - 1)) & ((1 << width) - 1)).bit_count()
+
+
+def mark_memorized(user_id, pairs):
+    """Set the bits for newly memorized ``(surah, ayah)`` pairs."""
+    new_bits = bits_for(pairs)
+    if not new_bits:
+        return
+
+    with transaction.atomic():
+        coverage, _ = MemorizationCoverage.objects.select_for_update().get_or_create(
+            user_id=user_id, defaults={'bitmap': to_bytes(0)}
+        )
+        bits = to_int(coverage.bitmap)
+        if bits | new_bits == bits:
+            # Revisiting ayahs already memorized changes nothing
+            return
+        bits |= new_bits
+        coverage.bitmap = to_bytes(bits)
+        coverage.ayah_count = bits.bit_count()
+        coverage.save(update_fields=['bitmap', 'ayah_count', 'updated_at'])
+
+
+def unmark_memorized(user_id, surah, ayah):
+    """Clear an ayah's bit once its last hifz record is gone."""
+    if not quran.is_valid(surah, ayah):
+        return
+    if Progress.objects.filter(user_id=user_id, surah=surah, ayah=ayah, type='hifz').exists():
+        return
+
+    with transaction.atomic():
+        coverage = MemorizationCoverage.objects.select_for_update().filter(user_id=user_id).first()
+        if coverage is None:
+            return
+        bits = to_int(coverage.bitmap) & ~(1 << (quran.ayah_id(surah, ayah) - 1))
+        coverage.bitmap = to_bytes(bits)
+        coverage.ayah_count = bits.bit_count()
+        coverage.save(update_fields=['bitmap', 'ayah_count', 'updated_at'])
+
+
+def rebuild_coverage(progress_queryset):
+    """Recompute bitmaps for every user in ``progress_queryset``; returns users rebuilt."""
+    pairs = (
+        progress_queryset.filter(type='hifz')
+        .order_by('user_id')
+        .values_list('user_id', 'surah', 'ayah')
+        .distinct()
+    )
+    users = 0
+    current_user, bits = None, 0
+
+    def flush():
+        MemorizationCoverage.objects.update_or_create(
+            user_id=current_user,
+            defaults={'bitmap': to_bytes(bits), 'ayah_count': bits.bit_count()}
+        )
+
+    with transaction.atomic():
+        for user_id, surah, ayah in pairs.iterator(chunk_size=5000):
+            if user_id != current_user:
+                if current_user is not None:
+                    flush()
+                current_user, bits = user_id, 0
+                users += 1
+            bits |= bits_for([(surah, ayah)])
+        if current_user is not None:
+            flush()
+    return users
+
+
+def rebuild_user_coverage(user_id):
+    with transaction.atomic():
+        if not rebuild_coverage(Progress.objects.filter(user_id=user_id)):
+            MemorizationCoverage.objects.filter(user_id=user_id).delete()
+
+
+# ============ Reads ============
+
+def get_bits(user):
+    bitmap = MemorizationCoverage.objects.filter(user=user).values_list('bitmap', flat=True).first()
+    return to_int(bitmap)
+
+
+def surah_completion(bits):
+    return [
+        {'surah': surah, 'memorized': count_between(bits, *quran.surah_bounds(surah)),
+         'total': quran.surah_length(surah)}
+        for surah in range(1, quran.SURAH_COUNT + 1)
+    ]
+
+
+def juz_completion(bits):
+    completion = []
+    for juz in range(1, quran.JUZ_COUNT + 1):
+        first, last = quran.juz_bounds(juz)
+        completion.append({
+            'juz': juz, 'memorized': count_between(bits, first, last), 'total': last - first + 1
+        })
+    return completion
+
+
+def remaining_in_range(bits, surah, start_ayah, end_ayah):
+    """Unmemorized ayahs of ``surah:start-end`` as ``[start, end]`` runs."""
+    ids = quran.range_ids(surah, start_ayah, end_ayah)
+    # Unset bits of the range, shifted so bit 0 is ``start_ayah``
+    missing = ~(bits >> (ids.start - 1)) & ((1 << len(ids)) - 1)
+    runs = []
+    while missing:
+        low = (missing & -missing).bit_length() - 1
+        run = (~(missing >> low) & ((missing >> low) + 1)).bit_length() - 1
+        runs.append([start_ayah + low, start_ayah + low + run - 1])
+        missing &= ~(((1 << run) - 1) << low)
+    return runs
+
+
+def encode(bits):
+    """Bitmap as base64 for the client heatmap (bit n-1 = ayah n, little-endian bytes)."""
+    return base64.b64encode(to_bytes(bits)).decode()
@@ -0,0 +1,174 @@
+"""
+Per-user dashboard snapshot.
+
+Everything ``dashboard_stats`` and ``ProgressStatsView`` show is built by one
+aggregate query and cached under the user's dashboard version, which moves
+whenever the user's tasks, progress or achievements change. The same
+version doubles as the ETag for conditional GETs.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import aget_version, get_version, bump_version
+from .models import Task, Achievement, UserDailyActivity
+from .serializers import AchievementSerializer
+
+User = get_user_model()
+
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def dashboard_scope(user_id):
+    return f'dashboard:{user_id}'
+
+
+def snapshot_tag(user_id, day=None):
+    """Changes whenever the user's snapshot would; used as cache key suffix and ETag."""
+    # Includes the day so date-relative numbers roll over at midnight
+    day = day or timezone.localdate()
+    return f'{user_id}-{get_version(dashboard_scope(user_id))}-{day.isoformat()}'
+
+
+async def asnapshot_tag(user_id, day=None):
+    day = day or timezone.localdate()
+    return f'{user_id}-{await aget_version(dashboard_scope(user_id))}-{day.isoformat()}'
+
+
+def _subquery_value(queryset, expression):
+    """Scalar subquery computing ``expression`` over one user's rows."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(value=expression)
+            .values('value'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def _summary_row(user_id, today):
+    activity = UserDailyActivity.objects.all()
+
+    return User.objects.filter(pk=user_id).values(
+        'activity_summary__last_active_date',
+        'activity_summary__current_streak',
+        'activity_summary__longest_streak',
+        'coverage__ayah_count',
+    ).annotate(
+        today_tasks=_subquery_value(Task.objects.filter(due_date=today), Count('pk')),
+        pending_tasks=_subquery_value(
+            Task.objects.filter(status__in=['pending', 'in_progress']), Count('pk')
+        ),
+        total_hifz=_subquery_value(activity, Sum('hifz_count')),
+        total_muraja=_subquery_value(activity, Sum('muraja_count')),
+        today_activity=_subquery_value(activity.filter(date=today), Sum('total_count')),
+    ).get()
+
+
+def _recent_achievements(user_id):
+    recent = Achievement.objects.filter(user_id=user_id).order_by('-earned_at')[:5]
+    return AchievementSerializer(recent, many=True).data
+
+
+def _assemble(row, recent_achievements, today):
+    streak = 0
+    if row['activity_summary__last_active_date'] == today:
+        streak = row['activity_summary__current_streak']
+
+    return {
+        'today_tasks': row['today_tasks'],
+        'pending_tasks': row['pending_tasks'],
+        'total_hifz': row['total_hifz'],
+        'total_muraja': row['total_muraja'],
+        'total_memorized': row['coverage__ayah_count'] or 0,
+        'today_activity': row['today_activity'],
+        'streak': streak,
+        'longest_streak': row['activity_summary__longest_streak'] or 0,
+        'recent_achievements': recent_achievements,
+    }
+
+
+def build_snapshot(user):
+    today = timezone.localdate()
+    return _assemble(_summary_row(user.pk, today), _recent_achievements(user.pk), today)
+
+
+async def abuild_snapshot(user):
+    """``build_snapshot`` with its two independent reads running concurrently."""
+    today = timezone.localdate()
+    row, recent_achievements = await asyncio.gather(
+        _in_thread(_summary_row)(user.pk, today),
+        _in_thread(_recent_achievements)(user.pk),
+    )
+    return _assemble(row, recent_achievements, today)
+
+
+def _in_thread(function):
+    """
+    Run ``function`` on a pool thread with its own database connection, so
+    several queries can be in flight at once (the default thread-sensitive
+    mode funnels every ORM call through a single thread).
+    """
+    def run(*args):
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def get_snapshot(user):
+    key = f'dashboard:{snapshot_tag(user.pk)}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(user)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+async def aget_snapshot(user):
+    key = f'dashboard:{await asnapshot_tag(user.pk)}'
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        snapshot = await abuild_snapshot(user)
+        await cache.aset(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def stats_payload(snapshot):
+    """Body of ``GET /api/progress/stats/``."""
+    return {
+        'total_hifz': snapshot['total_hifz'],
+        'total_muraja': snapshot['total_muraja'],
+        'today_activity': snapshot['today_activity'],
+        'streak': snapshot['streak'],
+        'longest_streak': snapshot['longest_streak'],
+        'total_memorized': snapshot['total_memorized'],
+    }
+
+
+def dashboard_payload(snapshot):
+    """Body of ``GET /api/dashboard/``."""
+    return {
+        'today_tasks': snapshot['today_tasks'],
+        'pending_tasks': snapshot['pending_tasks'],
+        'total_memorized': snapshot['total_memorized'],
+        'streak': snapshot['streak'],
+        'recent_achievements': snapshot['recent_achievements'],
+    }
+
+
+def invalidate_snapshot(user_id):
+    # Bumped on commit so a concurrent reader can't re-cache stale data
+    bump_version(dashboard_scope(user_id))
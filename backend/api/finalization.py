@@ -0,0 +1,70 @@
+"""
+Competition finalization.
+
+Competitions close at ``end_date``: from then on scores are refused (see
+``scoring.open_competitions``). ``finalize_expired`` — run on a schedule
+with ``manage.py finalize_competitions`` or queued as a job — ranks each
+expired competition's scores once and freezes the result as
+``CompetitionResult`` rows, then marks the competition completed.
+
+Each competition is finalized in its own transaction that first re-reads
+it locked and still active, so running the command twice, or two
+workers at once, finalizes it exactly once; the snapshot rows are also
+unique per participant. Reading a finished competition is then a single
+indexed read of precomputed rows.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import conditional
+from .models import Competition, CompetitionResult, CompetitionScore
+from .rankings import Ranking, invalidate_ranking
+
+BATCH_SIZE = 100
+
+
+def expired_competitions(now=None):
+    return Competition.objects.filter(status='active', end_date__lte=now or timezone.now())
+
+
+def finalize_competition(competition_id, now=None):
+    """Freeze one expired competition's ranking; returns False if there was nothing to do."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        competition = (
+            expired_competitions(now).select_for_update()
+            .filter(pk=competition_id).values_list('pk', flat=True).first()
+        )
+        if competition is None:
+            # Already finalized, still running, or cancelled
+            return False
+
+        ranking = Ranking(list(
+            CompetitionScore.objects.filter(competition_id=competition_id)
+            .order_by('-score', 'user_id')
+            .values_list('user_id', 'user__username', 'score', 'ayah_count')
+        ))
+        CompetitionResult.objects.bulk_create([
+            CompetitionResult(
+                competition_id=competition_id, user_id=user_id, username=username,
+                rank=ranking.rank_for_score(score), score=score, ayah_count=ayah_count
+            )
+            for user_id, username, score, ayah_count in ranking.rows
+        ], batch_size=1000, ignore_conflicts=True)
+        Competition.objects.filter(pk=competition_id).update(status='completed', finalized_at=now)
+
+        # update() sends no post_save; the list and detail payloads are cached
+        conditional.invalidate_competitions()
+        invalidate_ranking(competition_id)
+    return True
+
+
+def finalize_expired(batch_size=BATCH_SIZE, now=None):
+    """Finalize every competition past its end date; returns how many were finalized."""
+    now = now or timezone.now()
+    finalized = 0
+    while True:
+        ids = list(expired_competitions(now).order_by('end_date', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return finalized
+        finalized += sum(finalize_competition(pk, now) for pk in ids)
@@ -0,0 +1,74 @@
+"""
+Bulk Progress ingestion for offline sync.
+
+Records carrying a ``client_id`` are written at most once per user, so the
+PWA can replay its backlog after a dropped connection without duplicating
+anything.
+"""
+from django.db import IntegrityError, transaction
+
+from .activity import record_activity
+from .coverage import mark_memorized
+from .dashboard import invalidate_snapshot
+from .leaderboard import record_progress
+from .models import Progress
+from .scheduler import record_reviews
+
+CHUNK_SIZE = 500
+
+
+def _existing_client_ids(user, client_ids, chunk_size):
+    existing = set()
+    client_ids = list(client_ids)
+    for start in range(0, len(client_ids), chunk_size):
+        existing.update(
+            Progress.objects.filter(
+                user=user,
+                client_id__in=client_ids[start:start + chunk_size]
+            ).values_list('client_id', flat=True)
+        )
+    return existing
+
+
+def _new_rows(user, records, existing):
+    """Progress instances for records not yet stored, first occurrence wins."""
+    seen = set(existing)
+    rows = []
+    for record in records:
+        client_id = record.get('client_id') or None
+        if client_id is not None:
+            if client_id in seen:
+                continue
+            seen.add(client_id)
+        rows.append(Progress(user=user, **{**record, 'client_id': client_id}))
+    return rows
+
+
+def bulk_create_progress(user, records, chunk_size=CHUNK_SIZE):
+    """
+    Insert validated Progress ``records`` (dicts of serializer data).
+
+    Returns ``(created, duplicates)``.
+    """
+    client_ids = {record['client_id'] for record in records if record.get('client_id')}
+
+    for attempt in range(2):
+        existing = _existing_client_ids(user, client_ids, chunk_size)
+        rows = _new_rows(user, records, existing)
+        try:
+            with transaction.atomic():
+                Progress.objects.bulk_create(rows, batch_size=chunk_size)
+                # bulk_create skips post_save, so apply the rollups here
+                record_activity(user.id, [(row.completed_at, row.type) for row in rows])
+                record_progress(user.id, [(row.completed_at, row.type) for row in rows])
+                record_reviews(user.id, [(row.surah, row.ayah, row.type) for row in rows])
+                mark_memorized(user.id, [(row.surah, row.ayah) for row in rows if row.type == 'hifz'])
+            break
+        except IntegrityError:
+            # A concurrent replay stored some of the same keys; dedupe again
+            if attempt:
+                raise
+
+    if rows:
+        invalidate_snapshot(user.id)
+    return len(rows), len(records) - len(rows)
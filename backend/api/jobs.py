@@ -0,0 +1,217 @@
+"""
+Background jobs stored in the database.
+
+Celery and Redis aren't available on every deployment, so deferred work
+is a ``Job`` row. ``enqueue`` inserts it inside the caller's transaction,
+so a request that rolls back leaves no job behind, and ``manage.py
+run_jobs`` claims and runs due jobs in batches.
+
+Claiming is safe with any number of workers. Where the database supports
+``SELECT ... FOR UPDATE SKIP LOCKED`` (PostgreSQL) a worker locks the rows
+it picks and the others skip past them. SQLite has no row locks, so a
+worker picks candidate ids and claims them with one compare-and-set
+``UPDATE ... WHERE status = 'queued'`` stamped with a token unique to the
+claim: rows another worker got to first no longer match, and the worker
+reads back only the rows carrying its token.
+
+A job that raises is retried with exponential backoff until it has used
+``max_attempts``, then marked failed with the traceback kept. While a job
+runs, a heartbeat thread refreshes its ``locked_at`` every
+``HEARTBEAT_INTERVAL``, so however long it takes no other worker starts it
+again; a job whose worker died stops beating and is requeued once its
+lock is older than ``LOCK_TIMEOUT``. Queue depth and wait per kind are exported on
+``/api/metrics/``; the worker records each run's duration in the shared
+metrics file under method ``JOB``.
+"""
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from . import activity, coverage, dashboard, finalization, leaderboard, scheduler
+from .metrics import get_store, register_collector
+from .models import Job, ReviewSchedule
+
+BATCH_SIZE = 10
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+LOCK_TIMEOUT = timedelta(minutes=15)
+HEARTBEAT_INTERVAL = timedelta(minutes=1)
+RETENTION = timedelta(days=7)
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register the decorated function to run jobs of ``kind`` with the payload as kwargs."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, delay=None, max_attempts=MAX_ATTEMPTS):
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind {kind!r}')
+    return Job.objects.create(
+        kind=kind, payload=payload or {}, max_attempts=max_attempts,
+        run_at=timezone.now() + (delay or timedelta())
+    )
+
+
+def backoff(attempts):
+    """Delay before retrying a job that has failed ``attempts`` times."""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+# ============ Worker ============
+
+def requeue_stale(now=None):
+    """Release jobs whose worker died mid-run; returns how many were requeued."""
+    now = now or timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - LOCK_TIMEOUT)
+    release = {'locked_by': None, 'locked_at': None, 'last_error': 'Worker lock expired'}
+    stale.filter(attempts__gte=F('max_attempts')).update(status='failed', finished_at=now, **release)
+    return stale.update(status='queued', run_at=now, **release)
+
+
+def claim(batch_size=BATCH_SIZE, now=None):
+    """Mark up to ``batch_size`` due jobs as running for this worker and return them."""
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    due = Job.objects.filter(status='queued', run_at__lte=now).order_by('run_at', 'id')
+    changes = {'status': 'running', 'locked_by': token, 'locked_at': now, 'attempts': F('attempts') + 1}
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            Job.objects.filter(id__in=ids).update(**changes)
+        else:
+            ids = list(due.values_list('id', flat=True)[:batch_size])
+            # Compare-and-set: whatever another worker claimed meanwhile no longer matches
+            Job.objects.filter(id__in=ids, status='queued').update(**changes)
+    return list(Job.objects.filter(locked_by=token).order_by('run_at', 'id'))
+
+
+def touch(job):
+    """Refresh the lock of a job this worker still holds."""
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(locked_at=timezone.now())
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a running job's lock fresh so requeue_stale leaves it alone."""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                try:
+                    touch(self.job)
+                except DatabaseError:
+                    # The database may be busy, e.g. SQLite's write lock held by the job; beat again later
+                    pass
+        finally:
+            # This thread's own connection
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    """Run one claimed job; returns whether it succeeded."""
+    started = time.perf_counter()
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        func = HANDLERS.get(job.kind)
+        if func is None:
+            raise LookupError(f'No handler for job kind {job.kind!r}')
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        finished = timezone.now()
+        if job.attempts >= job.max_attempts:
+            changes = {'status': 'failed', 'finished_at': finished}
+        else:
+            changes = {'status': 'queued', 'run_at': finished + backoff(job.attempts)}
+        succeeded = False
+        changes['last_error'] = traceback.format_exc()
+    else:
+        succeeded = True
+        changes = {'status': 'done', 'finished_at': timezone.now(), 'last_error': ''}
+    finally:
+        heartbeat.stop()
+
+    # Only if the claim is still ours; an expired lock may have been requeued
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(locked_by=None, **changes)
+    get_store().record('JOB', job.kind, time.perf_counter() - started, 0, {}, error=not succeeded)
+    return succeeded
+
+
+def work(batch_size=BATCH_SIZE):
+    """Claim and run one batch; returns ``(succeeded, failed)``."""
+    requeue_stale()
+    results = [run_job(job) for job in claim(batch_size)]
+    return results.count(True), results.count(False)
+
+
+def prune(now=None):
+    """Delete finished jobs past the retention window."""
+    cutoff = (now or timezone.now()) - RETENTION
+    deleted, _ = Job.objects.filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# ============ Metrics ============
+
+@register_collector
+def queue_metrics():
+    now = timezone.now()
+    rows = Job.objects.order_by().values('kind', 'status').annotate(count=Count('id'), oldest=Min('run_at'))
+    lines = [
+        '# HELP quranreview_jobs Jobs in the queue by kind and status.',
+        '# TYPE quranreview_jobs gauge',
+    ]
+    waits = []
+    for row in rows:
+        lines.append(f'quranreview_jobs{{kind="{row["kind"]}",status="{row["status"]}"}} {row["count"]}')
+        if row['status'] == 'queued':
+            # Jobs waiting on a retry backoff aren't late yet
+            waits.append((row['kind'], max((now - row['oldest']).total_seconds(), 0.0)))
+    lines += [
+        '# HELP quranreview_job_wait_seconds How long the oldest due job of each kind has waited.',
+        '# TYPE quranreview_job_wait_seconds gauge',
+    ]
+    lines += [f'quranreview_job_wait_seconds{{kind="{kind}"}} {wait:.3f}' for kind, wait in waits]
+    return lines
+
+
+# ============ Handlers ============
+
+@handler('rebuild_rollups')
+def rebuild_rollups(user_id, progress=True, schedules=True, points=True):
+    """Recompute a user's rollups after a bulk change such as an import."""
+    if progress:
+        activity.rebuild_user_activity(user_id)
+        coverage.rebuild_user_coverage(user_id)
+    if schedules:
+        scheduler.recompute_schedules(ReviewSchedule.objects.filter(user_id=user_id))
+    if points:
+        leaderboard.rebuild_leaderboard([user_id])
+    dashboard.invalidate_snapshot(user_id)
+
+
+@handler('finalize_competitions')
+def finalize_competitions():
+    finalization.finalize_expired()
@@ -0,0 +1,199 @@
+"""
+Global leaderboard.
+
+Points come from progress (hifz 2, muraja 1 per record) and from
+competition score submissions. They are added on write to a per-user daily
+bucket (``LeaderboardDay``) and an all-time running total
+(``LeaderboardTotal``), so no request ever aggregates ``Progress`` or
+``CompetitionScore``. Each window — all time, the last 7 days, the last
+30 days — is ranked in memory with the same ``Ranking`` structure as the
+competition boards: top-N is a slice, "my position" a dict lookup plus a
+bisect.
+
+A worker reloads a window when the leaderboard version moves, but at most
+once every ``LEADERBOARD_REFRESH_SECONDS``: on a busy board nearly every
+request follows a write, and a few seconds of lag is fine for rankings.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .activity import activity_date
+from .caching import get_version, bump_version
+from .models import CompetitionScore, LeaderboardDay, LeaderboardTotal, Progress
+from .rankings import Ranking
+
+POINTS = {'hifz': 2, 'muraja': 1}
+
+# Window name -> days counted back from today (None for all time)
+WINDOWS = {'all': None, 'week': 7, 'month': 30}
+
+LEADERBOARD_SCOPE = 'leaderboard'
+
+
+class Board(Ranking):
+    def entry(self, index):
+        entry = super().entry(index)
+        # The frontend's leaderboard shows ``name``
+        entry['name'] = entry['username']
+        return entry
+
+
+# ============ Writes ============
+
+def _increment(model, lookup, points, ayah_count):
+    changes = {'points': F('points') + points, 'ayah_count': F('ayah_count') + ayah_count}
+    if not model.objects.filter(**lookup).update(**changes):
+        if points < 0 or ayah_count < 0:
+            # Nothing to take points back from
+            return
+        # First points for this row; a concurrent writer may create it too
+        model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_points(user_id, days):
+    """Add ``{date: (points, ayah_count)}`` to the user's buckets and total."""
+    days = {day: delta for day, delta in days.items() if any(delta)}
+    if not days:
+        return
+    # No savepoint: callers writing progress or scores are usually already in a transaction
+    with transaction.atomic(savepoint=False):
+        for day, (points, ayah_count) in days.items():
+            _increment(LeaderboardDay, {'user_id': user_id, 'date': day}, points, ayah_count)
+        _increment(
+            LeaderboardTotal, {'user_id': user_id},
+            sum(points for points, _ in days.values()),
+            sum(ayah_count for _, ayah_count in days.values())
+        )
+    bump_version(LEADERBOARD_SCOPE)
+
+
+def _progress_days(entries, sign=1):
+    days = defaultdict(lambda: [0, 0])
+    for completed_at, progress_type in entries:
+        delta = days[activity_date(completed_at)]
+        delta[0] += sign * POINTS.get(progress_type, 0)
+        delta[1] += sign
+    return {day: tuple(delta) for day, delta in days.items()}
+
+
+def record_progress(user_id, entries):
+    """Points for new Progress rows, given as ``(completed_at, type)`` pairs."""
+    record_points(user_id, _progress_days(entries))
+
+
+def remove_progress(user_id, entries):
+    record_points(user_id, _progress_days(entries, sign=-1))
+
+
+def record_score(user_id, score, ayah_count):
+    record_points(user_id, {timezone.localdate(): (score, ayah_count)})
+
+
+def rebuild_leaderboard(user_ids=None, batch_size=2000):
+    """
+    Recompute buckets and totals from Progress and CompetitionScore.
+
+    Competition points are credited to the day of the score's last
+    activity, since only running totals are stored per competition.
+    Returns the number of users with points.
+    """
+    progress = Progress.objects.all()
+    scores = CompetitionScore.objects.all()
+    days = LeaderboardDay.objects.all()
+    totals = LeaderboardTotal.objects.all()
+    if user_ids is not None:
+        progress, scores, days, totals = (
+            queryset.filter(user_id__in=user_ids) for queryset in (progress, scores, days, totals)
+        )
+
+    with transaction.atomic():
+        days.delete()
+        totals.delete()
+
+        daily = (
+            progress.annotate(day=TruncDate('completed_at'))
+            .order_by().values('user_id', 'day')
+            .annotate(
+                hifz=Count('id', filter=Q(type='hifz')),
+                muraja=Count('id', filter=Q(type='muraja')),
+                records=Count('id'),
+            )
+        )
+        batch = []
+        for row in daily.iterator(chunk_size=batch_size):
+            points = row['hifz'] * POINTS['hifz'] + row['muraja'] * POINTS['muraja']
+            batch.append(LeaderboardDay(
+                user_id=row['user_id'], date=row['day'], points=points, ayah_count=row['records']
+            ))
+            if len(batch) >= batch_size:
+                LeaderboardDay.objects.bulk_create(batch)
+                batch = []
+        LeaderboardDay.objects.bulk_create(batch)
+
+        competition_days = (
+            scores.annotate(day=TruncDate('last_activity'))
+            .order_by().values('user_id', 'day')
+            .annotate(points=Sum('score'), ayahs=Sum('ayah_count'))
+        )
+        for row in competition_days.iterator(chunk_size=batch_size):
+            _increment(LeaderboardDay, {'user_id': row['user_id'], 'date': row['day']},
+                       row['points'], row['ayahs'])
+
+        per_user = days.order_by().values('user_id').annotate(points=Sum('points'), ayahs=Sum('ayah_count'))
+        batch = [
+            LeaderboardTotal(user_id=row['user_id'], points=row['points'], ayah_count=row['ayahs'])
+            for row in per_user
+        ]
+        LeaderboardTotal.objects.bulk_create(batch, batch_size=batch_size)
+
+    bump_version(LEADERBOARD_SCOPE)
+    return len(batch)
+
+
+# ============ Reads ============
+
+def load_board(window, today):
+    days = WINDOWS[window]
+    if days is None:
+        rows = LeaderboardTotal.objects.filter(points__gt=0).order_by('-points', 'user_id').values_list(
+            'user_id', 'user__username', 'points', 'ayah_count'
+        )
+    else:
+        rows = (
+            LeaderboardDay.objects.filter(date__gt=today - timedelta(days=days), date__lte=today)
+            .order_by().values('user_id', 'user__username')
+            .annotate(total=Sum('points'), ayahs=Sum('ayah_count'))
+            .filter(total__gt=0)
+            .order_by('-total', 'user_id')
+            .values_list('user_id', 'user__username', 'total', 'ayahs')
+        )
+    return Board(list(rows))
+
+
+_boards = {}
+_lock = Lock()
+
+
+def get_board(window):
+    version = get_version(LEADERBOARD_SCOPE)
+    today = timezone.localdate()
+    cached = _boards.get(window)
+    if cached is not None:
+        cached_version, cached_day, loaded_at, board = cached
+        fresh = cached_version == version or time.monotonic() - loaded_at < settings.LEADERBOARD_REFRESH_SECONDS
+        if cached_day == today and fresh:
+            return board
+
+    board = load_board(window, today)
+    with _lock:
+        _boards[window] = (version, today, time.monotonic(), board)
+    return board
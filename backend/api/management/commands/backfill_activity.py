@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.activity import rebuild_activity
+from api.models import Progress, UserDailyActivity, UserActivitySummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily activity rollup and streak summaries from Progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild this user id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        progress = Progress.objects.all()
+        if options['users']:
+            progress = progress.filter(user_id__in=options['users'])
+            UserDailyActivity.objects.filter(user_id__in=options['users']).delete()
+            UserActivitySummary.objects.filter(user_id__in=options['users']).delete()
+        else:
+            UserDailyActivity.objects.all().delete()
+            UserActivitySummary.objects.all().delete()
+
+        users = rebuild_activity(progress, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt activity for {users} users'))
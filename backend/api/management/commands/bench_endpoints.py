@@ -0,0 +1,315 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import quran
+from api import urls as api_urls
+from api.backup import export_lines
+from api.models import Competition, CompetitionScore, Task, TeacherStudent
+from authentication import urls as auth_urls
+from authentication.jwt import tokens_for_user
+
+User = get_user_model()
+
+# Cleared between requests for cold runs, so never the cache the app serves from
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-endpoints',
+    },
+}
+
+
+class Context:
+    """Objects the benchmark requests point at, owned by the benchmark user."""
+
+    def __init__(self, user, client):
+        self.user = user
+        self.client = client
+        self.task = Task.objects.create(user=user, title='Benchmark', surah=1)
+        self.competition = Competition.objects.create(
+            name='benchmark', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        self.competition.participants.add(user)
+        CompetitionScore.objects.create(competition=self.competition, user=user)
+        self._export = None
+
+        # Benchmark the class views as a teacher of the other generated users
+        user.role = 'teacher'
+        user.save()
+        TeacherStudent.objects.bulk_create([
+            TeacherStudent(teacher=user, student=student, accepted_at=timezone.now())
+            for student in User.objects.exclude(pk=user.pk)[:500]
+        ])
+        self.student = self.new_student()
+
+    def new_task(self):
+        return Task.objects.create(user=self.user, title='Disposable', surah=1).pk
+
+    def new_refresh(self):
+        return str(tokens_for_user(self.user))
+
+    def new_session(self):
+        # Logging out revokes the access token sent with it, so each logout gets its own session
+        refresh = tokens_for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        return str(refresh)
+
+    def new_student(self, enrol=True):
+        student = User.objects.create_user(username=f'bench-student-{uuid.uuid4().hex[:12]}')
+        if enrol:
+            TeacherStudent.objects.create(teacher=self.user, student=student, accepted_at=timezone.now())
+        return student
+
+    def new_invitation(self):
+        teacher = User.objects.create_user(username=f'bench-teacher-{uuid.uuid4().hex[:12]}', role='teacher')
+        TeacherStudent.objects.create(teacher=teacher, student=self.user)
+        return teacher.pk
+
+    def export_body(self):
+        # The header and first 100 rows of the user's export
+        if self._export is None:
+            self._export = b''.join(islice(export_lines(self.user, chunk_size=100), 2))
+        return self._export
+
+
+def _progress_batch(i, size=100):
+    return [
+        dict(zip(('surah', 'ayah'), quran.ayah_ref((i * size + n) % quran.AYAH_COUNT + 1)),
+             type='muraja', client_id=uuid.uuid4().hex)
+        for n in range(size)
+    ]
+
+
+# (label, url name, method, url args, request body); callables receive the Context.
+# A bytes body is sent as NDJSON.
+CASES = [
+    ('task-list', 'task-list', 'get', None, None),
+    ('task-create', 'task-list', 'post', None, {'title': 'New', 'surah': 1, 'start_ayah': 1, 'end_ayah': 7}),
+    ('task-detail', 'task-detail', 'get', lambda c: [c.task.pk], None),
+    ('task-update', 'task-detail', 'patch', lambda c: [c.task.pk], {'status': 'in_progress'}),
+    ('task-delete', 'task-detail', 'delete', lambda c: [c.new_task()], None),
+    ('progress-list', 'progress-list', 'get', None, None),
+    ('progress-create', 'progress-list', 'post', None, {'surah': 1, 'ayah': 1, 'type': 'muraja'}),
+    ('progress-bulk', 'progress-bulk', 'post', None, lambda c, i: _progress_batch(i)),
+    ('progress-stats', 'progress-stats', 'get', None, None),
+    ('progress-breakdown', 'progress-breakdown', 'get', None, None),
+    ('progress-coverage', 'progress-coverage', 'get', None, None),
+    ('review-list', 'review-list', 'get', None, None),
+    ('review-create', 'review-list', 'post', None,
+     {'surah': 1, 'start_ayah': 1, 'end_ayah': 7, 'next_review_date': str(timezone.localdate())}),
+    ('review-due', 'review-due', 'get', None, None),
+    ('dashboard', 'dashboard', 'get', None, None),
+    ('sync', 'sync', 'get', None, None),
+    ('metrics', 'metrics', 'get', None, None),
+    ('leaderboard', 'leaderboard', 'get', None, None),
+    ('leaderboard-week', 'leaderboard', 'get', None, {'window': 'week'}),
+    ('my-students', 'my-students', 'get', None, None),
+    ('my-students-add', 'my-students', 'post', None,
+     lambda c, i: {'username': c.new_student(enrol=False).username}),
+    ('my-student-remove', 'my-student-detail', 'delete', lambda c: [c.new_student().pk], None),
+    ('student-progress', 'student-progress', 'get', lambda c: [c.student.pk], None),
+    ('my-teachers', 'my-teachers', 'get', None, None),
+    ('my-teacher-accept', 'my-teacher-detail', 'post', lambda c: [c.new_invitation()], None),
+    ('my-teacher-leave', 'my-teacher-detail', 'delete', lambda c: [c.new_invitation()], None),
+    ('quran-text', 'quran-text', 'get', None, {'ranges': '2:1-20,3:1-10'}),
+    ('export', 'export', 'get', None, None),
+    ('import', 'import', 'post', None, lambda c, i: c.export_body()),
+    ('competition-list', 'competition-list', 'get', None, None),
+    ('competition-detail', 'competition-detail', 'get', lambda c: [c.competition.pk], None),
+    ('competition-join', 'competition-join', 'post', lambda c: [c.competition.pk], None),
+    ('competition-score', 'competition-score', 'post', lambda c: [c.competition.pk], {'score': 5, 'ayah_count': 1}),
+    ('competition-score-batch', 'competition-score-batch', 'post', None,
+     lambda c, i: {'scores': [{'competition': c.competition.pk, 'score': 1}] * 20}),
+    ('competition-leaderboard', 'competition-leaderboard', 'get', lambda c: [c.competition.pk], None),
+    ('token-obtain', 'token_obtain_pair', 'post', None,
+     lambda c, i: {'username': c.user.username, 'password': Command.password}),
+    ('token-refresh', 'token_refresh', 'post', None, lambda c, i: {'refresh': c.new_refresh()}),
+    ('register', 'register', 'post', None,
+     lambda c, i: {'username': f'bench-{uuid.uuid4().hex[:12]}', 'password': 'secret-pass-123'}),
+    ('profile', 'profile', 'get', None, None),
+    ('profile-update', 'profile', 'put', None, {'first_name': 'Benchmark'}),
+    ('logout', 'logout', 'post', None, lambda c, i: {'refresh': c.new_session()}),
+]
+
+
+def _route_names():
+    return {
+        pattern.name for module in (api_urls, auth_urls)
+        for pattern in module.urlpatterns if isinstance(pattern, URLPattern)
+    }
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Benchmark every api/ and auth/ route through the test client against a private cache; '
+            'save a JSON baseline and diff against one. The run is one transaction that is rolled '
+            'back, so work deferred with transaction.on_commit() never runs and is not measured')
+
+    password = 'bench-pass-123'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--user', help='Benchmark as this user (default: the one with most progress)')
+        parser.add_argument('--only', action='append', help='Only run this case label (repeatable)')
+        parser.add_argument('--warm', action='store_true',
+                            help='Keep the cache between requests (default clears it, measuring cold paths)')
+        parser.add_argument('--save', help='Write results as a JSON baseline to this path')
+        parser.add_argument('--compare', help='Diff results against this JSON baseline')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Percent p95 slowdown reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        missing = _route_names() - {case[1] for case in CASES}
+        if missing:
+            self.stderr.write(self.style.WARNING(f'No benchmark case for routes: {", ".join(sorted(missing))}'))
+
+        cases = [case for case in CASES if not options['only'] or case[0] in options['only']]
+        with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=BENCH_CACHES), transaction.atomic():
+            user = self._user(options['user'])
+            user.set_password(self.password)
+            # Staff may scrape /api/metrics/; rolled back with everything else
+            user.is_staff = True
+            user.save()
+            client = APIClient()
+            context = Context(user, client)
+            access = f'Bearer {tokens_for_user(user).access_token}'
+
+            results = {}
+            for case in cases:
+                client.credentials(HTTP_AUTHORIZATION=access)
+                results[case[0]] = self._measure(client, context, case, options)
+                self._print_row(case[0], results[case[0]])
+            transaction.set_rollback(True)
+
+        report = {
+            'revision': _git_revision(),
+            'created_at': timezone.now().isoformat(),
+            'user_progress_rows': user.progress_rows,
+            'iterations': options['iterations'],
+            'warm': options['warm'],
+            'results': results,
+        }
+        if options['save']:
+            with open(options['save'], 'w') as baseline:
+                json.dump(report, baseline, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['save']}"))
+        if options['compare']:
+            self._compare(results, options)
+
+    def _user(self, username):
+        users = User.objects.annotate(progress_rows=Count('progress'))
+        if username:
+            try:
+                return users.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'No user {username}')
+        user = users.order_by('-progress_rows').first()
+        if user is None:
+            raise CommandError('No users; run generate_data first')
+        return user
+
+    def _request(self, client, context, case, i, warm):
+        label, name, method, args, data = case
+        url = reverse(name, args=args(context) if args else None)
+        body = data(context, i) if callable(data) else data
+        if not warm:
+            cache.clear()
+        encoding = {'content_type': 'application/x-ndjson'} if isinstance(body, bytes) else {'format': 'json'}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, body, **encoding)
+            if response.streaming:
+                # A streamed body does its work as it is consumed
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(f'{label}: {method.upper()} {url} returned {response.status_code}: '
+                               f'{response.content[:200]!r}')
+        return elapsed, len(queries)
+
+    def _measure(self, client, context, case, options):
+        warm = options['warm']
+        self._request(client, context, case, 0, warm)
+
+        timings, query_counts = [], []
+        for i in range(1, options['iterations'] + 1):
+            elapsed, queries = self._request(client, context, case, i, warm)
+            timings.append(elapsed)
+            query_counts.append(queries)
+
+        # Separate pass: tracemalloc slows everything down, so it isn't timed
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._request(client, context, case, options['iterations'] + 1, warm)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'p50_ms': round(_percentile(timings, 0.50) * 1000, 3),
+            'p95_ms': round(_percentile(timings, 0.95) * 1000, 3),
+            'p99_ms': round(_percentile(timings, 0.99) * 1000, 3),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+            'queries': max(query_counts),
+            'peak_alloc_kb': round(peak / 1024, 1),
+        }
+
+    def _print_row(self, label, result):
+        self.stdout.write(
+            f"{label:>24}  p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+            f"p99 {result['p99_ms']:8.2f}ms  {result['queries']:3d} queries  "
+            f"{result['peak_alloc_kb']:8.1f} KiB"
+        )
+
+    def _compare(self, results, options):
+        with open(options['compare']) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.stdout.write(f"\nAgainst {options['compare']} (revision {baseline.get('revision')}):")
+
+        regressions = []
+        for label, result in results.items():
+            before = baseline['results'].get(label)
+            if before is None:
+                self.stdout.write(f'{label:>24}  new')
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+            query_change = result['queries'] - before['queries']
+            regressed = change > options['threshold'] or query_change > 0
+            line = (f"{label:>24}  p95 {before['p95_ms']:8.2f} -> {result['p95_ms']:8.2f}ms "
+                    f"({change:+6.1f}%)  queries {before['queries']} -> {result['queries']}")
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+            if regressed:
+                regressions.append(label)
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'Regressions: {", ".join(regressions)}')
@@ -0,0 +1,63 @@
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api import quran
+from api.models import Progress, Task
+from api.projections import ValuesProjection
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import ProgressSerializer, TaskSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF serializers + JSONRenderer with values() projections + FastJSONRenderer (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N runs')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with transaction.atomic():
+            user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:8]}')
+            Task.objects.bulk_create([
+                Task(user=user, title=f'مراجعة {i}', surah=i % 114 + 1, start_ayah=1, end_ayah=5,
+                     type=['hifz', 'muraja', 'tilawa'][i % 3], status=['pending', 'completed'][i % 2])
+                for i in range(rows)
+            ], batch_size=2000)
+            Progress.objects.bulk_create([
+                Progress(user=user, surah=quran.ayah_ref(i % quran.AYAH_COUNT + 1)[0],
+                         ayah=quran.ayah_ref(i % quran.AYAH_COUNT + 1)[1], type='hifz')
+                for i in range(rows)
+            ], batch_size=2000)
+
+            self.stdout.write(f"{rows} rows, orjson {'installed' if orjson else 'missing'}")
+            for model, serializer_class in [(Task, TaskSerializer), (Progress, ProgressSerializer)]:
+                queryset = model.objects.filter(user=user).order_by('-id')
+                projection = ValuesProjection(serializer_class)
+
+                drf = self._best(options['repeat'], lambda: JSONRenderer().render(
+                    serializer_class(queryset, many=True).data
+                ))
+                fast = self._best(options['repeat'], lambda: FastJSONRenderer().render(
+                    projection.rows(queryset.values(*projection.columns))
+                ))
+                self.stdout.write(
+                    f'{model.__name__:>9}: DRF {rows / drf:9.0f} rows/s  '
+                    f'projection {rows / fast:9.0f} rows/s  ({drf / fast:.1f}x)'
+                )
+            transaction.set_rollback(True)
+
+    def _best(self, repeat, run):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare one-POST-per-row and bulk Progress ingestion (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=500)
+        parser.add_argument('--batch', type=int, default=500, help='Records per bulk request')
+
+    def handle(self, *args, **options):
+        records = options['records']
+        payload = [
+            {'surah': 2, 'ayah': i % 286 + 1, 'type': 'hifz', 'client_id': uuid.uuid4().hex}
+            for i in range(records)
+        ]
+
+        with override_settings(ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:8]}')
+            client = APIClient()
+            client.force_authenticate(user)
+
+            single = self._measure(lambda: [
+                client.post('/api/progress/', {**record, 'client_id': None}, format='json')
+                for record in payload
+            ])
+            batch = options['batch']
+            bulk = self._measure(lambda: [
+                client.post('/api/progress/bulk/', payload[start:start + batch], format='json')
+                for start in range(0, records, batch)
+            ])
+            replay = self._measure(lambda: [
+                client.post('/api/progress/bulk/', payload[start:start + batch], format='json')
+                for start in range(0, records, batch)
+            ])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{records} records')
+        for label, (elapsed, queries) in [
+            ('single POST', single), ('bulk', bulk), ('bulk replay', replay)
+        ]:
+            self.stdout.write(
+                f'{label:>12}: {elapsed:8.3f}s  {records / elapsed:10.0f} rows/s  {queries:6d} queries'
+            )
+        self.stdout.write(self.style.SUCCESS(f'bulk speedup: {single[0] / bulk[0]:.1f}x'))
+
+    def _measure(self, run):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        return elapsed, len(queries)
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROFILES = ['default', 'production']
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _worker(env, worker, writes, start_at, results):
+    """Write ``writes`` Progress rows through the ORM in a fresh Django process."""
+    os.environ.update(env)
+    import django
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, transaction
+    from api.models import Progress
+
+    user = get_user_model().objects.create_user(username=f'bench-{worker}')
+    latencies, errors = [], 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    for i in range(writes):
+        started = time.perf_counter()
+        try:
+            # Read then write in one transaction, like the progress endpoint
+            with transaction.atomic():
+                Progress.objects.filter(user=user).exists()
+                Progress.objects.create(user=user, surah=2, ayah=i % 286 + 1, type='hifz')
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.put((latencies, errors))
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent write throughput and tail latency per SQLite profile (uses throwaway databases)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help='Writes per process')
+        parser.add_argument('--profile', choices=PROFILES, action='append', dest='profiles')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{options['processes']} processes x {options['writes']} writes")
+        for profile in options['profiles'] or PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                env = {
+                    'SQLITE_PROFILE': profile,
+                    'SQLITE_PATH': str(Path(directory) / 'bench.sqlite3'),
+                    'DJANGO_SETTINGS_MODULE': os.environ['DJANGO_SETTINGS_MODULE'],
+                }
+                subprocess.run(
+                    [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'migrate', '-v', '0'],
+                    env={**os.environ, **env}, check=True
+                )
+                self._report(profile, *self._run(env, options['processes'], options['writes']))
+
+    def _run(self, env, processes, writes):
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        # Give every process time to boot Django so they start writing together
+        start_at = time.time() + 3
+        workers = [
+            context.Process(target=_worker, args=(env, worker, writes, start_at, results))
+            for worker in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        collected = [results.get() for _ in workers]
+        elapsed = time.time() - start_at
+        for process in workers:
+            process.join()
+
+        latencies = [latency for batch, _ in collected for latency in batch]
+        errors = sum(errors for _, errors in collected)
+        return latencies, errors, elapsed
+
+    def _report(self, profile, latencies, errors, elapsed):
+        self.stdout.write(
+            f'{profile:>10}: {len(latencies) / elapsed:8.0f} writes/s  '
+            f'p50 {_percentile(latencies, 0.50) * 1000:7.1f}ms  '
+            f'p95 {_percentile(latencies, 0.95) * 1000:7.1f}ms  '
+            f'p99 {_percentile(latencies, 0.99) * 1000:7.1f}ms  '
+            f'{errors} locked errors'
+        )
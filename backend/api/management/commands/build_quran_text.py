@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.quran_text import CorpusError, read_source, write_store
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped Quran text store from a surah|ayah|text source file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', default=None,
+                            help='Tanzil-style text export, one surah|ayah|text line per ayah, '
+                                 'optionally gzipped (defaults to QURAN_TEXT_SOURCE)')
+        parser.add_argument('--output', default=None,
+                            help='Where to write the store (defaults to QURAN_TEXT_PATH)')
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.QURAN_TEXT_PATH
+        source = options['source'] or settings.QURAN_TEXT_SOURCE
+        try:
+            texts = read_source(source)
+        except OSError as error:
+            raise CommandError(f'Cannot read {source}: {error.strerror or error}')
+        except CorpusError as error:
+            raise CommandError(str(error))
+        size = write_store(texts, output)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(texts)} ayahs ({size} bytes of text) to {output}'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.finalization import BATCH_SIZE, finalize_expired
+
+
+class Command(BaseCommand):
+    help = 'Close competitions past their end date and freeze their final rankings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Expired competitions read per batch')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running, checking every this many seconds, instead of once')
+
+    def handle(self, *args, **options):
+        finalized = 0
+        try:
+            while True:
+                finalized += finalize_expired(options['batch_size'])
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Finalized {finalized} competitions'))
@@ -0,0 +1,165 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import quran
+from api.activity import rebuild_activity
+from api.coverage import rebuild_coverage
+from api.leaderboard import rebuild_leaderboard
+from api.models import (
+    Achievement, Competition, CompetitionScore, Progress, ReviewSchedule, Task
+)
+from api.scheduler import recompute_schedules
+
+User = get_user_model()
+
+PREFIX = 'synthetic-'
+PASSWORD = 'synthetic-pass-123'
+
+
+@contextmanager
+def _explicit_timestamps(*fields):
+    """Let bulk_create keep the timestamps we generate instead of stamping now()."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users with tasks, progress, schedules, achievements and competitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=50, help='Tasks per user')
+        parser.add_argument('--progress', type=int, default=2000, help='Progress rows per user')
+        parser.add_argument('--memorized', type=float, default=0.3,
+                            help='Share of progress rows that are hifz (the rest are muraja)')
+        parser.add_argument('--schedules', type=int, default=20, help='Review schedules per user')
+        parser.add_argument('--achievements', type=int, default=5, help='Achievements per user')
+        parser.add_argument('--competitions', type=int, default=2, help='Competitions joined per user')
+        parser.add_argument('--competition-pool', type=int, default=5,
+                            help='Active competitions to create')
+        parser.add_argument('--days', type=int, default=365, help='History length in days')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help=f'Delete previously generated users ({PREFIX}*) first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+
+        if options['clear']:
+            deleted = User.objects.filter(username__startswith=PREFIX).delete()[1].get(
+                User._meta.label, 0
+            )
+            Competition.objects.filter(name__startswith=PREFIX).delete()
+            self.stdout.write(f'Deleted {deleted} synthetic users')
+
+        first = User.objects.filter(username__startswith=PREFIX).count()
+        password = make_password(PASSWORD)
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'{PREFIX}{first + i}', password=password)
+                for i in range(options['users'])
+            ])
+            competitions = Competition.objects.bulk_create([
+                Competition(name=f'{PREFIX}competition-{first}-{i}', description='',
+                            start_date=now - timedelta(days=7), end_date=now + timedelta(days=30))
+                for i in range(options['competition_pool'])
+            ])
+
+            for user in users:
+                self._generate_user(user, rng, now, competitions, options)
+
+            progress = Progress.objects.filter(user__in=users)
+            rebuild_activity(progress)
+            rebuild_coverage(progress)
+            recompute_schedules(ReviewSchedule.objects.filter(user__in=users))
+            rebuild_leaderboard([user.pk for user in users])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(users)} users ({PREFIX}{first}..., password '{PASSWORD}')"
+        ))
+
+    def _generate_user(self, user, rng, now, competitions, options):
+        days = options['days']
+
+        def moment():
+            return now - timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+
+        # Memorization advances sequentially from a random starting ayah
+        hifz_rows = int(options['progress'] * options['memorized'])
+        start = rng.randint(1, max(quran.AYAH_COUNT - hifz_rows, 1))
+        memorized = [start + offset for offset in range(min(hifz_rows, quran.AYAH_COUNT - start + 1))]
+        revised = [rng.choice(memorized) for _ in range(options['progress'] - len(memorized))] if memorized else []
+
+        rows = []
+        for kind, ids in (('hifz', memorized), ('muraja', revised)):
+            for global_id in ids:
+                surah, ayah = quran.ayah_ref(global_id)
+                completed_at = moment()
+                rows.append(Progress(
+                    user=user, surah=surah, ayah=ayah, type=kind,
+                    accuracy=rng.randint(60, 100), duration=rng.randint(10, 600),
+                    completed_at=completed_at, updated_at=completed_at,
+                ))
+        with _explicit_timestamps(*(Progress._meta.get_field(name) for name in ('completed_at', 'updated_at'))):
+            Progress.objects.bulk_create(rows, batch_size=2000)
+
+        today = timezone.localdate()
+        task_fields = [Task._meta.get_field(name) for name in ('created_at', 'updated_at')]
+        with _explicit_timestamps(*task_fields):
+            tasks = []
+            for i in range(options['tasks']):
+                surah = rng.randint(1, quran.SURAH_COUNT)
+                start_ayah = rng.randint(1, quran.surah_length(surah))
+                created_at = moment()
+                tasks.append(Task(
+                    user=user, title=f'Task {i}', surah=surah, start_ayah=start_ayah,
+                    end_ayah=min(start_ayah + rng.randint(0, 10), quran.surah_length(surah)),
+                    type=rng.choice(['hifz', 'muraja', 'tilawa']),
+                    priority=rng.choice(['high', 'medium', 'low']),
+                    status=rng.choice(['pending', 'in_progress', 'completed']),
+                    due_date=today + timedelta(days=rng.randint(-7, 30)),
+                    created_at=created_at, updated_at=created_at,
+                ))
+            Task.objects.bulk_create(tasks)
+
+        schedules = []
+        for _ in range(options['schedules'] if memorized else 0):
+            surah, ayah = quran.ayah_ref(rng.choice(memorized))
+            schedules.append(ReviewSchedule(
+                user=user, surah=surah, start_ayah=ayah,
+                end_ayah=min(ayah + rng.randint(0, 9), quran.surah_length(surah)),
+                next_review_date=today,
+                # Backdated so recompute_schedules counts the whole revision history
+                created_at=now - timedelta(days=days), updated_at=now,
+            ))
+        with _explicit_timestamps(*(ReviewSchedule._meta.get_field(name) for name in ('created_at', 'updated_at'))):
+            ReviewSchedule.objects.bulk_create(schedules)
+
+        with _explicit_timestamps(Achievement._meta.get_field('earned_at')):
+            Achievement.objects.bulk_create([
+                Achievement(user=user, title=f'Badge {i}', description='', icon='star', earned_at=moment())
+                for i in range(options['achievements'])
+            ])
+
+        joined = rng.sample(competitions, min(options['competitions'], len(competitions)))
+        for competition in joined:
+            competition.participants.add(user)
+        CompetitionScore.objects.bulk_create([
+            CompetitionScore(competition=competition, user=user,
+                             score=rng.randint(0, 5000), ayah_count=rng.randint(0, 500))
+            for competition in joined
+        ])
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Achievement, Progress, Task
+from authentication.jwt import tokens_for_user
+
+User = get_user_model()
+
+SERVERS = {
+    'wsgi': ['gunicorn', 'quranreview.wsgi:application', '--workers', '{workers}',
+             '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'quranreview.asgi:application', '--workers', '{workers}',
+             '--port', '{port}', '--no-access-log'],
+}
+PATHS = ['/api/dashboard/', '/api/progress/stats/']
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _tree_rss(root_pid):
+    """Resident memory in MiB of a process and all its descendants (Linux /proc)."""
+    parents = {}
+    for entry in Path('/proc').iterdir():
+        if entry.name.isdigit():
+            try:
+                parents[int(entry.name)] = int((entry / 'stat').read_text().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent]
+        tree.update(children)
+        frontier.extend(children)
+    total = 0
+    for pid in tree:
+        try:
+            for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1])
+        except OSError:
+            continue
+    return total / 1024
+
+
+async def _request(port, path, header, slow=False):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: {header}\r\n'
+               'Connection: close\r\n\r\n').encode()
+    if slow:
+        # A phone on a poor network: the request trickles in over ~1s
+        for start in range(0, len(request), 16):
+            writer.write(request[start:start + 16])
+            await writer.drain()
+            await asyncio.sleep(1 / (len(request) / 16))
+    else:
+        writer.write(request)
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return int(status)
+
+
+async def _load(port, header, concurrency, slow_clients, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client(index):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await _request(port, PATHS[index % len(PATHS)], header)
+            except OSError:
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    async def slow_client(index):
+        while time.perf_counter() < deadline:
+            try:
+                await _request(port, PATHS[index % len(PATHS)], header, slow=True)
+            except OSError:
+                pass
+
+    await asyncio.gather(
+        *(client(i) for i in range(concurrency)),
+        *(slow_client(i) for i in range(slow_clients)),
+    )
+    return latencies, errors
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Load-test the dashboard and stats endpoints under gunicorn (WSGI) and uvicorn (ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+        parser.add_argument('--wsgi-workers', type=int,
+                            help='Override the gunicorn worker count, e.g. to match ASGI memory')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--slow-clients', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep the snapshot cache (default runs every request cold)')
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f'loadtest-{uuid.uuid4().hex[:8]}')
+        try:
+            Task.objects.bulk_create([Task(user=user, title=f'Task {i}', surah=i + 1) for i in range(50)])
+            for ayah in range(1, 51):
+                Progress.objects.create(user=user, surah=2, ayah=ayah, type='hifz')
+            Achievement.objects.create(user=user, title='Badge', description='', icon='star')
+            header = f'Bearer {tokens_for_user(user).access_token}'
+
+            self.stdout.write(
+                f"{options['workers']} workers, {options['concurrency']} clients, "
+                f"{options['slow_clients']} slow clients, {options['duration']}s"
+            )
+            for mode in SERVERS:
+                self._run(mode, header, options)
+        finally:
+            user.delete()
+
+    def _run(self, mode, header, options):
+        port = _free_port()
+        workers = options['workers']
+        if mode == 'wsgi' and options['wsgi_workers']:
+            workers = options['wsgi_workers']
+        command = [part.format(workers=workers, port=port) for part in SERVERS[mode]]
+        env = {**os.environ, 'ALLOWED_HOSTS': '127.0.0.1', 'DEBUG': 'False'}
+        if not options['warm_cache']:
+            env['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+        try:
+            server = subprocess.Popen(
+                [sys.executable, '-m', *command], cwd=settings.BASE_DIR, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError as exc:
+            raise CommandError(f'Could not start {command[0]}: {exc}')
+
+        try:
+            self._wait_until_up(server, port)
+            latencies, errors = asyncio.run(_load(
+                port, header, options['concurrency'], options['slow_clients'], options['duration']
+            ))
+            rss = _tree_rss(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+        self.stdout.write(
+            f'{mode} x{workers}: {len(latencies) / options["duration"]:8.0f} req/s  '
+            f'p50 {_percentile(latencies, 0.50) * 1000:7.1f}ms  '
+            f'p99 {_percentile(latencies, 0.99) * 1000:7.1f}ms  '
+            f'{errors} errors  {rss:6.0f} MiB RSS'
+        )
+
+    def _wait_until_up(self, server, port, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Server exited with code {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError('Server did not start in time')
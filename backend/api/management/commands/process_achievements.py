@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.achievements import BATCH_SIZE, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Award achievements from new progress and task events, batch by batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Events consumed per transaction')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to wait when there is nothing to process')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the backlog is drained instead of polling')
+
+    def handle(self, *args, **options):
+        events = awarded = 0
+        try:
+            while True:
+                processed, new_awards = process_batch(options['batch_size'])
+                events += processed
+                awarded += new_awards
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Processed {events} events, awarded {awarded} achievements'))
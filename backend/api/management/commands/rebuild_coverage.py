@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.coverage import rebuild_coverage
+from api.models import MemorizationCoverage, Progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the memorization coverage bitmaps from hifz Progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild this user id (repeatable)')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        progress = Progress.objects.all()
+        if options['users']:
+            progress = progress.filter(user_id__in=options['users'])
+            MemorizationCoverage.objects.filter(user_id__in=options['users']).delete()
+        else:
+            MemorizationCoverage.objects.all().delete()
+
+        users = rebuild_coverage(progress)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt coverage for {users} users'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the leaderboard buckets and totals from Progress and competition scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        users = rebuild_leaderboard(options['users'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the leaderboard for {users} users'))
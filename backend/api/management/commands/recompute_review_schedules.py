@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.models import ReviewSchedule
+from api.scheduler import recompute_schedules
+
+
+class Command(BaseCommand):
+    help = 'Recompute review counts and due dates for every schedule from muraja history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only recompute this user id (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        schedules = ReviewSchedule.objects.all()
+        if options['users']:
+            schedules = schedules.filter(user_id__in=options['users'])
+
+        total = recompute_schedules(schedules, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {total} review schedules'))
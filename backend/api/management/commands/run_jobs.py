@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.jobs import BATCH_SIZE, prune, work
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs, claiming them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Jobs claimed at a time')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait when no job is due')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        succeeded = failed = 0
+        try:
+            while True:
+                done, errors = work(options['batch_size'])
+                succeeded += done
+                failed += errors
+                if done or errors:
+                    continue
+                prune()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} jobs, {failed} failed'))
@@ -0,0 +1,211 @@
+"""
+Per-route request metrics shared by every worker process.
+
+Counters live in a fixed-layout file mapped into each process with mmap,
+so gunicorn workers aggregate into the same histograms without a metrics
+server. Each route (method + URL pattern) owns one slot of unsigned 64-bit
+counters; recording a request is a few in-place additions under a short
+``flock``. ``/api/metrics/`` renders every slot in Prometheus text format,
+followed by any collectors other modules register.
+"""
+import fcntl
+import mmap
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+# Upper bounds in seconds; one extra bucket catches everything above
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('sql', 'auth', 'app', 'render')
+
+MAGIC = b'QRMETRC1'
+SLOTS = 256
+KEY_BYTES = 128
+HEADER_BYTES = 16
+
+# Counter offsets within a slot, after the key
+_DURATION = 0                                   # len(BUCKETS) + 1 bucket counts
+_SQL_DURATION = _DURATION + len(BUCKETS) + 1    # same buckets, for time spent in SQL
+_COUNT = _SQL_DURATION + len(BUCKETS) + 1
+_DURATION_SUM = _COUNT + 1                      # microseconds
+_QUERIES = _DURATION_SUM + 1
+_PHASE_SUMS = _QUERIES + 1                      # microseconds per entry of PHASES
+_ERRORS = _PHASE_SUMS + len(PHASES)             # 5xx responses
+COUNTERS = _ERRORS + 1
+
+SLOT_BYTES = KEY_BYTES + COUNTERS * 8
+FILE_BYTES = HEADER_BYTES + SLOTS * SLOT_BYTES
+
+OVERFLOW_KEY = 'OTHER other'
+
+_collectors = []
+
+
+def register_collector(collector):
+    """Add a callable returning extra Prometheus text lines for ``/api/metrics/``."""
+    _collectors.append(collector)
+    return collector
+
+
+class MetricsStore:
+    def __init__(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a+b')
+        with self._locked():
+            if os.fstat(self._file.fileno()).st_size < FILE_BYTES:
+                self._file.truncate(FILE_BYTES)
+            self._map = mmap.mmap(self._file.fileno(), FILE_BYTES)
+            if self._map[:len(MAGIC)] != MAGIC:
+                self._map[:] = bytes(FILE_BYTES)
+                self._map[:len(MAGIC)] = MAGIC
+        self._counters = memoryview(self._map)[HEADER_BYTES:].cast('B').cast('Q')
+        self._slots = {}
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _key_at(self, slot):
+        start = HEADER_BYTES + slot * SLOT_BYTES
+        return bytes(self._map[start:start + KEY_BYTES]).rstrip(b'\0').decode()
+
+    def _slot(self, key):
+        """Slot index for ``key``, claiming a free one on first use (call with the lock held)."""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        encoded = key.encode()[:KEY_BYTES]
+        for slot in range(SLOTS):
+            existing = self._key_at(slot)
+            if existing == key or not existing:
+                if not existing:
+                    start = HEADER_BYTES + slot * SLOT_BYTES
+                    self._map[start:start + len(encoded)] = encoded
+                self._slots[key] = slot
+                return slot
+        return self._slot(OVERFLOW_KEY) if key != OVERFLOW_KEY else SLOTS - 1
+
+    def record(self, method, route, total, queries, phases, error=False):
+        """Add one request; ``total`` and ``phases`` values are in seconds."""
+        bucket = bisect_left(BUCKETS, total)
+        sql_bucket = bisect_left(BUCKETS, phases.get('sql', 0.0))
+        counters = self._counters
+        with self._locked():
+            base = self._slot(f'{method} {route}') * (SLOT_BYTES // 8) + KEY_BYTES // 8
+            counters[base + _DURATION + bucket] += 1
+            counters[base + _SQL_DURATION + sql_bucket] += 1
+            counters[base + _COUNT] += 1
+            counters[base + _DURATION_SUM] += int(total * 1e6)
+            counters[base + _QUERIES] += queries
+            for index, phase in enumerate(PHASES):
+                counters[base + _PHASE_SUMS + index] += int(phases.get(phase, 0.0) * 1e6)
+            if error:
+                counters[base + _ERRORS] += 1
+
+    def snapshot(self):
+        """``{(method, route): counters}`` for every used slot."""
+        with self._locked():
+            rows = {}
+            for slot in range(SLOTS):
+                key = self._key_at(slot)
+                if not key:
+                    break
+                base = slot * (SLOT_BYTES // 8) + KEY_BYTES // 8
+                rows[tuple(key.split(' ', 1))] = list(self._counters[base:base + COUNTERS])
+        return rows
+
+    def reset(self):
+        with self._locked():
+            self._map[HEADER_BYTES:] = bytes(FILE_BYTES - HEADER_BYTES)
+            self._slots.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """This process's store, reopened after a fork or a change of ``METRICS_PATH``."""
+    global _store
+    key = (os.getpid(), str(settings.METRICS_PATH))
+    if _store is None or _store[0] != key:
+        with _store_lock:
+            if _store is None or _store[0] != key:
+                _store = (key, MetricsStore(settings.METRICS_PATH))
+    return _store[1]
+
+
+# ============ Exposition ============
+
+def _labels(method, route, **extra):
+    labels = {'method': method, 'route': route, **extra}
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+
+
+def _histogram(lines, name, method, route, counters, offset, total_sum, count):
+    cumulative = 0
+    for index, bound in enumerate(BUCKETS + ('+Inf',)):
+        cumulative += counters[offset + index]
+        lines.append(f'{name}_bucket{{{_labels(method, route, le=bound)}}} {cumulative}')
+    lines.append(f'{name}_sum{{{_labels(method, route)}}} {total_sum / 1e6:.6f}')
+    lines.append(f'{name}_count{{{_labels(method, route)}}} {count}')
+
+
+def render_prometheus(rows):
+    lines = [
+        '# HELP quranreview_request_duration_seconds Request time from middleware entry to exit.',
+        '# TYPE quranreview_request_duration_seconds histogram',
+    ]
+    for (method, route), counters in rows.items():
+        _histogram(lines, 'quranreview_request_duration_seconds', method, route, counters,
+                   _DURATION, counters[_DURATION_SUM], counters[_COUNT])
+
+    lines += [
+        '# HELP quranreview_request_sql_seconds Time per request spent executing SQL.',
+        '# TYPE quranreview_request_sql_seconds histogram',
+    ]
+    sql = PHASES.index('sql')
+    for (method, route), counters in rows.items():
+        _histogram(lines, 'quranreview_request_sql_seconds', method, route, counters,
+                   _SQL_DURATION, counters[_PHASE_SUMS + sql], counters[_COUNT])
+
+    lines += [
+        '# HELP quranreview_request_queries_total SQL queries executed.',
+        '# TYPE quranreview_request_queries_total counter',
+    ]
+    for (method, route), counters in rows.items():
+        lines.append(f'quranreview_request_queries_total{{{_labels(method, route)}}} {counters[_QUERIES]}')
+
+    lines += [
+        '# HELP quranreview_request_phase_seconds_total Time spent per request phase.',
+        '# TYPE quranreview_request_phase_seconds_total counter',
+    ]
+    for (method, route), counters in rows.items():
+        for index, phase in enumerate(PHASES):
+            value = counters[_PHASE_SUMS + index] / 1e6
+            lines.append(
+                f'quranreview_request_phase_seconds_total{{{_labels(method, route, phase=phase)}}} {value:.6f}'
+            )
+
+    lines += [
+        '# HELP quranreview_request_errors_total Responses with a 5xx status.',
+        '# TYPE quranreview_request_errors_total counter',
+    ]
+    for (method, route), counters in rows.items():
+        lines.append(f'quranreview_request_errors_total{{{_labels(method, route)}}} {counters[_ERRORS]}')
+
+    for collector in _collectors:
+        lines.extend(collector())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Achievement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('icon', models.CharField(max_length=100)),
+                ('earned_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'achievements',
+                'ordering': ['-earned_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Competition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                ('status', models.CharField(choices=[('active', 'نشط'), ('completed', 'مكتمل'), ('cancelled', 'ملغي')], default='active', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'competitions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CompetitionScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField(default=0)),
+                ('ayah_count', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'competition_scores',
+            },
+        ),
+        migrations.CreateModel(
+            name='Progress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('surah', models.IntegerField()),
+                ('ayah', models.IntegerField()),
+                ('type', models.CharField(choices=[('hifz', 'حفظ'), ('muraja', 'مراجعة')], default='hifz', max_length=20)),
+                ('accuracy', models.IntegerField(default=0)),
+                ('duration', models.IntegerField(default=0)),
+                ('completed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'progress',
+                'ordering': ['-completed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('surah', models.IntegerField()),
+                ('start_ayah', models.IntegerField()),
+                ('end_ayah', models.IntegerField()),
+                ('next_review_date', models.DateField()),
+                ('review_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'review_schedules',
+                'ordering': ['next_review_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('type', models.CharField(choices=[('hifz', 'حفظ'), ('muraja', 'مراجعة'), ('tilawa', 'تلاوة')], default='hifz', max_length=20)),
+                ('priority', models.CharField(choices=[('high', 'عالية'), ('medium', 'متوسطة'), ('low', 'منخفضة')], default='medium', max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'قيد الانتظار'), ('in_progress', 'جاري العمل'), ('completed', 'مكتمل'), ('cancelled', 'ملغي')], default='pending', max_length=20)),
+                ('surah', models.IntegerField(blank=True, null=True)),
+                ('start_ayah', models.IntegerField(blank=True, null=True)),
+                ('end_ayah', models.IntegerField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'tasks',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
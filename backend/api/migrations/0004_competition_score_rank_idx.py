@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_user_daily_activity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='competitionscore',
+            index=models.Index(fields=['competition', '-score'], name='competition_score_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_competition_score_rank_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='progress',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='progress',
+            constraint=models.UniqueConstraint(fields=('user', 'client_id'), name='progress_user_client_id_uniq'),
+        ),
+    ]
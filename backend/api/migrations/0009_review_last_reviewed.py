@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewschedule',
+            name='last_reviewed',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0009_review_last_reviewed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemorizationCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bitmap', models.BinaryField(max_length=780)),
+                ('ayah_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='coverage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'memorization_coverage',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0011_teacher_students'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.IntegerField(default=0)),
+                ('ayah_count', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_total', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'leaderboard_totals',
+                'indexes': [models.Index(fields=['-points', 'user'], name='leaderboard_total_rank_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('ayah_count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'leaderboard_days',
+                'indexes': [models.Index(fields=['date', 'user'], name='leaderboard_day_window_idx')],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0014_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetitionResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150)),
+                ('rank', models.IntegerField()),
+                ('score', models.IntegerField()),
+                ('ayah_count', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'competition_results',
+            },
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='finalized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='competition',
+            index=models.Index(fields=['status', 'end_date'], name='competition_status_end_idx'),
+        ),
+        migrations.AddField(
+            model_name='competitionresult',
+            name='competition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='api.competition'),
+        ),
+        migrations.AddField(
+            model_name='competitionresult',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='competition_results', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='competitionresult',
+            index=models.Index(fields=['competition', 'rank', 'user'], name='competition_result_rank_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='competitionresult',
+            unique_together={('competition', 'user')},
+        ),
+    ]
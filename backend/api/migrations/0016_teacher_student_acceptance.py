@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_competition_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherstudent',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_teacher_student_acceptance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievementevent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='achievementevent',
+            name='task_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='achievementevent',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='achievement_event_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='achievementevent',
+            constraint=models.UniqueConstraint(fields=('kind', 'task_id'), name='achievement_event_task_uniq'),
+        ),
+    ]
@@ -41,6 +41,19 @@ class Task(models.Model):
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_sync_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='task_user_created_idx'),
+            models.Index(fields=['user', 'status'], name='task_user_status_idx'),
+            models.Index(fields=['user', 'due_date'], name='task_user_due_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # Lets post_save tell a task that just became completed from one saved again
+        task._loaded_status = getattr(task, 'status', None)
+        return task
 
 
 class Progress(models.Model):
@@ -50,11 +63,21 @@ class Progress(models.Model):
     type = models.CharField(max_length=20, choices=[('hifz', 'حفظ'), ('muraja', 'مراجعة')], default='hifz')
     accuracy = models.IntegerField(default=0)
     duration = models.IntegerField(default=0)  # in seconds
+    client_id = models.CharField(max_length=64, null=True, blank=True)  # idempotency key for offline sync
     completed_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'progress'
         ordering = ['-completed_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='progress_user_client_id_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='progress_user_sync_idx'),
+            models.Index(fields=['user', '-completed_at', '-id'], name='progress_user_completed_idx'),
+            models.Index(fields=['user', 'type', 'completed_at'], name='progress_user_type_idx'),
+        ]
 
 
 class ReviewSchedule(models.Model):
@@ -64,11 +87,17 @@ class ReviewSchedule(models.Model):
     end_ayah = models.IntegerField()
     next_review_date = models.DateField()
     review_count = models.IntegerField(default=0)
+    last_reviewed = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'review_schedules'
         ordering = ['next_review_date']
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='review_user_sync_idx'),
+            models.Index(fields=['user', 'next_review_date'], name='review_user_due_idx'),
+        ]
 
 
 class Achievement(models.Model):
@@ -76,11 +105,21 @@ class Achievement(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     icon = models.CharField(max_length=100)
+    # Rule that awarded it (see api.achievements); unique per user so awards are idempotent
+    code = models.CharField(max_length=50, null=True, blank=True)
     earned_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'achievements'
         ordering = ['-earned_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'code'], name='achievement_user_code_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='achievement_user_sync_idx'),
+            models.Index(fields=['user', '-earned_at'], name='achievement_user_recent_idx'),
+        ]
 
 
 class Competition(models.Model):
@@ -97,10 +136,15 @@ class Competition(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     participants = models.ManyToManyField(User, related_name='competitions', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the final ranking is frozen into CompetitionResult rows
+    finalized_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = 'competitions'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'end_date'], name='competition_status_end_idx'),
+        ]
 
 
 class CompetitionScore(models.Model):
@@ -113,3 +157,189 @@ class CompetitionScore(models.Model):
     class Meta:
         db_table = 'competition_scores'
         unique_together = ['competition', 'user']
+        indexes = [
+            models.Index(fields=['competition', '-score'], name='competition_score_rank_idx'),
+        ]
+
+
+class CompetitionResult(models.Model):
+    """A participant's final standing, written once when the competition is finalized."""
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE, related_name='results')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='competition_results')
+    username = models.CharField(max_length=150)
+    rank = models.IntegerField()
+    score = models.IntegerField()
+    ayah_count = models.IntegerField()
+    
+    class Meta:
+        db_table = 'competition_results'
+        unique_together = ['competition', 'user']
+        indexes = [
+            models.Index(fields=['competition', 'rank', 'user'], name='competition_result_rank_idx'),
+        ]
+
+
+class UserDailyActivity(models.Model):
+    """Per-user, per-day rollup of Progress rows, maintained on write."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    hifz_count = models.IntegerField(default=0)
+    muraja_count = models.IntegerField(default=0)
+    total_count = models.IntegerField(default=0)
+    streak = models.IntegerField(default=0)  # consecutive active days ending on this date
+    
+    class Meta:
+        db_table = 'user_daily_activity'
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+
+
+class UserActivitySummary(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='activity_summary')
+    last_active_date = models.DateField(null=True, blank=True)
+    current_streak = models.IntegerField(default=0)  # streak as of last_active_date
+    longest_streak = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'user_activity_summary'
+
+
+class SyncTombstone(models.Model):
+    """Marks a deleted row so delta sync can tell clients to drop it."""
+    # Plain id rather than a FK: tombstones are written while a user's rows cascade away
+    user_id = models.BigIntegerField()
+    collection = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'sync_tombstones'
+        indexes = [
+            models.Index(fields=['user_id', 'collection', 'deleted_at', 'id'], name='tombstone_user_sync_idx'),
+        ]
+
+
+class MemorizationCoverage(models.Model):
+    """One bit per ayah (global id order) the user has memorized."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='coverage')
+    bitmap = models.BinaryField(max_length=780)
+    ayah_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'memorization_coverage'
+
+
+class TeacherStudent(models.Model):
+    """A teacher's invitation to a student, and their enrolment once the student accepts."""
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_links')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teacher_links')
+    created_at = models.DateTimeField(auto_now_add=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)  # pending until the student accepts
+    
+    class Meta:
+        db_table = 'teacher_students'
+        unique_together = ['teacher', 'student']
+
+
+class LeaderboardDay(models.Model):
+    """Leaderboard points a user earned on one day; rolling windows sum these."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_days')
+    date = models.DateField()
+    points = models.IntegerField(default=0)
+    ayah_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'leaderboard_days'
+        unique_together = ['user', 'date']
+        indexes = [
+            models.Index(fields=['date', 'user'], name='leaderboard_day_window_idx'),
+        ]
+
+
+class LeaderboardTotal(models.Model):
+    """All-time leaderboard points, kept as a running total."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard_total')
+    points = models.IntegerField(default=0)
+    ayah_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'leaderboard_totals'
+        indexes = [
+            models.Index(fields=['-points', 'user'], name='leaderboard_total_rank_idx'),
+        ]
+
+
+class AchievementEvent(models.Model):
+    """An event for the achievement worker that Progress ids alone can't express."""
+    KIND_CHOICES = [
+        ('task_completed', 'Task completed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    # Plain id rather than a FK: a counted completion stays counted after the task is deleted
+    task_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)  # kept once counted, to dedupe
+    
+    class Meta:
+        db_table = 'achievement_events'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'task_id'], name='achievement_event_task_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True),
+                         name='achievement_event_queue_idx'),
+        ]
+
+
+class AchievementCounter(models.Model):
+    """Running per-user totals the achievement rules test against."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='achievement_counters')
+    name = models.CharField(max_length=50)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'achievement_counters'
+        unique_together = ['user', 'name']
+
+
+class AchievementCursor(models.Model):
+    """How far the achievement worker has consumed a stream (the last Progress id)."""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'achievement_cursors'
+
+
+class Job(models.Model):
+    """A unit of deferred work for ``manage.py run_jobs`` (see api.jobs)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField()
+    # Token of the claim that holds the job while running
+    locked_by = models.CharField(max_length=64, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at', 'id'], name='job_status_run_at_idx'),
+            models.Index(fields=['locked_by'], name='job_locked_by_idx'),
+        ]
@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """Keyset pages over ``(created_at, id)``, newest first or ``?ordering=created_at``."""
+    ordering = ('-created_at', '-id')
+    # Cursors need a non-null key and a unique tiebreaker: nullable or
+    # repeating columns like due_date and priority would skip rows or fail,
+    # so the view answers 400 for any other ?ordering
+    orderings = {
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+    }
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    
+    def get_ordering(self, request, queryset, view):
+        return self.orderings.get(request.query_params.get('ordering'), self.ordering)
+
+
+class ProgressCursorPagination(CursorPagination):
+    """Keyset pages over ``(completed_at, id)``, newest first."""
+    ordering = ('-completed_at', '-id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+TEACHER_ROLES = ('teacher', 'admin')
+
+
+class IsTeacher(BasePermission):
+    message = 'هذه الصفحة متاحة للمعلمين فقط'
+    
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role in TEACHER_ROLES)
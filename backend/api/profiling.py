@@ -0,0 +1,154 @@
+"""
+Request profiling.
+
+``ProfilingMiddleware`` splits each request's wall time into exclusive
+phases — SQL, authentication, rendering and the remaining application time
+(view code and serializers) — reports them in a ``Server-Timing`` header
+and adds them to the shared per-route histograms in ``metrics``.
+
+Code elsewhere marks a phase with ``track_phase('auth')``; outside a
+profiled request it does nothing.
+
+The middleware runs sync or async. Queries are counted by an execute
+wrapper installed on every database connection as it is created, which
+finds the request through a context variable; ``sync_to_async`` copies
+the context into its pool threads, so queries an async view runs there
+are counted too. Queries running concurrently on several threads each
+add their own duration, so ``sql`` can then exceed the wall time.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import get_store
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.phases = {'sql': 0.0, 'auth': 0.0, 'render': 0.0}
+        self._lock = threading.Lock()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phases['sql'] += elapsed
+                self.queries += 1
+
+    @contextmanager
+    def phase(self, name):
+        started, sql_before = time.perf_counter(), self.phases['sql']
+        try:
+            yield
+        finally:
+            # SQL run inside the phase is already counted under 'sql'
+            sql = self.phases['sql'] - sql_before
+            self.phases[name] += time.perf_counter() - started - sql
+
+
+@contextmanager
+def track_phase(name):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.phase(name):
+        yield
+
+
+def _execute(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.execute_wrapper(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+def _server_timing(timings, total):
+    entries = [f'sql;dur={timings.phases["sql"] * 1000:.2f};desc="{timings.queries} queries"']
+    entries += [
+        f'{name};dur={timings.phases[name] * 1000:.2f}' for name in ('auth', 'app', 'render')
+    ]
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, started)
+
+    def _start(self):
+        # Connections opened before this module was imported missed the signal
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        timings = RequestTimings()
+        return timings, _current.set(timings), time.perf_counter()
+
+    def _finish(self, request, response, timings, started):
+        total = time.perf_counter() - started
+        phases = timings.phases
+        phases['app'] = max(total - phases['sql'] - phases['auth'] - phases['render'], 0.0)
+        response['Server-Timing'] = _server_timing(timings, total)
+
+        match = getattr(request, 'resolver_match', None)
+        get_store().record(
+            request.method, match.route if match else 'unmatched', total, timings.queries, phases,
+            error=response.status_code >= 500
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that separately
+        timings = _current.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timings.phases['render'] += time.perf_counter() - started
+            response.add_post_render_callback(rendered)
+        return response
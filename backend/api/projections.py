@@ -0,0 +1,113 @@
+"""
+Read-only ``.values()`` projections of model serializers.
+
+Building a list response through DRF runs every field of every row
+through the serializer's field objects. ``ValuesProjection`` compiles a
+serializer's output fields once into plain per-column converters — choice
+labels become dict lookups, datetimes get DRF's ISO 8601 formatting — and
+applies them to ``.values()`` rows, producing the same dicts the
+serializer would, in the same key order.
+"""
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import FastJSONRenderer
+
+
+def _datetime_formatter():
+    """Formatter for the active time zone, as ``DateTimeField`` renders ISO 8601."""
+    tz = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if value.tzinfo is not tz:
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return format_datetime
+
+
+def _format_date(value):
+    return value.isoformat()
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+class ValuesProjection:
+    def __init__(self, serializer_class):
+        model = serializer_class.Meta.model
+        self.outputs = []   # (key, column, converter)
+        columns = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            column, converter = self._compile(model, name, field)
+            columns.append(column)
+            self.outputs.append((name, column, converter))
+        self.columns = list(dict.fromkeys(columns))
+
+    @staticmethod
+    def _compile(model, name, field):
+        source = field.source
+        if source.startswith('get_') and source.endswith('_display'):
+            model_field = model._meta.get_field(source[4:-8])
+            labels = {value: str(label) for value, label in model_field.flatchoices}
+            return model_field.attname, lambda value: labels.get(value, value)
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            return model._meta.get_field(source).attname, None
+        if isinstance(field, drf_fields.DateTimeField):
+            if getattr(field, 'format', api_settings.DATETIME_FORMAT) != api_settings.DATETIME_FORMAT \
+                    or api_settings.DATETIME_FORMAT.lower() != 'iso-8601':
+                raise UnsupportedField(name)
+            return source, _datetime_formatter
+        if isinstance(field, drf_fields.DateField):
+            return source, _format_date
+        if isinstance(field, (drf_fields.IntegerField, drf_fields.CharField,
+                              drf_fields.BooleanField, drf_fields.ChoiceField)):
+            # ChoiceField and CharField pass stored strings through unchanged
+            return source, None
+        raise UnsupportedField(name)
+
+    def rows(self, values):
+        """Serialized dicts for ``values`` rows, as ``serializer(many=True).data`` would give."""
+        pairs = [(key, column) for key, column, _ in self.outputs]
+        # The datetime formatter binds the active time zone once per call
+        converted = [
+            (key, converter() if converter is _datetime_formatter else converter)
+            for key, _, converter in self.outputs if converter is not None
+        ]
+        rows = []
+        for row in values:
+            data = {key: row[column] for key, column in pairs}
+            # Reassigning existing keys keeps the serializer's key order
+            for key, converter in converted:
+                value = data[key]
+                if value is not None:
+                    data[key] = converter(value)
+            rows.append(data)
+        return rows
+
+
+class ProjectedListMixin:
+    """
+    ``list()`` through a ``ValuesProjection`` of the view's serializer,
+    rendered by ``FastJSONRenderer``. Writes keep the regular serializer.
+    """
+    renderer_classes = [FastJSONRenderer] + [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer is not JSONRenderer
+    ]
+    projection = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.projection.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.projection.rows(page))
+        return Response(self.projection.rows(queryset))
@@ -0,0 +1,176 @@
+"""
+Local Uthmani text store.
+
+The whole corpus lives in one file mapped into memory with mmap, so every
+worker forked from the app shares the same page-cache pages and reading
+an ayah is two index lookups and a slice:
+
+    header   8-byte magic, uint32 ayah count, uint32 text checksum
+    index    AYAH_COUNT + 1 uint32 offsets into the text (native byte
+             order), one per global ayah id plus the end of the last ayah
+    text     every ayah's UTF-8 text back to back in global-id order
+
+Consecutive ayahs are adjacent, so a range is one contiguous slice.
+
+The store is built from a Tanzil-style ``surah|ayah|text`` export, plain or
+gzip-compressed, by ``manage.py build_quran_text [source]`` into
+``QURAN_TEXT_PATH``. Without a source argument it reads
+``QURAN_TEXT_SOURCE``, the compressed export kept with the code, and
+``get_store()`` builds from that same file on first use when no store
+exists yet, so a deployment serves the text without any setup or network
+access. With neither file, or with a damaged store, ``get_store()``
+returns None and the text endpoint answers 503.
+"""
+import gzip
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from pathlib import Path
+
+from django.conf import settings
+
+from . import quran
+
+MAGIC = b'QRTEXT01'
+HEADER = struct.Struct('<8sII')
+INDEX_BYTES = (quran.AYAH_COUNT + 1) * 4
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusError(ValueError):
+    pass
+
+
+class TextStore:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise CorpusError(f'{path} is empty')
+        self._text = HEADER.size + INDEX_BYTES
+        if len(self._map) < self._text:
+            raise CorpusError(f'{path} is truncated')
+        magic, count, checksum = HEADER.unpack_from(self._map)
+        if magic != MAGIC or count != quran.AYAH_COUNT:
+            raise CorpusError(f'{path} is not a Quran text file')
+        self._offsets = memoryview(self._map)[HEADER.size:self._text].cast('I')
+        if self._text + self._offsets[-1] != len(self._map):
+            raise CorpusError(f'{path} is truncated')
+        # Identifies the corpus for ETags; changes only when the file is rebuilt
+        self.checksum = f'{checksum:08x}'
+
+    def ayahs(self, first, last):
+        """Texts of global ids ``first..last`` inclusive."""
+        offsets = self._offsets
+        start = offsets[first - 1]
+        chunk = self._map[self._text + start:self._text + offsets[last]]
+        return [
+            chunk[offsets[global_id - 1] - start:offsets[global_id] - start].decode()
+            for global_id in range(first, last + 1)
+        ]
+
+
+def parse_source(lines):
+    """Ayah texts in global-id order from ``surah|ayah|text`` lines."""
+    texts = [None] * quran.AYAH_COUNT
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            surah, ayah, text = line.split('|', 2)
+            surah, ayah = int(surah), int(ayah)
+        except ValueError:
+            raise CorpusError(f'Line {number}: expected surah|ayah|text')
+        if not quran.is_valid(surah, ayah):
+            raise CorpusError(f'Line {number}: no ayah {surah}:{ayah}')
+        texts[quran.ayah_id(surah, ayah) - 1] = text.strip()
+    missing = texts.count(None)
+    if missing:
+        surah, ayah = quran.ayah_ref(texts.index(None) + 1)
+        raise CorpusError(f'{missing} ayahs missing, starting at {surah}:{ayah}')
+    return texts
+
+
+def read_source(path):
+    """Ayah texts from a source export, gzip-compressed when it ends in ``.gz``."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8-sig') as source:
+        try:
+            return parse_source(source)
+        except (EOFError, UnicodeDecodeError) as error:
+            raise CorpusError(f'{path} is damaged: {error}')
+
+
+def write_store(texts, path):
+    """Write ``texts`` (one per global id) to ``path``, replacing it atomically."""
+    encoded = [text.encode() for text in texts]
+    offsets = array('I', [0])
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    body = b''.join(encoded)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per process: several workers may build on first use at once
+    partial = path.with_name(f'{path.name}.{os.getpid()}.partial')
+    with open(partial, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, quran.AYAH_COUNT, zlib.crc32(body)))
+        file.write(offsets.tobytes())
+        file.write(body)
+    os.replace(partial, path)
+    return len(body)
+
+
+_store = None
+_store_lock = threading.Lock()
+# The source that last failed to build, so requests don't re-parse it every time
+_failed_source = None
+
+
+def get_store():
+    """This process's text store, or None when there is no usable corpus."""
+    global _store
+    path = Path(settings.QURAN_TEXT_PATH)
+    try:
+        key = (str(path), path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        if not _build_from_source(path):
+            return None
+        key = (str(path), path.stat().st_mtime_ns)
+    if _store is None or _store[0] != key:
+        with _store_lock:
+            if _store is None or _store[0] != key:
+                try:
+                    _store = (key, TextStore(path))
+                except CorpusError as error:
+                    logger.error('Quran text unavailable: %s', error)
+                    return None
+    return _store[1]
+
+
+def _build_from_source(path):
+    global _failed_source
+    source = Path(settings.QURAN_TEXT_SOURCE)
+    with _store_lock:
+        if path.exists():
+            return True
+        try:
+            key = (str(source), source.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return False
+        if key == _failed_source:
+            return False
+        try:
+            write_store(read_source(source), path)
+        except (OSError, CorpusError) as error:
+            _failed_source = key
+            logger.error('Cannot build the Quran text from %s: %s', source, error)
+            return False
+    return True
@@ -0,0 +1,127 @@
+"""
+Competition rankings.
+
+Each worker keeps an in-memory, score-ordered copy of a competition's
+scores and rebuilds it only when the competition's version counter moves,
+so top-K and "my rank" lookups never scan ``CompetitionScore``. Once a
+competition is finalized its ranking comes from the frozen
+``CompetitionResult`` rows instead; those never change, so each worker
+loads them once and keeps them. Both caches hold at most
+``MAX_RANKINGS`` competitions and drop the least recently read first.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+
+from .caching import get_version, bump_version
+from .models import CompetitionResult, CompetitionScore
+
+
+def ranking_scope(competition_id):
+    return f'competition-ranking:{competition_id}'
+
+
+class Ranking:
+    """Participants ordered best-first with O(log n) rank and O(1) position lookups."""
+
+    def __init__(self, rows):
+        # rows: (user_id, username, score, ayah_count) sorted by score descending
+        self.rows = rows
+        self._neg_scores = [-row[2] for row in rows]
+        self._positions = {row[0]: index for index, row in enumerate(rows)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def rank_for_score(self, score):
+        """Competition rank: tied scores share the best position."""
+        return bisect_left(self._neg_scores, -score) + 1
+
+    def position_of(self, user_id):
+        return self._positions.get(user_id)
+
+    def entry(self, index):
+        user_id, username, score, ayah_count = self.rows[index]
+        return {
+            'rank': self.rank_for_score(score),
+            'user': user_id,
+            'username': username,
+            'score': score,
+            'ayah_count': ayah_count,
+        }
+
+    def top(self, limit):
+        return [self.entry(index) for index in range(min(limit, len(self.rows)))]
+
+    def around(self, user_id, radius):
+        position = self.position_of(user_id)
+        if position is None:
+            return []
+        start = max(position - radius, 0)
+        end = min(position + radius + 1, len(self.rows))
+        return [self.entry(index) for index in range(start, end)]
+
+
+MAX_RANKINGS = 64
+
+_rankings = OrderedDict()
+_lock = Lock()
+
+
+def _remember(store, competition_id, value):
+    with _lock:
+        store[competition_id] = value
+        store.move_to_end(competition_id)
+        while len(store) > MAX_RANKINGS:
+            store.popitem(last=False)
+
+
+def _recall(store, competition_id):
+    with _lock:
+        value = store.get(competition_id)
+        if value is not None:
+            store.move_to_end(competition_id)
+    return value
+
+
+def load_ranking(competition_id):
+    rows = list(
+        CompetitionScore.objects
+        .filter(competition_id=competition_id)
+        .order_by('-score', 'user_id')
+        .values_list('user_id', 'user__username', 'score', 'ayah_count')
+    )
+    return Ranking(rows)
+
+
+def get_ranking(competition_id):
+    version = get_version(ranking_scope(competition_id))
+    cached = _recall(_rankings, competition_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    ranking = load_ranking(competition_id)
+    _remember(_rankings, competition_id, (version, ranking))
+    return ranking
+
+
+def invalidate_ranking(competition_id):
+    bump_version(ranking_scope(competition_id))
+
+
+_final_rankings = OrderedDict()
+
+
+def get_final_ranking(competition_id):
+    """Ranking of a finalized competition, read once from its snapshot."""
+    ranking = _recall(_final_rankings, competition_id)
+    if ranking is None:
+        rows = list(
+            CompetitionResult.objects
+            .filter(competition_id=competition_id)
+            .order_by('rank', 'user_id')
+            .values_list('user_id', 'username', 'score', 'ayah_count')
+        )
+        ranking = Ranking(rows)
+        _remember(_final_rankings, competition_id, ranking)
+    return ranking
@@ -0,0 +1,183 @@
+"""
+Spaced-repetition review scheduling.
+
+Memorized (hifz) ayahs are gathered into ``ReviewSchedule`` ranges, and
+each day a range is revised (muraja) it moves one step up the interval
+ladder. Every update is a set-based UPDATE: the new due date depends only
+on the old ``review_count``, so it is expressed as a ``Case`` over that
+column rather than computed row by row in Python.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DateField, ExpressionWrapper, F, IntegerField, Max, Min, OuterRef, Q,
+    Subquery, Value, When
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Progress, ReviewSchedule
+
+# Days until the next review after the 1st, 2nd, 3rd... review
+INTERVALS = [1, 3, 7, 14, 30, 60, 120]
+
+CHUNK_SIZE = 100
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _next_review_case(base):
+    """Due date after one more review, keyed on the current ``review_count``."""
+    whens = [
+        When(review_count=count, then=base(days))
+        for count, days in enumerate(INTERVALS)
+    ]
+    return Case(*whens, default=base(INTERVALS[-1]), output_field=DateField())
+
+
+def _covering(pairs):
+    return reduce(or_, (
+        Q(surah=surah, start_ayah__lte=ayah, end_ayah__gte=ayah) for surah, ayah in pairs
+    ))
+
+
+def record_reviews(user_id, entries, today=None):
+    """
+    Apply new Progress rows to the user's schedules.
+
+    ``entries`` is an iterable of ``(surah, ayah, type)``. Revised ayahs
+    advance every schedule covering them, at most once per day; newly
+    memorized ayahs are added to a schedule.
+    """
+    today = today or timezone.localdate()
+    entries = list(entries)
+    revised = {(surah, ayah) for surah, ayah, kind in entries if kind == 'muraja'}
+    memorized = sorted({(surah, ayah) for surah, ayah, kind in entries if kind == 'hifz'})
+
+    for pairs in _chunks(revised, CHUNK_SIZE):
+        ReviewSchedule.objects.filter(_covering(pairs), user_id=user_id).exclude(
+            last_reviewed=today
+        ).update(
+            next_review_date=_next_review_case(lambda days: Value(today + timedelta(days=days))),
+            review_count=F('review_count') + 1,
+            last_reviewed=today,
+            updated_at=timezone.now(),
+        )
+    if memorized:
+        _schedule_memorized(user_id, memorized, today)
+
+
+def _schedule_memorized(user_id, pairs, today):
+    """Extend a fresh adjacent range or start a new one for each uncovered ayah."""
+    schedules = {}
+    for schedule in ReviewSchedule.objects.filter(
+        user_id=user_id, surah__in={surah for surah, _ in pairs}
+    ):
+        schedules.setdefault(schedule.surah, []).append(schedule)
+
+    extended = {}
+    created = []
+    for surah, ayah in pairs:
+        ranges = schedules.setdefault(surah, [])
+        if any(s.start_ayah <= ayah <= s.end_ayah for s in ranges):
+            continue
+        adjacent = next(
+            (s for s in ranges if s.end_ayah == ayah - 1 and s.review_count == 0), None
+        )
+        if adjacent is not None:
+            adjacent.end_ayah = ayah
+            if adjacent.pk:
+                extended[adjacent.pk] = adjacent
+            continue
+        schedule = ReviewSchedule(
+            user_id=user_id, surah=surah, start_ayah=ayah, end_ayah=ayah,
+            next_review_date=today + timedelta(days=INTERVALS[0]),
+        )
+        ranges.append(schedule)
+        created.append(schedule)
+
+    if created:
+        ReviewSchedule.objects.bulk_create(created)
+    if extended:
+        now = timezone.now()
+        for schedule in extended.values():
+            schedule.updated_at = now
+        ReviewSchedule.objects.bulk_update(extended.values(), ['end_ayah', 'updated_at'])
+
+
+def due_schedules(user, today=None):
+    today = today or timezone.localdate()
+    return ReviewSchedule.objects.filter(user=user, next_review_date__lte=today).order_by(
+        'next_review_date', 'id'
+    )
+
+
+def recompute_schedules(queryset=None, chunk_size=5000):
+    """
+    Rebuild ``review_count``, ``last_reviewed`` and ``next_review_date``
+    from muraja history, one id range at a time.
+
+    Each chunk is two UPDATE statements with correlated subqueries, so the
+    work happens in the database rather than per row in Python. Returns the
+    number of schedules recomputed.
+    """
+    queryset = queryset if queryset is not None else ReviewSchedule.objects.all()
+    reviews = Progress.objects.filter(
+        user=OuterRef('user'),
+        surah=OuterRef('surah'),
+        ayah__gte=OuterRef('start_ayah'),
+        ayah__lte=OuterRef('end_ayah'),
+        completed_at__gte=OuterRef('created_at'),
+        type='muraja',
+    ).order_by().values('user')
+
+    review_days = reviews.annotate(
+        days=Count(TruncDate('completed_at'), distinct=True)
+    ).values('days')
+    last_review = reviews.annotate(last=Max(TruncDate('completed_at'))).values('last')
+
+    def after_last_review(days):
+        return ExpressionWrapper(F('last_reviewed') + timedelta(days=days), output_field=DateField())
+
+    def after_created(days):
+        return ExpressionWrapper(
+            TruncDate('created_at') + timedelta(days=days), output_field=DateField()
+        )
+
+    # The Case below looks at the number of reviews *before* the last one
+    after_reviews = [
+        When(review_count=count + 1, then=after_last_review(days))
+        for count, days in enumerate(INTERVALS)
+    ]
+
+    bounds = queryset.order_by().aggregate(low=Min('id'), high=Max('id'))
+    low, high = bounds['low'], bounds['high']
+    if low is None:
+        return 0
+
+    total = 0
+    for start in range(low, high + 1, chunk_size):
+        chunk = queryset.filter(id__gte=start, id__lt=start + chunk_size)
+        with transaction.atomic():
+            updated = chunk.update(
+                review_count=Coalesce(Subquery(review_days, output_field=IntegerField()), 0),
+                last_reviewed=Subquery(last_review, output_field=DateField()),
+            )
+            chunk.update(
+                next_review_date=Case(
+                    When(review_count=0, then=after_created(INTERVALS[0])),
+                    *after_reviews,
+                    default=after_last_review(INTERVALS[-1]),
+                    output_field=DateField(),
+                ),
+                updated_at=timezone.now(),
+            )
+        total += updated
+    return total
@@ -0,0 +1,109 @@
+"""
+Competition score ingestion.
+
+Scores only ever move through ``F()`` increments inside one transaction,
+so concurrent submissions add up instead of overwriting each other.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .leaderboard import record_score
+from .models import Competition, CompetitionScore
+from .rankings import invalidate_ranking
+
+Participation = Competition.participants.through
+
+
+class NotJoined(Exception):
+    """Raised by ``apply_score_deltas`` with the competitions the user can't score in."""
+
+    def __init__(self, competitions):
+        super().__init__(competitions)
+        self.competitions = competitions
+
+
+def open_competitions(now=None):
+    """Competitions still accepting participants and scores: active and not yet ended."""
+    return Competition.objects.filter(status='active', end_date__gt=now or timezone.now())
+
+
+def joined_competitions(user, competition_ids):
+    """
+    Ids from ``competition_ids`` that are open and that ``user`` has joined.
+
+    Inside a transaction the membership rows stay locked until it commits.
+    """
+    return set(
+        Participation.objects.select_for_update(of=('self',)).filter(
+            user_id=user.id,
+            competition_id__in=competition_ids,
+            competition__status='active',
+            competition__end_date__gt=timezone.now()
+        ).values_list('competition_id', flat=True)
+    )
+
+
+def apply_score_deltas(user, deltas):
+    """
+    Add ``{competition_id: (score, ayah_count)}`` to the user's totals.
+
+    Membership is checked in the same transaction as the update, so a
+    competition that ends or is left meanwhile can't take the points. Raises
+    ``NotJoined`` if any competition isn't open or joined; nothing is applied
+    then. Returns ``{competition_id: (total_score, total_ayah)}``.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rejected = sorted(set(deltas) - joined_competitions(user, deltas))
+        if rejected:
+            raise NotJoined(rejected)
+
+        existing = set(
+            CompetitionScore.objects.filter(user=user, competition_id__in=deltas)
+            .values_list('competition_id', flat=True)
+        )
+        missing = [pk for pk in deltas if pk not in existing]
+        if missing:
+            # A concurrent first submission may create the same rows
+            CompetitionScore.objects.bulk_create(
+                [CompetitionScore(competition_id=pk, user=user) for pk in missing],
+                ignore_conflicts=True
+            )
+
+        for pk, (score, ayah_count) in deltas.items():
+            CompetitionScore.objects.filter(competition_id=pk, user=user).update(
+                score=F('score') + score,
+                ayah_count=F('ayah_count') + ayah_count,
+                last_activity=now
+            )
+
+        # Submitted competition points also count on the global leaderboard
+        record_score(
+            user.id,
+            sum(score for score, _ in deltas.values()),
+            sum(ayah_count for _, ayah_count in deltas.values())
+        )
+
+        totals = {
+            pk: (score, ayah_count)
+            for pk, score, ayah_count in CompetitionScore.objects.filter(
+                user=user, competition_id__in=deltas
+            ).values_list('competition_id', 'score', 'ayah_count')
+        }
+
+    for pk in deltas:
+        invalidate_ranking(pk)
+    return totals
+
+
+def sum_deltas(items):
+    """Fold validated ``{competition, score, ayah_count}`` items per competition."""
+    deltas = defaultdict(lambda: [0, 0])
+    for item in items:
+        delta = deltas[item['competition']]
+        delta[0] += item['score']
+        delta[1] += item['ayah_count']
+    return {pk: tuple(delta) for pk, delta in deltas.items()}
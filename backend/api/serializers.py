@@ -1,7 +1,20 @@
 from rest_framework import serializers
+from . import quran
 from .models import Task, Progress, ReviewSchedule, Achievement, Competition, CompetitionScore
 
 
+def validate_ayah_range(surah, start_ayah=None, end_ayah=None):
+    """Check ``surah:start_ayah-end_ayah`` against the Quran metadata."""
+    if not quran.is_valid(surah):
+        raise serializers.ValidationError({'surah': 'رقم السورة غير صحيح'})
+    length = quran.surah_length(surah)
+    for field, ayah in (('start_ayah', start_ayah), ('end_ayah', end_ayah)):
+        if ayah is not None and not 1 <= ayah <= length:
+            raise serializers.ValidationError({field: f'رقم الآية يجب أن يكون بين 1 و {length}'})
+    if start_ayah is not None and end_ayah is not None and start_ayah > end_ayah:
+        raise serializers.ValidationError({'end_ayah': 'نطاق الآيات غير صحيح'})
+
+
 class TaskSerializer(serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
@@ -11,6 +24,20 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = '__all__'
         read_only_fields = ['user', 'created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        # Partial updates are checked against the stored values
+        def current(field):
+            if field in attrs:
+                return attrs[field]
+            return getattr(self.instance, field, None)
+        
+        surah, start_ayah, end_ayah = current('surah'), current('start_ayah'), current('end_ayah')
+        if surah is not None:
+            validate_ayah_range(surah, start_ayah, end_ayah)
+        elif start_ayah is not None or end_ayah is not None:
+            raise serializers.ValidationError({'surah': 'رقم السورة مطلوب مع أرقام الآيات'})
+        return attrs
 
 
 class ProgressSerializer(serializers.ModelSerializer):
@@ -18,13 +45,33 @@ class ProgressSerializer(serializers.ModelSerializer):
         model = Progress
         fields = '__all__'
         read_only_fields = ['user', 'completed_at']
+    
+    def validate_client_id(self, value):
+        # A blank key means no key, as in bulk ingestion; '' would collide on the unique constraint
+        return value or None
+    
+    def validate(self, attrs):
+        if not quran.is_valid(attrs['surah']):
+            raise serializers.ValidationError({'surah': 'رقم السورة غير صحيح'})
+        if not quran.is_valid(attrs['surah'], attrs['ayah']):
+            length = quran.surah_length(attrs['surah'])
+            raise serializers.ValidationError({'ayah': f'رقم الآية يجب أن يكون بين 1 و {length}'})
+        return attrs
 
 
 class ReviewScheduleSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReviewSchedule
         fields = '__all__'
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'review_count', 'last_reviewed']
+    
+    def validate(self, attrs):
+        validate_ayah_range(
+            attrs.get('surah', getattr(self.instance, 'surah', None)),
+            attrs.get('start_ayah', getattr(self.instance, 'start_ayah', None)),
+            attrs.get('end_ayah', getattr(self.instance, 'end_ayah', None)),
+        )
+        return attrs
 
 
 class AchievementSerializer(serializers.ModelSerializer):
@@ -43,9 +90,22 @@ class CompetitionScoreSerializer(serializers.ModelSerializer):
 
 class CompetitionSerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    scores = CompetitionScoreSerializer(many=True, read_only=True)
-    participants_count = serializers.IntegerField(source='participants.count', read_only=True)
+    # Annotated by the views; rankings are served by the leaderboard endpoint
+    participants_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Competition
-        fields = '__all__'
+        exclude = ['participants']
+
+
+class ScoreSubmissionSerializer(serializers.Serializer):
+    score = serializers.IntegerField(default=0)
+    ayah_count = serializers.IntegerField(default=0, min_value=0)
+
+
+class ScoreBatchItemSerializer(ScoreSubmissionSerializer):
+    competition = serializers.IntegerField()
+
+
+class ScoreBatchSerializer(serializers.Serializer):
+    scores = ScoreBatchItemSerializer(many=True, allow_empty=False, max_length=500)
@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    Task, Progress, ReviewSchedule, Achievement, Competition, CompetitionScore, SyncTombstone,
+    TeacherStudent
+)
+from . import (
+    achievements, activity, classes, conditional, coverage, dashboard, leaderboard, rankings, scheduler, sync
+)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Progress)
+def progress_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        activity.record_activity(instance.user_id, [(instance.completed_at, instance.type)])
+        scheduler.record_reviews(instance.user_id, [(instance.surah, instance.ayah, instance.type)])
+        leaderboard.record_progress(instance.user_id, [(instance.completed_at, instance.type)])
+        if instance.type == 'hifz':
+            coverage.mark_memorized(instance.user_id, [(instance.surah, instance.ayah)])
+    dashboard.invalidate_snapshot(instance.user_id)
+
+
+def _deleting_user(origin):
+    """Whether a delete is a user (or queryset of users) cascading to their rows."""
+    if isinstance(origin, QuerySet):
+        return origin.model is User
+    return isinstance(origin, User)
+
+
+@receiver(post_delete, sender=Progress)
+def progress_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_user(origin):
+        # The user's rollups are being cascaded away with them
+        return
+    activity.remove_activity(instance.user_id, [(instance.completed_at, instance.type)])
+    leaderboard.remove_progress(instance.user_id, [(instance.completed_at, instance.type)])
+    if instance.type == 'hifz':
+        coverage.unmark_memorized(instance.user_id, instance.surah, instance.ayah)
+    dashboard.invalidate_snapshot(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def user_rows_changed(sender, instance, **kwargs):
+    dashboard.invalidate_snapshot(instance.user_id)
+    if sender is Task:
+        conditional.invalidate_tasks(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Only finishing an open task counts: one created already completed was never worked on here
+    loaded = getattr(instance, '_loaded_status', None)
+    if not created and instance.status == 'completed' and loaded not in (None, 'completed'):
+        achievements.record_task_completed(instance.user_id, instance.pk)
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Competition)
+@receiver(post_delete, sender=Competition)
+def competition_changed(sender, instance, **kwargs):
+    conditional.invalidate_competitions()
+
+
+@receiver(m2m_changed, sender=Competition.participants.through)
+def competition_participants_changed(sender, action, **kwargs):
+    # participants_count is part of the cached competition payloads
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        conditional.invalidate_competitions()
+
+
+@receiver(post_save, sender=CompetitionScore)
+@receiver(post_delete, sender=CompetitionScore)
+def competition_score_changed(sender, instance, **kwargs):
+    rankings.invalidate_ranking(instance.competition_id)
+
+
+@receiver(post_save, sender=TeacherStudent)
+@receiver(post_delete, sender=TeacherStudent)
+def class_roster_changed(sender, instance, **kwargs):
+    classes.invalidate_roster(instance.teacher_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Names shown in teachers' class overviews are cached under the dashboard version
+    if not created:
+        dashboard.invalidate_snapshot(instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Progress)
+@receiver(post_delete, sender=ReviewSchedule)
+@receiver(post_delete, sender=Achievement)
+def synced_row_deleted(sender, instance, **kwargs):
+    sync.record_deletion(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Tombstones hold a bare user id, so they don't cascade
+    SyncTombstone.objects.filter(user_id=instance.pk).delete()
+    # Deleting a user drops their participations without m2m_changed
+    conditional.invalidate_competitions()
@@ -0,0 +1,42 @@
+"""
+Progress breakdowns by juz and page.
+
+Progress is grouped by ``(surah, ayah)`` in SQL, which yields at most 6236
+rows however long the history is; mapping those to juz and pages is then
+array indexing against ``api.quran``.
+"""
+from django.db.models import Count, Q
+
+from . import quran
+from .models import Progress
+
+
+def _empty(count):
+    return [{'hifz': 0, 'muraja': 0} for _ in range(count)]
+
+
+def progress_breakdown(user):
+    rows = (
+        Progress.objects.filter(user=user)
+        .order_by()
+        .values('surah', 'ayah')
+        .annotate(
+            hifz=Count('id', filter=Q(type='hifz')),
+            muraja=Count('id', filter=Q(type='muraja')),
+        )
+    )
+
+    juz = _empty(quran.JUZ_COUNT)
+    pages = _empty(quran.PAGE_COUNT)
+    for row in rows:
+        if not quran.is_valid(row['surah'], row['ayah']):
+            continue
+        global_id = quran.ayah_id(row['surah'], row['ayah'])
+        for bucket in (juz[quran.juz_of(global_id) - 1], pages[quran.page_of(global_id) - 1]):
+            bucket['hifz'] += row['hifz']
+            bucket['muraja'] += row['muraja']
+
+    return {
+        'juz': [{'juz': number, **counts} for number, counts in enumerate(juz, start=1)],
+        'pages': [{'page': number, **counts} for number, counts in enumerate(pages, start=1)],
+    }
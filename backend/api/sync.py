@@ -0,0 +1,132 @@
+"""
+Delta sync for the offline PWA.
+
+Each collection is read in ``(updated_at, id)`` order from a per-collection
+cursor, alongside the tombstones recorded for rows deleted since then, so
+a reconnecting client downloads only what changed.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task, Progress, ReviewSchedule, Achievement, SyncTombstone
+from .serializers import (
+    TaskSerializer, ProgressSerializer, ReviewScheduleSerializer, AchievementSerializer
+)
+
+COLLECTIONS = {
+    'tasks': (Task, TaskSerializer),
+    'progress': (Progress, ProgressSerializer),
+    'review_schedules': (ReviewSchedule, ReviewScheduleSerializer),
+    'achievements': (Achievement, AchievementSerializer),
+}
+COLLECTION_NAMES = {model: name for name, (model, _) in COLLECTIONS.items()}
+
+PAGE_SIZE = 500
+
+# Rows stamped just before a read may still be committing; never move a
+# cursor past this window so they are picked up next time.
+SETTLE_WINDOW = timedelta(seconds=2)
+
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    raw = json.dumps({
+        key: [value[0].isoformat(), value[1]] for key, value in position.items() if value
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``{'rows': (datetime, id) | None, 'deleted': (datetime, id) | None}``."""
+    position = {'rows': None, 'deleted': None}
+    if not cursor:
+        return position
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        for key in position:
+            if key in raw:
+                stamp, pk = raw[key]
+                stamp = datetime.fromisoformat(stamp)
+                if timezone.is_naive(stamp):
+                    # encode_cursor only writes aware times; a naive one can't be compared with them
+                    raise ValueError('naive timestamp')
+                position[key] = (stamp, int(pk))
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    return position
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    stamp, pk = position
+    return queryset.filter(Q(**{f'{field}__gt': stamp}) | Q(**{field: stamp, 'id__gt': pk}))
+
+
+def _page(queryset, field, position, horizon, limit):
+    """Up to ``limit`` rows after ``position`` and settled before ``horizon``."""
+    rows = list(
+        _after(queryset, field, position)
+        .filter(**{f'{field}__lt': horizon})
+        .order_by(field, 'id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = (getattr(rows[-1], field), rows[-1].id)
+    return rows, position, has_more
+
+
+def sync_collection(user, name, cursor, limit=PAGE_SIZE, now=None):
+    model, serializer_class = COLLECTIONS[name]
+    position = decode_cursor(cursor)
+    now = now or timezone.now()
+    horizon = now - SETTLE_WINDOW
+
+    # A cursor older than the retained tombstones may have missed deletions
+    reset = position['deleted'] is not None and position['deleted'][0] < now - TOMBSTONE_RETENTION
+    if reset:
+        position = {'rows': None, 'deleted': None}
+
+    rows, position['rows'], more_rows = _page(
+        model.objects.filter(user=user), 'updated_at', position['rows'], horizon, limit
+    )
+    if position['deleted'] is None:
+        # A fresh client holds nothing that could have been deleted
+        tombstones, more_deleted = [], False
+    else:
+        tombstones, position['deleted'], more_deleted = _page(
+            SyncTombstone.objects.filter(user_id=user.id, collection=name),
+            'deleted_at', position['deleted'], horizon, limit
+        )
+    if not more_deleted:
+        # Every settled tombstone has been seen; keep the cursor fresh
+        position['deleted'] = (horizon, 0)
+
+    return {
+        'updated': serializer_class(rows, many=True).data,
+        'deleted': [tombstone.object_id for tombstone in tombstones],
+        'cursor': encode_cursor(position),
+        'has_more': more_rows or more_deleted,
+        'reset': reset,
+    }
+
+
+def record_deletion(instance):
+    name = COLLECTION_NAMES[type(instance)]
+    SyncTombstone.objects.create(user_id=instance.user_id, collection=name, object_id=instance.pk)
+
+
+def prune_tombstones(now=None):
+    now = now or timezone.now()
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=now - TOMBSTONE_RETENTION).delete()
+    return deleted
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api import quran
+from api.achievements import process_batch
+from api.ingest import bulk_create_progress
+from api.models import (
+    Achievement, AchievementCounter, AchievementEvent, Progress, Task, UserActivitySummary
+)
+
+User = get_user_model()
+
+
+class AchievementRuleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student')
+
+    def process(self):
+        # Past the settle window, so everything written so far counts
+        with self.captureOnCommitCallbacks(execute=True):
+            return process_batch(now=timezone.now() + timedelta(minutes=1))
+
+    def codes(self, user=None):
+        return set(Achievement.objects.filter(user=user or self.user).values_list('code', flat=True))
+
+    def test_awards_once(self):
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+
+        self.assertEqual(self.process(), (1, 1))
+        self.assertEqual(self.codes(), {'first-hifz'})
+
+        Progress.objects.create(user=self.user, surah=1, ayah=2, type='hifz')
+        self.assertEqual(self.process(), (1, 0))
+        self.assertEqual(Achievement.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(AchievementCounter.objects.get(user=self.user, name='hifz').value, 2)
+
+    def test_unsettled_progress_waits(self):
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+
+        self.assertEqual(process_batch(), (0, 0))
+        self.assertEqual(self.process(), (1, 1))
+
+    def test_counters_accumulate_across_batches(self):
+        bulk_create_progress(self.user, [{'surah': 2, 'ayah': n, 'type': 'muraja'} for n in range(1, 201)])
+        self.process()
+        bulk_create_progress(self.user, [{'surah': 3, 'ayah': n, 'type': 'muraja'} for n in range(1, 201)])
+        bulk_create_progress(self.user, [{'surah': 4, 'ayah': n, 'type': 'muraja'} for n in range(1, 101)])
+        self.assertNotIn('muraja-500', self.codes())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_batch(batch_size=150, now=timezone.now() + timedelta(minutes=1))
+        self.assertNotIn('muraja-500', self.codes())
+        self.process()
+        self.assertEqual(self.codes(), {'muraja-500'})
+
+    def test_rules_read_rollups(self):
+        first, last = quran.juz_bounds(30)
+        bulk_create_progress(self.user, [
+            {'surah': surah, 'ayah': ayah, 'type': 'hifz'}
+            for surah, ayah in map(quran.ayah_ref, range(first, last + 1))
+        ])
+        UserActivitySummary.objects.filter(user=self.user).update(longest_streak=7)
+
+        self.process()
+
+        self.assertEqual(self.codes(), {'first-hifz', 'hifz-100', 'juz-amma', 'streak-7'})
+
+    def test_task_completions_are_queued(self):
+        tasks = [Task.objects.create(user=self.user, title=f'Task {n}') for n in range(9)]
+        for task in tasks:
+            task.status = 'completed'
+            task.save()
+        # Saving an already completed task again isn't another completion
+        task = Task.objects.get(pk=tasks[0].pk)
+        task.title = 'Renamed'
+        task.save()
+        self.assertEqual(AchievementEvent.objects.count(), 9)
+        self.process()
+        self.assertNotIn('tasks-10', self.codes())
+
+        task = Task.objects.create(user=self.user, title='Done')
+        task.status = 'completed'
+        task.save()
+        self.process()
+
+        self.assertEqual(self.codes(), {'tasks-10'})
+        self.assertFalse(AchievementEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_each_task_counts_once(self):
+        task = Task.objects.create(user=self.user, title='Toggled')
+        for _ in range(10):
+            task.status = 'completed'
+            task.save()
+            self.process()
+            task.status = 'pending'
+            task.save()
+        # Tasks created already completed were never completed here
+        for n in range(10):
+            Task.objects.create(user=self.user, title=f'Posted {n}', status='completed')
+        self.process()
+
+        self.assertEqual(AchievementCounter.objects.get(user=self.user, name='task_completed').value, 1)
+        self.assertNotIn('tasks-10', self.codes())
+
+    def test_only_affected_users_are_evaluated(self):
+        other = User.objects.create_user(username='other')
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='muraja')
+        Progress.objects.create(user=other, surah=1, ayah=1, type='hifz')
+
+        self.process()
+
+        self.assertEqual(self.codes(), set())
+        self.assertEqual(self.codes(other), {'first-hifz'})
+
+    def test_command_drains_backlog(self):
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+        Progress.objects.filter(user=self.user).update(updated_at=timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+
+        call_command('process_achievements', '--once', '--batch-size', '1', stdout=out)
+
+        self.assertIn('awarded 1', out.getvalue())
+        self.assertEqual(self.codes(), {'first-hifz'})
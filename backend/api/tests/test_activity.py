@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from api.activity import get_streaks
+from api.models import Progress, UserActivitySummary, UserDailyActivity
+
+User = get_user_model()
+
+
+class ActivityRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+        self.now = timezone.now()
+
+    def record(self, days_ago, type='hifz'):
+        with mock.patch('django.utils.timezone.now', return_value=self.now - timedelta(days=days_ago)):
+            return Progress.objects.create(user=self.user, surah=1, ayah=1, type=type)
+
+    def days(self):
+        return list(
+            UserDailyActivity.objects.filter(user=self.user).order_by('date')
+            .values_list('hifz_count', 'muraja_count', 'total_count', 'streak')
+        )
+
+    def summary(self):
+        summary = UserActivitySummary.objects.get(user=self.user)
+        return summary.current_streak, summary.longest_streak
+
+    def test_consecutive_days_extend_the_streak(self):
+        self.record(2)
+        self.record(1, type='muraja')
+        self.record(0)
+        self.record(0, type='muraja')
+
+        self.assertEqual(self.days(), [(1, 0, 1, 1), (0, 1, 1, 2), (1, 1, 2, 3)])
+        self.assertEqual(self.summary(), (3, 3))
+        self.assertEqual(get_streaks(self.user), (3, 3))
+
+    def test_a_past_day_filling_a_gap_rebuilds_the_streaks(self):
+        self.record(3)
+        self.record(1)
+        self.record(0)
+        self.assertEqual(self.summary(), (2, 2))
+
+        self.record(2)
+
+        self.assertEqual([day[3] for day in self.days()], [1, 2, 3, 4])
+        self.assertEqual(get_streaks(self.user), (4, 4))
+
+    def test_streak_lapses_without_activity_today(self):
+        self.record(2)
+        self.record(1)
+        self.assertEqual(get_streaks(self.user), (0, 2))
+
+    def test_deleting_decrements_the_day(self):
+        self.record(0)
+        progress = self.record(0, type='muraja')
+
+        progress.delete()
+
+        self.assertEqual(self.days(), [(1, 0, 1, 1)])
+        self.assertEqual(get_streaks(self.user), (1, 1))
+
+    def test_emptying_a_day_splits_the_streak(self):
+        self.record(2)
+        middle = self.record(1)
+        self.record(0)
+
+        middle.delete()
+
+        self.assertEqual([day[3] for day in self.days()], [1, 1])
+        self.assertEqual(get_streaks(self.user), (1, 1))
+
+    def test_deleting_everything_clears_the_rollup(self):
+        self.record(1).delete()
+
+        self.assertEqual(self.days(), [])
+        self.assertFalse(UserActivitySummary.objects.filter(user=self.user).exists())
+        self.assertEqual(get_streaks(self.user), (0, 0))
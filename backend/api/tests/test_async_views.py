@@ -0,0 +1,71 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import AsyncRequestFactory, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import async_views
+from api.models import Achievement, Progress, Task
+from authentication.jwt import tokens_for_user
+
+User = get_user_model()
+
+
+class AsyncAggregateViewTests(TransactionTestCase):
+    # The async views query from pool threads, which only see committed rows
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student')
+        Task.objects.create(user=self.user, title='Read', surah=1)
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+        Achievement.objects.create(user=self.user, title='أول آية', description='', icon='star')
+        self.header = f'Bearer {tokens_for_user(self.user).access_token}'
+
+    def call_async(self, view, url, **headers):
+        request = AsyncRequestFactory().get(url, headers={'Authorization': self.header, **headers})
+        return async_to_sync(view)(request)
+
+    def test_same_body_as_sync_views(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.header)
+        for view, name in [(async_views.dashboard_stats, 'dashboard'),
+                           (async_views.progress_stats, 'progress-stats')]:
+            expected = client.get(reverse(name)).content
+            cache.clear()
+            self.assertEqual(self.call_async(view, reverse(name)).content, expected)
+
+    def test_progress_stats_revalidates(self):
+        response = self.call_async(async_views.progress_stats, reverse('progress-stats'))
+        response = self.call_async(async_views.progress_stats, reverse('progress-stats'),
+                                   **{'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_requires_token(self):
+        self.header = 'Bearer invalid'
+        response = self.call_async(async_views.dashboard_stats, reverse('dashboard'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_cache_is_not_read_on_the_event_loop(self):
+        on_loop = []
+        methods = {name: getattr(caches['default'], name) for name in ('get', 'add', 'set', 'get_many')}
+
+        def spy(method):
+            def call(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(method.__name__)
+                except RuntimeError:
+                    pass
+                return method(*args, **kwargs)
+            return call
+
+        with mock.patch.multiple(caches['default'], **{name: spy(method) for name, method in methods.items()}):
+            for view, name in [(async_views.dashboard_stats, 'dashboard'),
+                               (async_views.progress_stats, 'progress-stats')]:
+                self.assertEqual(self.call_async(view, reverse(name)).status_code, 200)
+        self.assertEqual(on_loop, [])
@@ -0,0 +1,167 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.backup import export_lines, import_lines
+from api.models import (
+    Task, Progress, ReviewSchedule, Achievement, Competition, CompetitionScore,
+    MemorizationCoverage, UserActivitySummary
+)
+
+User = get_user_model()
+
+
+class BackupTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+
+        self.past = timezone.now() - timedelta(days=40)
+        Task.objects.create(user=self.user, title='Baqarah', surah=2, start_ayah=1, end_ayah=5)
+        for ayah in (1, 2, 3):
+            Progress.objects.create(user=self.user, surah=1, ayah=ayah, type='hifz',
+                                    client_id=f'device-{ayah}')
+        Progress.objects.filter(user=self.user).update(completed_at=self.past)
+        Achievement.objects.create(user=self.user, title='First', description='', icon='star')
+        self.competition = Competition.objects.create(
+            name='Ramadan', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        CompetitionScore.objects.create(competition=self.competition, user=self.user, score=12)
+
+    def export(self):
+        response = self.client.get(reverse('export'))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content)
+
+    def import_into(self, user, body):
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('import'), body, content_type='application/x-ndjson')
+
+    def test_export_streams_every_collection(self):
+        lines = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual(lines[0]['format'], 'quranreview-export')
+        collections = [line['collection'] for line in lines[1:]]
+        self.assertEqual(collections.count('progress'), 3)
+        self.assertEqual(collections.count('review_schedules'), 1)
+        self.assertEqual(set(collections), {
+            'tasks', 'progress', 'review_schedules', 'achievements', 'competition_scores'
+        })
+
+    def test_export_is_chunked(self):
+        chunks = list(export_lines(self.user, chunk_size=2))
+        # Header, then progress (3 rows) arrives as two pieces
+        self.assertEqual(len(chunks), 1 + 1 + 2 + 1 + 1 + 1)
+
+    def test_round_trip_restores_history_and_rollups(self):
+        body = self.export()
+        restored = User.objects.create_user(username='restored')
+
+        response = self.import_into(restored, body)
+        # Rollups are rebuilt by a background job
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('run_jobs', '--once', stdout=StringIO())
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['imported']['progress'], 3)
+        self.assertEqual(
+            list(Progress.objects.filter(user=restored).values_list('completed_at', flat=True)),
+            [self.past] * 3
+        )
+        self.assertEqual(Task.objects.get(user=restored).end_ayah, 5)
+        self.assertEqual(ReviewSchedule.objects.get(user=restored).end_ayah, 3)
+        self.assertEqual(MemorizationCoverage.objects.get(user=restored).ayah_count, 3)
+        self.assertEqual(UserActivitySummary.objects.get(user=restored).last_active_date,
+                         timezone.localtime(self.past).date())
+        # Scores and awards are server-authoritative and never imported
+        self.assertEqual(response.data['skipped']['competition_scores'], 1)
+        self.assertFalse(CompetitionScore.objects.filter(user=restored).exists())
+        self.assertFalse(self.competition.participants.filter(pk=restored.pk).exists())
+        self.assertFalse(Achievement.objects.filter(user=restored).exists())
+
+    def test_reimport_skips_known_records(self):
+        body = self.export()
+
+        response = self.import_into(self.user, body)
+
+        self.assertEqual(response.data['skipped']['progress'], 3)
+        self.assertEqual(response.data['skipped']['competition_scores'], 1)
+        self.assertEqual(Progress.objects.filter(user=self.user).count(), 3)
+
+    def test_forged_scores_and_awards_are_ignored(self):
+        forged = [
+            {'collection': 'competition_scores', 'data': {
+                'competition_id': self.competition.pk, 'score': 999999999, 'ayah_count': 0,
+                'last_activity': self.past.isoformat(),
+            }},
+            {'collection': 'achievements', 'data': {
+                'title': 'ختمة', 'description': '', 'icon': 'crown', 'code': 'khatma',
+                'earned_at': self.past.isoformat(),
+            }},
+        ]
+        header = self.export().splitlines()[0]
+        stranger = User.objects.create_user(username='stranger')
+
+        response = self.import_into(stranger, b'\n'.join([header] + [json.dumps(line).encode() for line in forged]))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported']['competition_scores'], 0)
+        self.assertFalse(CompetitionScore.objects.filter(user=stranger).exists())
+        self.assertFalse(self.competition.participants.filter(pk=stranger.pk).exists())
+        self.assertFalse(Achievement.objects.filter(user=stranger).exists())
+
+    def test_invalid_line_rolls_back(self):
+        lines = self.export().splitlines()
+        bad = json.dumps({'collection': 'progress', 'data': {
+            'surah': 1, 'ayah': 99, 'type': 'hifz', 'accuracy': 0, 'duration': 0,
+            'client_id': None, 'completed_at': self.past.isoformat(),
+        }}).encode()
+        restored = User.objects.create_user(username='restored')
+
+        response = self.import_into(restored, b'\n'.join(lines[:3] + [bad] + lines[3:]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 4', response.data['error'])
+        self.assertFalse(Task.objects.filter(user=restored).exists())
+
+    def test_upload_is_read_outside_any_transaction(self):
+        lines = self.export().splitlines(keepends=True)
+        restored = User.objects.create_user(username='restored')
+        outside = len(connection.atomic_blocks)
+        depths = []
+
+        def upload():
+            for line in lines:
+                # A transaction open here would hold the write lock while the client sends
+                depths.append(len(connection.atomic_blocks))
+                yield line
+
+        with self.captureOnCommitCallbacks(execute=True):
+            imported, _ = import_lines(restored, upload(), chunk_size=2)
+        self.assertEqual(imported['progress'], 3)
+        self.assertEqual(set(depths), {outside})
+
+    def test_rejects_oversized_exports(self):
+        restored = User.objects.create_user(username='restored')
+        with mock.patch('api.backup.IMPORT_MAX_BYTES', 200):
+            response = self.import_into(restored, self.export())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('larger than', response.data['error'])
+        self.assertFalse(Task.objects.filter(user=restored).exists())
+
+    def test_rejects_other_formats(self):
+        response = self.import_into(self.user, b'{"hello": "world"}\n')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.management.commands.bench_endpoints import CASES, _route_names
+from api.models import MemorizationCoverage, Progress, ReviewSchedule, Task, UserDailyActivity
+
+User = get_user_model()
+
+
+class GenerateDataTests(TestCase):
+    def test_generates_requested_shape(self):
+        call_command('generate_data', users=3, tasks=4, progress=100, schedules=2,
+                     competitions=1, competition_pool=2, stdout=StringIO())
+
+        users = User.objects.filter(username__startswith='synthetic-')
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(Task.objects.filter(user__in=users).count(), 12)
+        self.assertEqual(Progress.objects.filter(user__in=users).count(), 300)
+        self.assertEqual(ReviewSchedule.objects.filter(user__in=users).count(), 6)
+        self.assertEqual(MemorizationCoverage.objects.filter(user__in=users).count(), 3)
+        self.assertTrue(UserDailyActivity.objects.filter(user__in=users).exists())
+
+
+class BenchEndpointsTests(TestCase):
+    def test_every_route_has_a_case(self):
+        self.assertEqual(_route_names() - {case[1] for case in CASES}, set())
+
+    def test_runs_against_generated_data(self):
+        call_command('generate_data', users=1, progress=50, stdout=StringIO())
+        cache.set('kept', 1)
+        out = StringIO()
+        call_command('bench_endpoints', iterations=1, only=['dashboard', 'logout'], stdout=out)
+        self.assertIn('dashboard', out.getvalue())
+        # Cold runs clear a private cache, not the one the app serves from
+        self.assertEqual(cache.get('kept'), 1)
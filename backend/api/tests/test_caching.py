@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.caching import bump_version, get_version, get_versions
+
+
+class VersionCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_moves_the_version(self):
+        before = get_version('scope')
+        self.assertEqual(get_versions(['scope']), {'scope': before})
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version('scope')
+        self.assertNotEqual(get_version('scope'), before)
+
+    @override_settings(CACHE_VERSION_TIMEOUT=10)
+    def test_counters_lapse_after_the_timeout(self):
+        # Per-process caches never see another worker's bump; expiry re-seeds instead
+        with mock.patch('time.time', return_value=1000.0):
+            before = get_version('scope')
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_version('scope')
+            bumped = get_version('scope')
+        with mock.patch('time.time', return_value=1011.0):
+            self.assertNotIn(get_version('scope'), (before, bumped))
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Progress, Task, TeacherStudent
+
+User = get_user_model()
+
+
+class ClassOverviewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', role='teacher')
+        self.students = [User.objects.create_user(username=f'student-{i}') for i in range(3)]
+        TeacherStudent.objects.bulk_create([
+            TeacherStudent(teacher=self.teacher, student=student, accepted_at=timezone.now())
+            for student in self.students
+        ])
+        self.client.force_authenticate(self.teacher)
+
+    def overview(self):
+        response = self.client.get(reverse('my-students'))
+        self.assertEqual(response.status_code, 200)
+        return {row['username']: row for row in response.data}
+
+    def test_overview_summarises_each_student(self):
+        first = self.students[0]
+        Progress.objects.create(user=first, surah=1, ayah=1, type='hifz')
+        Progress.objects.create(user=first, surah=1, ayah=2, type='hifz')
+        Task.objects.create(user=first, title='Read', status='pending')
+        Task.objects.create(user=first, title='Done', status='completed')
+
+        row = self.overview()['student-0']
+
+        self.assertEqual(row['memorized'], 2)
+        self.assertEqual(row['streak'], 1)
+        self.assertEqual(row['pending_tasks'], 1)
+        self.assertEqual(row['last_activity'], timezone.localdate())
+        self.assertEqual(self.overview()['student-1']['memorized'], 0)
+
+    def test_query_count_does_not_grow_with_class_size(self):
+        with self.assertNumQueries(3):
+            self.overview()
+
+        cache.clear()
+        more = [User.objects.create_user(username=f'extra-{i}') for i in range(20)]
+        TeacherStudent.objects.bulk_create([
+            TeacherStudent(teacher=self.teacher, student=student, accepted_at=timezone.now())
+            for student in more
+        ])
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.overview()), 23)
+
+    def test_cached_until_a_student_writes(self):
+        self.overview()
+        with self.assertNumQueries(0):
+            self.overview()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.objects.create(user=self.students[2], surah=2, ayah=1, type='hifz')
+        self.assertEqual(self.overview()['student-2']['memorized'], 1)
+
+    def test_roster_changes(self):
+        newcomer = User.objects.create_user(username='newcomer')
+        self.overview()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('my-students'), {'username': 'newcomer'})
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data['accepted'])
+        self.assertNotIn('newcomer', self.overview())
+
+        self.client.force_authenticate(newcomer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(reverse('my-teacher-detail', args=[self.teacher.pk])).status_code, 200)
+        self.client.force_authenticate(self.teacher)
+        self.assertIn('newcomer', self.overview())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('my-student-detail', args=[newcomer.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn('newcomer', self.overview())
+
+    def test_student_progress_only_for_own_students(self):
+        Task.objects.create(user=self.students[0], title='Later', status='pending',
+                            due_date=timezone.localdate() + timedelta(days=3))
+        Task.objects.create(user=self.students[0], title='Soon', status='in_progress',
+                            due_date=timezone.localdate())
+
+        response = self.client.get(reverse('student-progress', args=[self.students[0].pk]))
+        self.assertEqual(response.data['student']['pending_tasks'], 2)
+        self.assertEqual([task['title'] for task in response.data['tasks']], ['Soon', 'Later'])
+
+        stranger = User.objects.create_user(username='stranger')
+        response = self.client.get(reverse('student-progress', args=[stranger.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_invitations_need_the_students_consent(self):
+        invited = User.objects.create_user(username='invited')
+        self.client.post(reverse('my-students'), {'student': invited.pk})
+
+        response = self.client.get(reverse('student-progress', args=[invited.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        self.client.force_authenticate(invited)
+        teachers = self.client.get(reverse('my-teachers')).data
+        self.assertEqual([(t['username'], t['accepted']) for t in teachers], [('teacher', False)])
+        self.assertEqual(self.client.post(reverse('my-teacher-detail', args=[self.students[0].pk])).status_code, 404)
+        self.assertEqual(self.client.delete(reverse('my-teacher-detail', args=[self.teacher.pk])).status_code, 204)
+        self.assertFalse(TeacherStudent.objects.filter(student=invited).exists())
+
+    def test_students_cannot_see_classes(self):
+        self.client.force_authenticate(self.students[0])
+        self.assertEqual(self.client.get(reverse('my-students')).status_code, 403)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Competition, Progress, Task
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+
+    def revalidate(self, url):
+        """First response's ETag and the status of an immediate conditional repeat."""
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return etag, response
+
+    def test_task_list_not_modified_until_write(self):
+        Task.objects.create(user=self.user, title='Read', surah=1)
+        etag, response = self.revalidate(reverse('task-list'))
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task-list'), {'title': 'More', 'surah': 2}, format='json')
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_filters_have_their_own_etag(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        response = self.client.get(reverse('task-list') + '?status=pending', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_progress_stats_not_modified_until_progress(self):
+        etag, response = self.revalidate(reverse('progress-stats'))
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+        response = self.client.get(reverse('progress-stats'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['total_hifz'], 1)
+
+    def test_competitions_cached_until_changed(self):
+        competition = Competition.objects.create(
+            name='Ramadan', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        self.client.get(reverse('competition-list'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('competition-list'))
+        etag, response = self.revalidate(reverse('competition-detail', args=[competition.pk]))
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('competition-join', args=[competition.pk]))
+        response = self.client.get(reverse('competition-detail', args=[competition.pk]),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['participants_count'], 1)
+        self.assertEqual(self.client.get(reverse('competition-list')).data[0]['participants_count'], 1)
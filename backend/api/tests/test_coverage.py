@@ -0,0 +1,75 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api import quran
+from api.coverage import (
+    get_bits, mark_memorized, rebuild_coverage, remaining_in_range, surah_completion, to_int
+)
+from api.ingest import bulk_create_progress
+from api.models import MemorizationCoverage, Progress
+
+User = get_user_model()
+
+
+class CoverageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+
+    def test_progress_updates_bitmap(self):
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+        Progress.objects.create(user=self.user, surah=1, ayah=1, type='hifz')
+        Progress.objects.create(user=self.user, surah=1, ayah=2, type='muraja')
+        bulk_create_progress(self.user, [{'surah': 114, 'ayah': 6, 'type': 'hifz'}])
+
+        coverage = MemorizationCoverage.objects.get(user=self.user)
+        self.assertEqual(coverage.ayah_count, 2)
+        self.assertEqual(to_int(coverage.bitmap), 1 | 1 << (quran.AYAH_COUNT - 1))
+
+    def test_delete_clears_bit_after_last_record(self):
+        first = Progress.objects.create(user=self.user, surah=2, ayah=5, type='hifz')
+        second = Progress.objects.create(user=self.user, surah=2, ayah=5, type='hifz')
+
+        first.delete()
+        self.assertEqual(get_bits(self.user).bit_count(), 1)
+        second.delete()
+        self.assertEqual(get_bits(self.user), 0)
+
+    def test_counts_and_remaining(self):
+        mark_memorized(self.user.id, [(1, ayah) for ayah in range(1, 8)] + [(2, 2), (2, 3), (2, 7)])
+        bits = get_bits(self.user)
+
+        completion = surah_completion(bits)
+        self.assertEqual(completion[0], {'surah': 1, 'memorized': 7, 'total': 7})
+        self.assertEqual(completion[1]['memorized'], 3)
+        self.assertEqual(remaining_in_range(bits, 2, 1, 10), [[1, 1], [4, 6], [8, 10]])
+        self.assertEqual(remaining_in_range(bits, 1, 1, 7), [])
+
+    def test_rebuild_matches_incremental(self):
+        for surah, ayah in [(3, 1), (3, 2), (50, 10)]:
+            Progress.objects.create(user=self.user, surah=surah, ayah=ayah, type='hifz')
+        expected = get_bits(self.user)
+        MemorizationCoverage.objects.all().delete()
+
+        self.assertEqual(rebuild_coverage(Progress.objects.all()), 1)
+        self.assertEqual(get_bits(self.user), expected)
+
+
+class CoverageViewTests(APITestCase):
+    def test_coverage_endpoint(self):
+        user = User.objects.create_user(username='student')
+        mark_memorized(user.id, [(1, 1), (1, 2)])
+        self.client.force_authenticate(user)
+
+        response = self.client.get(reverse('progress-coverage'), {'range': '1:1-7'})
+
+        self.assertEqual(response.data['ayah_count'], 2)
+        self.assertEqual(base64.b64decode(response.data['bitmap'])[0], 0b11)
+        self.assertEqual(response.data['remaining'], [[3, 7]])
+        self.assertEqual(len(response.data['juz']), quran.JUZ_COUNT)
+
+        response = self.client.get(reverse('progress-coverage'), {'range': '1:5-300'})
+        self.assertEqual(response.status_code, 400)
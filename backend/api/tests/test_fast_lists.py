@@ -0,0 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import views
+from api.models import Progress, Task
+from api.pagination import ProgressCursorPagination, TaskCursorPagination
+from api.renderers import FastJSONRenderer
+from api.serializers import ProgressSerializer, TaskSerializer
+
+User = get_user_model()
+
+
+class DRFTaskList(generics.ListAPIView):
+    """The list view as it was before the projection, for comparison."""
+    serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
+    get_queryset = views.TaskListCreateView.get_queryset
+
+
+class DRFProgressList(generics.ListAPIView):
+    serializer_class = ProgressSerializer
+    pagination_class = ProgressCursorPagination
+    get_queryset = views.ProgressListCreateView.get_queryset
+
+
+class FastListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student')
+        today = timezone.localdate()
+        Task.objects.bulk_create([
+            Task(user=cls.user, title=f'مراجعة سورة {i}', description='line break' if i % 5 == 0 else '',
+                 type=['hifz', 'muraja', 'tilawa'][i % 3], priority=['high', 'medium', 'low'][i % 3],
+                 status=['pending', 'in_progress', 'completed', 'cancelled'][i % 4],
+                 surah=i % 114 + 1 if i % 7 else None, start_ayah=1 if i % 7 else None,
+                 due_date=today + timedelta(days=i) if i % 2 else None,
+                 completed_at=timezone.now() if i % 4 == 2 else None)
+            for i in range(120)
+        ])
+        Progress.objects.bulk_create([
+            Progress(user=cls.user, surah=2, ayah=i + 1, type='hifz' if i % 2 else 'muraja',
+                     accuracy=i % 100, client_id=f'c-{i}' if i % 3 else None)
+            for i in range(250)
+        ])
+
+    def assertSameBytes(self, fast_view, drf_view, query=''):
+        factory = APIRequestFactory()
+        responses = []
+        for view in (fast_view, drf_view):
+            request = factory.get('/list/' + query)
+            force_authenticate(request, self.user)
+            responses.append(view(request).render().content)
+        self.assertEqual(responses[0], responses[1])
+        return responses[0]
+
+    def test_task_list_matches_serializer_output(self):
+        fast = views.TaskListCreateView.as_view()
+        body = self.assertSameBytes(fast, DRFTaskList.as_view())
+        self.assertIn('مراجعة'.encode(), body)
+        self.assertIn(b'\\u2028', body)
+        self.assertSameBytes(fast, DRFTaskList.as_view(), '?status=pending&ordering=created_at&page_size=7')
+
+    def test_progress_list_matches_serializer_output(self):
+        self.assertSameBytes(views.ProgressListCreateView.as_view(), DRFProgressList.as_view(), '?page_size=1000')
+
+    def test_renderer_falls_back_to_json(self):
+        data = {'when': timezone.now(), 'day': timezone.localdate(), 'text': 'آية', 1: None}
+        expected = JSONRenderer().render(data)
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+        with mock.patch('api.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), expected)
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api import jobs, rankings, scoring
+from api.finalization import finalize_expired
+from api.models import Competition, CompetitionResult, CompetitionScore
+
+User = get_user_model()
+
+
+class CompetitionFinalizationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        rankings._final_rankings.clear()
+        self.users = [User.objects.create_user(username=name) for name in ('alice', 'bob', 'carol')]
+        self.client.force_authenticate(self.users[1])
+        self.competition = Competition.objects.create(
+            name='Ramadan', description='', start_date=timezone.now() - timedelta(days=30),
+            end_date=timezone.now() + timedelta(hours=1)
+        )
+        self.competition.participants.add(*self.users)
+        CompetitionScore.objects.bulk_create([
+            CompetitionScore(competition=self.competition, user=user, score=score)
+            for user, score in zip(self.users, (10, 30, 10))
+        ])
+
+    def end(self):
+        Competition.objects.filter(pk=self.competition.pk).update(end_date=timezone.now() - timedelta(minutes=1))
+
+    def finalize(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return finalize_expired()
+
+    def test_ended_competitions_refuse_scores(self):
+        self.end()
+
+        response = self.client.post(reverse('competition-score', args=[self.competition.pk]),
+                                    {'score': 5}, format='json')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse('competition-score-batch'),
+                                    {'scores': [{'competition': self.competition.pk, 'score': 5}]}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.post(reverse('competition-join', args=[self.competition.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('competition-list')).data, [])
+
+    def test_batch_is_refused_if_any_competition_is_not_joined(self):
+        other = Competition.objects.create(
+            name='Shawwal', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        outside = len(connection.atomic_blocks)
+        depths = []
+
+        def joined(user, competition_ids):
+            depths.append(len(connection.atomic_blocks))
+            return joined_competitions(user, competition_ids)
+
+        joined_competitions = scoring.joined_competitions
+        with mock.patch('api.scoring.joined_competitions', side_effect=joined):
+            response = self.client.post(reverse('competition-score-batch'), {'scores': [
+                {'competition': self.competition.pk, 'score': 5},
+                {'competition': other.pk, 'score': 5},
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['competitions'], [other.pk])
+        self.assertEqual(CompetitionScore.objects.get(competition=self.competition, user=self.users[1]).score, 30)
+        # Checked in the transaction that applies the deltas
+        self.assertEqual(depths, [outside + 1])
+
+    def test_cached_list_drops_competitions_as_they_end(self):
+        self.assertEqual(len(self.client.get(reverse('competition-list')).data), 1)
+
+        later = timezone.now() + timedelta(hours=2)
+        with mock.patch('django.utils.timezone.now', return_value=later), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('competition-list'))
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(self.client.get(reverse('competition-list')).data, [])
+
+    def test_snapshot_is_ranked_once(self):
+        self.assertEqual(self.finalize(), 0)
+        self.end()
+
+        self.assertEqual(self.finalize(), 1)
+        self.assertEqual(self.finalize(), 0)
+
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.status, 'completed')
+        self.assertIsNotNone(self.competition.finalized_at)
+        self.assertEqual(
+            list(CompetitionResult.objects.filter(competition=self.competition)
+                 .order_by('rank', 'user_id').values_list('username', 'rank', 'score')),
+            [('bob', 1, 30), ('alice', 2, 10), ('carol', 2, 10)]
+        )
+
+    def test_finished_competitions_read_the_snapshot(self):
+        self.end()
+        self.finalize()
+        # Later changes to live scores don't move a finished ranking
+        CompetitionScore.objects.filter(user=self.users[0]).update(score=100)
+
+        response = self.client.get(reverse('competition-leaderboard', args=[self.competition.pk]))
+        self.assertTrue(response.data['final'])
+        self.assertEqual([entry['username'] for entry in response.data['top']], ['bob', 'alice', 'carol'])
+        self.assertEqual(response.data['me']['rank'], 1)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('competition-leaderboard', args=[self.competition.pk]))
+
+        detail = self.client.get(reverse('competition-detail', args=[self.competition.pk])).data
+        self.assertEqual(detail['status'], 'completed')
+        self.assertEqual(detail['results'][0]['score'], 30)
+
+    def test_participants_count_includes_members_without_scores(self):
+        self.competition.participants.add(User.objects.create_user(username='dave'))
+        response = self.client.get(reverse('competition-leaderboard', args=[self.competition.pk]))
+        self.assertEqual(response.data['participants_count'], 4)
+        self.assertEqual(len(response.data['top']), 3)
+
+    def test_cached_rankings_are_bounded(self):
+        self.end()
+        self.finalize()
+        with mock.patch.object(rankings, 'MAX_RANKINGS', 2):
+            for competition_id in (self.competition.pk, -1, -2):
+                rankings.get_final_ranking(competition_id)
+        self.assertEqual(list(rankings._final_rankings), [-1, -2])
+
+    def test_command_and_job(self):
+        self.end()
+        jobs.enqueue('finalize_competitions')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(jobs.work(), (1, 0))
+        self.assertTrue(CompetitionResult.objects.exists())
+
+        out = StringIO()
+        call_command('finalize_competitions', stdout=out)
+        self.assertIn('Finalized 0 competitions', out.getvalue())
+
+    def test_command_polls_with_an_interval(self):
+        self.end()
+        out = StringIO()
+        with mock.patch('time.sleep', side_effect=KeyboardInterrupt), \
+                self.captureOnCommitCallbacks(execute=True):
+            call_command('finalize_competitions', interval=60, stdout=out)
+        self.assertIn('Finalized 1 competitions', out.getvalue())
@@ -0,0 +1,128 @@
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import jobs
+from api.metrics import get_store, render_prometheus
+from api.models import Job
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def explode():
+    raise RuntimeError('boom')
+
+
+def slow():
+    time.sleep(0.2)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(METRICS_PATH=Path(directory.name) / 'metrics.bin')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        handlers = mock.patch.dict(jobs.HANDLERS, {'record': record, 'explode': explode, 'slow': slow})
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def test_runs_due_jobs_in_order(self):
+        jobs.enqueue('record', {'value': 1})
+        jobs.enqueue('record', {'value': 2})
+        jobs.enqueue('record', {'value': 3}, delay=timedelta(minutes=5))
+
+        self.assertEqual(jobs.work(), (2, 0))
+
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(Job.objects.filter(status='done').count(), 2)
+        self.assertEqual(Job.objects.get(status='queued').payload, {'value': 3})
+
+    def test_enqueue_rolls_back_with_the_request(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            jobs.enqueue('record', {'value': 1})
+            raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+        with self.assertRaises(ValueError):
+            jobs.enqueue('unknown')
+
+    def test_claims_do_not_overlap(self):
+        for value in range(5):
+            jobs.enqueue('record', {'value': value})
+
+        first = jobs.claim(batch_size=3)
+        second = jobs.claim(batch_size=3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(jobs.claim(), [])
+
+    def test_failures_back_off_then_fail(self):
+        job = jobs.enqueue('explode', max_attempts=2)
+
+        self.assertEqual(jobs.work(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + jobs.BACKOFF_BASE - timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        jobs.work()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertEqual(jobs.backoff(20), jobs.BACKOFF_MAX)
+
+    def test_stale_locks_are_requeued(self):
+        job = jobs.enqueue('record', {'value': 1})
+        jobs.claim()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2)
+
+        self.assertEqual(jobs.work(), (1, 0))
+        self.assertEqual(calls, [1])
+
+    def test_running_jobs_keep_their_lock(self):
+        job = jobs.enqueue('slow')
+        with mock.patch.object(jobs, 'HEARTBEAT_INTERVAL', timedelta(milliseconds=20)), \
+                mock.patch.object(jobs, 'touch') as touch:
+            self.assertEqual(jobs.work(), (1, 0))
+        self.assertGreater(touch.call_count, 1)
+        self.assertEqual(touch.call_args.args[0].pk, job.pk)
+
+        # A beat refreshes the lock only while this worker still holds it
+        claimed = jobs.enqueue('record', {'value': 1})
+        [claimed] = jobs.claim()
+        Job.objects.filter(pk=claimed.pk).update(locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2)
+        self.assertEqual(jobs.touch(claimed), 1)
+        self.assertEqual(jobs.requeue_stale(), 0)
+        Job.objects.filter(pk=claimed.pk).update(locked_by='another-worker')
+        self.assertEqual(jobs.touch(claimed), 0)
+
+    def test_metrics(self):
+        jobs.enqueue('record', {'value': 1})
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=30))
+
+        body = render_prometheus({})
+        self.assertIn('quranreview_jobs{kind="record",status="queued"} 1', body)
+        self.assertRegex(body, r'quranreview_job_wait_seconds\{kind="record"\} 3\d\.')
+
+        jobs.work()
+        self.assertIn(('JOB', 'record'), get_store().snapshot())
+
+    def test_prune_keeps_recent_jobs(self):
+        jobs.enqueue('record', {'value': 1})
+        jobs.work()
+        self.assertEqual(jobs.prune(), 0)
+        self.assertEqual(jobs.prune(timezone.now() + jobs.RETENTION * 2), 1)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api import leaderboard
+from api.ingest import bulk_create_progress
+from api.models import Competition, LeaderboardDay, LeaderboardTotal, Progress
+
+User = get_user_model()
+
+
+@override_settings(LEADERBOARD_REFRESH_SECONDS=0)
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Boards loaded by earlier tests could still be inside the refresh window
+        leaderboard._boards.clear()
+        self.alice = User.objects.create_user(username='alice')
+        self.bob = User.objects.create_user(username='bob')
+        self.client.force_authenticate(self.bob)
+
+    def board(self, window='all'):
+        response = self.client.get(reverse('leaderboard'), {'window': window})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def backdate(self, user, days):
+        progress = Progress.objects.create(user=user, surah=1, ayah=1, type='hifz')
+        Progress.objects.filter(pk=progress.pk).update(completed_at=timezone.now() - timedelta(days=days))
+        # The signal credited today; move the points to the backdated day
+        call_command('rebuild_leaderboard', stdout=StringIO())
+
+    def test_points_accumulate_on_write(self):
+        Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+        bulk_create_progress(self.bob, [{'surah': 1, 'ayah': n, 'type': 'muraja'} for n in (1, 2, 3)])
+
+        data = self.board()
+
+        self.assertEqual([(e['username'], e['score'], e['rank']) for e in data['leaderboard']],
+                         [('bob', 3, 1), ('alice', 2, 2)])
+        self.assertEqual(data['me']['rank'], 1)
+        self.assertEqual(LeaderboardTotal.objects.get(user=self.bob).ayah_count, 3)
+
+    def test_delete_takes_points_back(self):
+        progress = Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+        progress.delete()
+        self.assertEqual(self.board()['leaderboard'], [])
+
+    def test_deleting_a_user_with_progress(self):
+        Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+
+        self.alice.delete()
+
+        self.assertFalse(LeaderboardDay.objects.exists())
+        self.assertFalse(LeaderboardTotal.objects.exists())
+
+    def test_removal_never_creates_rows(self):
+        progress = Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+        LeaderboardDay.objects.all().delete()
+        LeaderboardTotal.objects.all().delete()
+
+        progress.delete()
+
+        self.assertFalse(LeaderboardDay.objects.exists())
+        self.assertFalse(LeaderboardTotal.objects.exists())
+
+    def test_competition_scores_count(self):
+        competition = Competition.objects.create(
+            name='Ramadan', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        competition.participants.add(self.bob)
+        self.client.post(reverse('competition-score', args=[competition.pk]),
+                         {'score': 7, 'ayah_count': 2}, format='json')
+
+        self.assertEqual(self.board('week')['me']['score'], 7)
+
+    def test_windows(self):
+        self.backdate(self.alice, 3)
+        self.backdate(self.bob, 20)
+
+        self.assertEqual([e['username'] for e in self.board('week')['leaderboard']], ['alice'])
+        self.assertEqual(len(self.board('month')['leaderboard']), 2)
+        self.assertIsNone(self.board('week')['me'])
+        self.assertEqual(self.client.get(reverse('leaderboard'), {'window': 'year'}).status_code, 400)
+
+    def test_rebuild_matches_incremental(self):
+        Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+        Progress.objects.create(user=self.alice, surah=1, ayah=2, type='muraja')
+        incremental = list(LeaderboardDay.objects.values_list('user_id', 'date', 'points', 'ayah_count'))
+
+        LeaderboardTotal.objects.update(points=0)
+        call_command('rebuild_leaderboard', stdout=StringIO())
+
+        self.assertEqual(list(LeaderboardDay.objects.values_list('user_id', 'date', 'points', 'ayah_count')),
+                         incremental)
+        self.assertEqual(LeaderboardTotal.objects.get(user=self.alice).points, 3)
+
+    @override_settings(LEADERBOARD_REFRESH_SECONDS=60)
+    def test_reload_is_rate_limited(self):
+        self.board()
+        Progress.objects.create(user=self.alice, surah=1, ayah=1, type='hifz')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.board()['leaderboard'], [])
@@ -0,0 +1,95 @@
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.metrics import BUCKETS, MetricsStore, get_store
+from api.profiling import ProfilingMiddleware
+from authentication.jwt import tokens_for_user
+
+User = get_user_model()
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'metrics.bin'
+        settings_override = override_settings(METRICS_PATH=self.path, METRICS_TOKEN='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+
+
+class ProfilingMiddlewareTests(MetricsTestCase):
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('dashboard'))
+
+        phases = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        self.assertEqual(phases, ['sql', 'auth', 'app', 'render', 'total'])
+        self.assertRegex(response['Server-Timing'], r'sql;dur=[\d.]+;desc="\d+ queries"')
+
+    def test_async_requests_count_pool_thread_queries(self):
+        def query():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        async def view(request):
+            # Off the request's thread, on connections the request never touched
+            await sync_to_async(query, thread_sensitive=False)()
+            await sync_to_async(query, thread_sensitive=False)()
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertIn(('GET', 'unmatched'), get_store().snapshot())
+
+    def test_requests_aggregate_per_route(self):
+        for _ in range(3):
+            self.client.get(reverse('task-detail', args=[1]))
+        self.client.get(reverse('dashboard'))
+
+        rows = get_store().snapshot()
+        self.assertIn(('GET', 'api/tasks/<int:pk>/'), rows)
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            body = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret').content.decode()
+        self.assertIn(
+            'quranreview_request_duration_seconds_count{method="GET",route="api/tasks/<int:pk>/"} 3',
+            body
+        )
+        self.assertIn('quranreview_request_phase_seconds_total{method="GET",route="api/dashboard/",phase="sql"}', body)
+
+    def test_workers_share_the_file(self):
+        # A second mapping stands in for another gunicorn worker
+        other = MetricsStore(self.path)
+        other.record('GET', 'api/sync/', 0.02, 4, {'sql': 0.01})
+        get_store().record('GET', 'api/sync/', 0.2, 2, {'sql': 0.001})
+
+        counters = other.snapshot()[('GET', 'api/sync/')]
+        self.assertEqual(sum(counters[:len(BUCKETS) + 1]), 2)
+
+    def test_token_guards_endpoint(self):
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+            self.assertEqual(response.status_code, 200)
+
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        header = f'Bearer {tokens_for_user(self.user).access_token}'
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION=header).status_code, 200)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
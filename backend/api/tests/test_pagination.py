@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Task
+
+User = get_user_model()
+
+
+class TaskCursorTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        Task.objects.bulk_create([
+            Task(user=self.user, title=f'Task {i}', priority=['high', 'low'][i % 2],
+                 due_date=today + timedelta(days=i) if i % 3 else None)
+            for i in range(7)
+        ])
+
+    def follow(self, query):
+        titles = []
+        url = reverse('task-list') + query
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            titles += [task['title'] for task in response.data['results']]
+            url = response.data['next']
+        return titles
+
+    def test_every_page_followed_once(self):
+        newest_first = self.follow('?page_size=2')
+        self.assertEqual(sorted(newest_first), sorted(f'Task {i}' for i in range(7)))
+        self.assertEqual(self.follow('?ordering=created_at&page_size=2'), newest_first[::-1])
+
+    def test_unstable_orderings_are_refused(self):
+        # Null due dates and repeated priorities can't anchor a cursor
+        for ordering in ('due_date', 'priority', 'title'):
+            response = self.client.get(reverse('task-list'), {'ordering': ordering})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('created_at', response.data['error'])
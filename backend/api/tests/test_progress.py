@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api.models import Progress
+from api.views import ProgressListCreateView
+
+User = get_user_model()
+
+
+class ProgressCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+
+    def post(self, **data):
+        return self.client.post(reverse('progress-list'), {'surah': 1, 'ayah': 1, **data}, format='json')
+
+    def test_known_client_id_returns_the_stored_row(self):
+        first = self.post(client_id='device-1')
+        again = self.post(client_id='device-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['id'], first.data['id'])
+
+    def test_blank_client_id_is_no_key(self):
+        for _ in range(2):
+            self.assertEqual(self.post(client_id='').status_code, 201)
+
+        self.assertEqual(list(Progress.objects.values_list('client_id', flat=True)), [None, None])
+        response = self.client.post(reverse('progress-bulk'), [
+            {'surah': 1, 'ayah': 2, 'client_id': ''}, {'surah': 1, 'ayah': 3, 'client_id': ''},
+        ], format='json')
+        self.assertEqual(response.data['created'], 2)
+
+    def test_concurrent_retry_returns_the_stored_row(self):
+        first = self.post(client_id='device-1')
+        stored = Progress.objects.get(pk=first.data['id'])
+
+        # The other retry inserts between this request's lookup and its insert
+        with mock.patch.object(ProgressListCreateView, 'stored', side_effect=[None, stored]):
+            again = self.post(client_id='device-1')
+
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['id'], first.data['id'])
+        self.assertEqual(Progress.objects.count(), 1)
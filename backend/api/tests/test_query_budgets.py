@@ -0,0 +1,323 @@
+"""
+Query budgets for every API endpoint.
+
+Each endpoint declares the most SQL queries it may run, measured against a
+seeded dataset that includes a user with 100k progress rows. A change that
+adds a query per row, or a new query per request, fails here first.
+"""
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import leaderboard, quran
+from api.activity import rebuild_activity
+from api.coverage import rebuild_coverage
+from api.leaderboard import rebuild_leaderboard
+from api.models import (
+    Task, Progress, ReviewSchedule, Achievement, Competition, CompetitionScore, TeacherStudent
+)
+from api.quran_text import write_store
+
+User = get_user_model()
+
+HEAVY_PROGRESS_ROWS = 100_000
+
+# Maximum queries per request, including JWT user resolution (one query with
+# the default per-process cache, which doesn't cache users)
+QUERY_BUDGETS = {
+    'task-list': 2,
+    'task-create': 2,
+    'task-detail': 2,
+    'task-update': 4,
+    'task-delete': 4,
+    'progress-list': 2,
+    'progress-create': 12,
+    'progress-bulk': 28,
+    'progress-stats': 3,
+    'progress-breakdown': 2,
+    'progress-coverage': 2,
+    'progress-stats-cached': 1,
+    'review-list': 2,
+    'review-due': 2,
+    'dashboard': 3,
+    'dashboard-cached': 1,
+    'sync': 9,
+    'metrics': 1,
+    'quran-text': 0,
+    'my-students': 4,
+    'my-students-cached': 1,
+    'student-progress': 5,
+    'export': 6,
+    'competition-list': 2,
+    'competition-detail': 2,
+    'competition-join': 8,
+    'competition-score': 9,
+    'competition-score-batch': 9,
+    'competition-leaderboard': 3,
+    'leaderboard': 2,
+    'token_obtain_pair': 2,
+    'token_refresh': 2,
+    'register': 3,
+    'profile': 1,
+    'profile-cached': 1,
+    'profile-update': 3,
+    'logout': 8,
+}
+
+
+def seed_history(user, rows, days=365):
+    """Spread ``rows`` progress rows for ``user`` over the last ``days`` days."""
+    now = timezone.now()
+    batch = [
+        Progress(
+            user=user,
+            surah=quran.ayah_ref(i % quran.AYAH_COUNT + 1)[0],
+            ayah=quran.ayah_ref(i % quran.AYAH_COUNT + 1)[1],
+            type='hifz' if i % 3 else 'muraja',
+            completed_at=now - timedelta(days=i % days, minutes=i % 1440),
+        )
+        for i in range(rows)
+    ]
+    Progress.objects.bulk_create(batch, batch_size=2000)
+    # auto_now_add overrides completed_at on insert; spread the history afterwards
+    for offset in range(days):
+        Progress.objects.filter(user=user, id__in=[p.id for p in batch[offset::days]]).update(
+            completed_at=now - timedelta(days=offset)
+        )
+
+
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='heavy', password='secret-pass-123')
+        cls.other = User.objects.create_user(username='other', password='secret-pass-123')
+
+        seed_history(cls.user, HEAVY_PROGRESS_ROWS)
+        rebuild_activity(Progress.objects.filter(user=cls.user))
+        rebuild_coverage(Progress.objects.filter(user=cls.user))
+        rebuild_leaderboard()
+
+        today = timezone.localdate()
+        Task.objects.bulk_create([
+            Task(user=cls.user, title=f'Task {i}', surah=i % 114 + 1,
+                 status=['pending', 'in_progress', 'completed'][i % 3],
+                 due_date=today + timedelta(days=i % 30))
+            for i in range(1000)
+        ])
+        ReviewSchedule.objects.bulk_create([
+            ReviewSchedule(user=cls.user, surah=i + 1, start_ayah=1, end_ayah=5,
+                           next_review_date=today + timedelta(days=i % 7))
+            for i in range(100)
+        ])
+        Achievement.objects.bulk_create([
+            Achievement(user=cls.user, title=f'Badge {i}', description='', icon='star')
+            for i in range(20)
+        ])
+
+        cls.competition = Competition.objects.create(
+            name='Ramadan', description='', start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=30)
+        )
+        participants = User.objects.bulk_create([
+            User(username=f'participant-{i}') for i in range(1000)
+        ])
+        cls.competition.participants.add(cls.user, *participants)
+        CompetitionScore.objects.bulk_create(
+            [CompetitionScore(competition=cls.competition, user=cls.user, score=50)]
+            + [CompetitionScore(competition=cls.competition, user=user, score=i)
+               for i, user in enumerate(participants)]
+        )
+
+        cls.teacher = User.objects.create_user(username='teacher', role='teacher')
+        TeacherStudent.objects.bulk_create(
+            [TeacherStudent(teacher=cls.teacher, student=cls.user, accepted_at=timezone.now())]
+            + [TeacherStudent(teacher=cls.teacher, student=user, accepted_at=timezone.now())
+               for user in participants[:499]]
+        )
+
+        cls.task = Task.objects.filter(user=cls.user).first()
+
+    def setUp(self):
+        cache.clear()
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def assertQueryBudget(self, budget_name, method, url, data=None, expected_status=200):
+        budget = QUERY_BUDGETS[budget_name]
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content[:500])
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{budget_name} ran {len(queries)} queries (budget {budget}):\n'
+            + '\n'.join(query['sql'] for query in queries.captured_queries)
+        )
+        return response
+
+    # ============ Tasks ============
+
+    def test_task_list(self):
+        self.assertQueryBudget('task-list', 'get', reverse('task-list'))
+        self.assertQueryBudget('task-list', 'get', reverse('task-list') + '?status=pending')
+
+    def test_task_create(self):
+        self.assertQueryBudget('task-create', 'post', reverse('task-list'),
+                               {'title': 'New', 'surah': 1, 'start_ayah': 1, 'end_ayah': 7},
+                               expected_status=201)
+
+    def test_task_detail(self):
+        url = reverse('task-detail', args=[self.task.pk])
+        self.assertQueryBudget('task-detail', 'get', url)
+        self.assertQueryBudget('task-update', 'patch', url, {'status': 'completed'})
+        self.assertQueryBudget('task-delete', 'delete', url, expected_status=204)
+
+    # ============ Progress ============
+
+    def test_progress_list(self):
+        response = self.assertQueryBudget('progress-list', 'get', reverse('progress-list'))
+        self.assertQueryBudget('progress-list', 'get', response.data['next'])
+
+    def test_progress_create(self):
+        self.assertQueryBudget('progress-create', 'post', reverse('progress-list'),
+                               {'surah': 1, 'ayah': 1, 'type': 'hifz'}, expected_status=201)
+
+    def test_progress_bulk(self):
+        records = [
+            dict(zip(('surah', 'ayah'), quran.ayah_ref(i + 1)), client_id=f'bulk-{i}')
+            for i in range(1200)
+        ]
+        self.assertQueryBudget('progress-bulk', 'post', reverse('progress-bulk'), records,
+                               expected_status=201)
+
+    def test_progress_breakdown(self):
+        response = self.assertQueryBudget('progress-breakdown', 'get', reverse('progress-breakdown'))
+        self.assertEqual(len(response.data['juz']), 30)
+
+    def test_progress_coverage(self):
+        response = self.assertQueryBudget('progress-coverage', 'get', reverse('progress-coverage'),
+                                          {'range': '2:1-286'})
+        self.assertEqual(response.data['ayah_count'], quran.AYAH_COUNT)
+
+    def test_progress_stats(self):
+        self.assertQueryBudget('progress-stats', 'get', reverse('progress-stats'))
+        self.assertQueryBudget('progress-stats-cached', 'get', reverse('progress-stats'))
+
+    # ============ Reviews ============
+
+    def test_review_list(self):
+        self.assertQueryBudget('review-list', 'get', reverse('review-list'))
+
+    def test_review_due(self):
+        self.assertQueryBudget('review-due', 'get', reverse('review-due'))
+
+    # ============ Dashboard ============
+
+    def test_dashboard(self):
+        response = self.assertQueryBudget('dashboard', 'get', reverse('dashboard'))
+        self.assertGreater(response.data['streak'], 0)
+        self.assertQueryBudget('dashboard-cached', 'get', reverse('dashboard'))
+
+    def test_sync(self):
+        response = self.assertQueryBudget('sync', 'get', reverse('sync'))
+        cursors = {name: data['cursor'] for name, data in response.data['collections'].items()}
+        self.assertQueryBudget('sync', 'get', reverse('sync'), cursors)
+
+    def test_metrics(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertQueryBudget('metrics', 'get', reverse('metrics'))
+
+    def test_quran_text(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'quran.bin'
+            write_store([f'ayah {n}' for n in range(1, quran.AYAH_COUNT + 1)], path)
+            with override_settings(QURAN_TEXT_PATH=path):
+                self.assertQueryBudget('quran-text', 'get', reverse('quran-text'), {'ranges': '2:1-20'})
+
+    def test_class_overview(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.teacher).access_token}')
+        response = self.assertQueryBudget('my-students', 'get', reverse('my-students'))
+        self.assertEqual(len(response.data), 500)
+        self.assertQueryBudget('my-students-cached', 'get', reverse('my-students'))
+        cache.clear()
+        self.assertQueryBudget('student-progress', 'get', reverse('student-progress', args=[self.user.pk]))
+
+    def test_export(self):
+        # One query per collection however many rows stream out
+        budget = QUERY_BUDGETS['export']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('export'))
+            lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+        self.assertEqual(lines, 1 + HEAVY_PROGRESS_ROWS + 1000 + 100 + 20 + 1)
+        self.assertLessEqual(len(queries), budget, f'export ran {len(queries)} queries (budget {budget})')
+
+    # ============ Competitions ============
+
+    def test_competition_list(self):
+        self.assertQueryBudget('competition-list', 'get', reverse('competition-list'))
+
+    def test_competition_detail(self):
+        self.assertQueryBudget('competition-detail', 'get',
+                               reverse('competition-detail', args=[self.competition.pk]))
+
+    def test_competition_join(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.other).access_token}')
+        self.assertQueryBudget('competition-join', 'post',
+                               reverse('competition-join', args=[self.competition.pk]))
+
+    def test_competition_score(self):
+        self.assertQueryBudget('competition-score', 'post',
+                               reverse('competition-score', args=[self.competition.pk]),
+                               {'score': 5, 'ayah_count': 1})
+
+    def test_competition_score_batch(self):
+        self.assertQueryBudget('competition-score-batch', 'post', reverse('competition-score-batch'),
+                               {'scores': [{'competition': self.competition.pk, 'score': 1}] * 50})
+
+    def test_competition_leaderboard(self):
+        url = reverse('competition-leaderboard', args=[self.competition.pk])
+        response = self.assertQueryBudget('competition-leaderboard', 'get', url)
+        self.assertEqual(response.data['participants_count'], 1001)
+        self.assertEqual(response.data['me']['rank'], 950)
+
+    def test_leaderboard(self):
+        leaderboard._boards.clear()
+        for window in leaderboard.WINDOWS:
+            response = self.assertQueryBudget('leaderboard', 'get', reverse('leaderboard'), {'window': window})
+            self.assertEqual(response.data['me']['rank'], 1)
+
+    # ============ Authentication ============
+
+    def test_token_obtain(self):
+        self.client.credentials()
+        self.assertQueryBudget('token_obtain_pair', 'post', reverse('token_obtain_pair'),
+                               {'username': 'heavy', 'password': 'secret-pass-123'})
+
+    def test_token_refresh(self):
+        self.client.credentials()
+        self.assertQueryBudget('token_refresh', 'post', reverse('token_refresh'),
+                               {'refresh': str(self.refresh)})
+
+    def test_register(self):
+        self.client.credentials()
+        self.assertQueryBudget('register', 'post', reverse('register'),
+                               {'username': 'newcomer', 'password': 'secret-pass-123'},
+                               expected_status=201)
+
+    def test_profile(self):
+        self.assertQueryBudget('profile', 'get', reverse('profile'))
+        self.assertQueryBudget('profile-cached', 'get', reverse('profile'))
+        self.assertQueryBudget('profile-update', 'put', reverse('profile'), {'first_name': 'Ahmed'})
+
+    def test_logout(self):
+        self.assertQueryBudget('logout', 'post', reverse('logout'), {'refresh': str(self.refresh)})
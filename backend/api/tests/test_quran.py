@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api import quran
+
+User = get_user_model()
+
+
+class QuranMetadataTests(SimpleTestCase):
+    def test_global_ids(self):
+        # Same reference points as tests/audio-config.test.js
+        cases = [
+            (1, 1, 1), (1, 7, 7), (2, 1, 8), (2, 286, 293), (3, 1, 294),
+            (58, 22, 5126), (59, 1, 5127), (114, 1, 6231), (114, 6, 6236),
+        ]
+        for surah, ayah, expected in cases:
+            self.assertEqual(quran.ayah_id(surah, ayah), expected)
+            self.assertEqual(quran.ayah_ref(expected), (surah, ayah))
+
+    def test_sections(self):
+        self.assertEqual(sum(quran.SURAH_LENGTHS), quran.AYAH_COUNT)
+        self.assertEqual(quran.juz_bounds(1), (1, 148))
+        self.assertEqual(quran.juz_bounds(30), (quran.ayah_id(78, 1), 6236))
+        self.assertEqual(quran.juz_of(quran.ayah_id(2, 142)), 2)
+        self.assertEqual(quran.hizb_of(quran.ayah_id(2, 74)), 1)
+        self.assertEqual(quran.hizb_of(quran.ayah_id(2, 75)), 2)
+        self.assertEqual(len(quran.range_ids(2, 1, 5)), 5)
+
+    def test_pages(self):
+        self.assertEqual(len(quran.PAGE_STARTS), quran.PAGE_COUNT)
+        self.assertEqual(quran.page_bounds(1), (1, 7))
+        self.assertEqual(quran.page_of(quran.ayah_id(2, 1)), 2)
+        self.assertEqual(quran.page_of(quran.ayah_id(18, 1)), 293)
+        self.assertEqual(quran.page_of(quran.ayah_id(36, 1)), 440)
+        self.assertEqual(quran.page_of(quran.ayah_id(67, 1)), 562)
+        self.assertEqual(quran.page_bounds(604), (quran.ayah_id(112, 1), 6236))
+        # Juz 2-30 span 20 pages each from page 22, some starting at the foot of the page before
+        for juz in range(2, quran.JUZ_COUNT + 1):
+            self.assertIn(quran.page_of(quran.JUZ_STARTS[juz - 1]) - 2 - (juz - 1) * 20, (-1, 0), juz)
+
+    def test_invalid_references(self):
+        for surah, ayah in [(0, 1), (115, 1), (1, 8), (2, 0)]:
+            self.assertFalse(quran.is_valid(surah, ayah))
+            with self.assertRaises(ValueError):
+                quran.ayah_id(surah, ayah)
+
+
+class AyahValidationTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='student'))
+
+    def test_progress_rejects_unknown_ayah(self):
+        response = self.client.post(reverse('progress-list'), {'surah': 1, 'ayah': 8}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ayah', response.data)
+
+    def test_task_range_checked_on_partial_update(self):
+        response = self.client.post(reverse('task-list'),
+                                    {'title': 'Al-Fatiha', 'surah': 1, 'start_ayah': 1, 'end_ayah': 7},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+
+        url = reverse('task-detail', args=[response.data['id']])
+        self.assertEqual(self.client.patch(url, {'end_ayah': 9}, format='json').status_code, 400)
+        self.assertEqual(self.client.patch(url, {'start_ayah': 3}, format='json').status_code, 200)
@@ -0,0 +1,112 @@
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from api import quran
+from api.quran_text import CorpusError, TextStore, read_source
+
+
+def source_lines(skip=None):
+    for global_id in range(1, quran.AYAH_COUNT + 1):
+        surah, ayah = quran.ayah_ref(global_id)
+        if (surah, ayah) != skip:
+            yield f'{surah}|{ayah}|نص {surah}:{ayah}'
+
+
+class QuranTextTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.path = self.directory / 'quran.bin'
+        self.source = self.directory / 'quran.txt.gz'
+        settings_override = override_settings(QURAN_TEXT_PATH=self.path, QURAN_TEXT_SOURCE=self.source)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def build(self, lines):
+        source = self.directory / 'source.txt'
+        source.write_text('# Uthmani\n' + '\n'.join(lines) + '\n', encoding='utf-8')
+        call_command('build_quran_text', str(source), stdout=StringIO())
+
+    def text(self, ranges, **headers):
+        return self.client.get(reverse('quran-text'), {'ranges': ranges}, **headers)
+
+    def test_missing_corpus(self):
+        self.assertEqual(self.text('1:1').status_code, 503)
+
+    def test_ranges_in_one_response(self):
+        self.build(source_lines())
+
+        response = self.text('2:284-286,114,1:1')
+
+        self.assertEqual(response.status_code, 200)
+        ranges = response.data['ranges']
+        self.assertEqual([(r['surah'], r['start_ayah'], r['end_ayah']) for r in ranges],
+                         [(2, 284, 286), (114, 1, 6), (1, 1, 1)])
+        self.assertEqual(ranges[0]['ayahs'][2], {'ayah': 286, 'text': 'نص 2:286'})
+        self.assertEqual(ranges[1]['ayahs'][-1]['text'], 'نص 114:6')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=2592000', response['Cache-Control'])
+
+    def test_revalidation(self):
+        self.build(source_lines())
+        etag = self.text('1:1-7')['ETag']
+
+        response = self.text('1:1-7', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_rejects_bad_ranges(self):
+        self.build(source_lines())
+        # The last asks for more ayahs than one response may carry
+        for ranges in ['', '1:8', '2:5-1', 'abc', '2,3,4,5,6,7']:
+            self.assertEqual(self.text(ranges).status_code, 400, ranges)
+
+    def test_build_requires_every_ayah(self):
+        with self.assertRaisesMessage(CommandError, '1 ayahs missing, starting at 2:255'):
+            self.build(source_lines(skip=(2, 255)))
+        self.assertFalse(self.path.exists())
+
+    def test_builds_from_the_bundled_source(self):
+        with gzip.open(self.source, 'wt', encoding='utf-8') as source:
+            source.write('\n'.join(source_lines()))
+
+        response = self.text('1:1')
+        self.assertEqual(response.data['ranges'][0]['ayahs'][0]['text'], 'نص 1:1')
+        self.assertTrue(self.path.exists())
+
+        self.path.unlink()
+        call_command('build_quran_text', stdout=StringIO())
+        self.assertTrue(self.path.exists())
+
+    def test_shipped_source(self):
+        shipped = Path(settings.BASE_DIR) / 'api' / 'data' / 'quran-uthmani.txt.gz'
+        with override_settings(QURAN_TEXT_SOURCE=shipped):
+            response = self.text('1:1,114:6')
+
+        self.assertEqual(response.status_code, 200)
+        texts = read_source(shipped)
+        self.assertEqual([r['ayahs'][0]['text'] for r in response.data['ranges']], [texts[0], texts[-1]])
+        self.assertTrue(texts[0].startswith('بِسْمِ'))
+
+    def test_damaged_store(self):
+        self.path.write_bytes(b'')
+        with self.assertLogs('api.quran_text', 'ERROR'):
+            self.assertEqual(self.text('1:1').status_code, 503)
+
+        self.build(source_lines())
+        self.path.write_bytes(self.path.read_bytes()[:-10])
+        with self.assertRaisesMessage(CorpusError, 'truncated'):
+            TextStore(self.path)
+        with self.assertLogs('api.quran_text', 'ERROR'):
+            self.assertEqual(self.text('1:1').status_code, 503)
+            self.path.write_bytes(self.path.read_bytes()[:100])
+            self.assertEqual(self.text('1:1').status_code, 503)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Progress, ReviewSchedule
+from api.scheduler import INTERVALS, record_reviews, recompute_schedules
+
+User = get_user_model()
+
+
+class RecordReviewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+        self.today = timezone.localdate()
+
+    def ranges(self):
+        return list(ReviewSchedule.objects.filter(user=self.user).order_by('surah', 'start_ayah')
+                    .values_list('surah', 'start_ayah', 'end_ayah'))
+
+    def test_memorized_ayahs_merge_into_ranges(self):
+        record_reviews(self.user.id, [(1, 1, 'hifz'), (1, 2, 'hifz')], self.today)
+        record_reviews(self.user.id, [(1, 3, 'hifz'), (1, 7, 'hifz'), (2, 1, 'hifz')], self.today)
+        record_reviews(self.user.id, [(1, 2, 'hifz')], self.today)
+
+        self.assertEqual(self.ranges(), [(1, 1, 3), (1, 7, 7), (2, 1, 1)])
+
+    def test_revision_advances_once_per_day(self):
+        record_reviews(self.user.id, [(1, 1, 'hifz'), (1, 2, 'hifz')], self.today)
+        record_reviews(self.user.id, [(1, 1, 'muraja'), (1, 2, 'muraja')], self.today)
+        record_reviews(self.user.id, [(1, 2, 'muraja')], self.today)
+
+        schedule = ReviewSchedule.objects.get(user=self.user)
+        self.assertEqual(schedule.review_count, 1)
+        self.assertEqual(schedule.next_review_date, self.today + timedelta(days=INTERVALS[0]))
+
+        tomorrow = self.today + timedelta(days=1)
+        record_reviews(self.user.id, [(1, 1, 'muraja')], tomorrow)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.review_count, 2)
+        self.assertEqual(schedule.next_review_date, tomorrow + timedelta(days=INTERVALS[1]))
+
+    def test_recompute_matches_history(self):
+        record_reviews(self.user.id, [(1, 1, 'hifz')], self.today)
+        ReviewSchedule.objects.update(created_at=timezone.now() - timedelta(days=10))
+        for days_ago in (4, 2, 2):
+            progress = Progress.objects.create(user=self.user, surah=1, ayah=1, type='muraja')
+            Progress.objects.filter(pk=progress.pk).update(
+                completed_at=timezone.now() - timedelta(days=days_ago)
+            )
+        ReviewSchedule.objects.update(review_count=0, last_reviewed=None)
+
+        self.assertEqual(recompute_schedules(chunk_size=1), 1)
+
+        schedule = ReviewSchedule.objects.get(user=self.user)
+        self.assertEqual(schedule.review_count, 2)
+        self.assertEqual(schedule.last_reviewed, self.today - timedelta(days=2))
+        self.assertEqual(schedule.next_review_date, schedule.last_reviewed + timedelta(days=INTERVALS[1]))
+
+
+class DueReviewsViewTests(APITestCase):
+    def test_due_and_overdue(self):
+        user = User.objects.create_user(username='student')
+        today = timezone.localdate()
+        for surah, offset in [(1, -3), (2, 0), (3, 2)]:
+            ReviewSchedule.objects.create(user=user, surah=surah, start_ayah=1, end_ayah=3,
+                                          next_review_date=today + timedelta(days=offset))
+        self.client.force_authenticate(user)
+
+        response = self.client.get(reverse('review-due'))
+
+        self.assertEqual([s['surah'] for s in response.data['overdue']], [1])
+        self.assertEqual([s['surah'] for s in response.data['due_today']], [2])
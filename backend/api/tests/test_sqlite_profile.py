@@ -0,0 +1,57 @@
+import tempfile
+from pathlib import Path
+
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from quranreview.sqlite3.base import DatabaseWrapper, read_only_transactions
+from quranreview.sqlite3.middleware import ReadOnlyRequestMiddleware
+
+
+class TransactionModeTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'db.sqlite3'
+
+    def connect(self):
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': self.path,
+            'OPTIONS': {'timeout': 0.05, 'pragmas': {'journal_mode': 'WAL'}},
+        }, alias='profile')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def begin(self, wrapper):
+        wrapper._start_transaction_under_autocommit()
+        wrapper.cursor().execute('SELECT count(*) FROM sqlite_master')
+
+    def test_only_writing_transactions_take_the_write_lock(self):
+        writer, reader = self.connect(), self.connect()
+        self.begin(writer)
+
+        with read_only_transactions():
+            self.begin(reader)
+        reader.cursor().execute('ROLLBACK')
+        with self.assertRaises(OperationalError):
+            self.begin(reader)
+
+    def test_safe_methods_are_read_only(self):
+        seen = []
+        middleware = ReadOnlyRequestMiddleware(lambda request: seen.append(self.is_read_only()) or HttpResponse())
+        for method in ('get', 'head', 'post', 'delete'):
+            middleware(getattr(RequestFactory(), method)('/'))
+        self.assertEqual(seen, [True, True, False, False])
+
+    def is_read_only(self):
+        writer, reader = self.connect(), self.connect()
+        try:
+            self.begin(writer)
+            self.begin(reader)
+        except OperationalError:
+            return False
+        finally:
+            writer.close()
+            reader.close()
+        return True
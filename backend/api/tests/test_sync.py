@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Task
+from api.sync import decode_cursor, encode_cursor
+
+User = get_user_model()
+
+
+def cursor(**position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+class SyncCursorTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student')
+        self.client.force_authenticate(self.user)
+
+    def sync(self, tasks_cursor):
+        return self.client.get(reverse('sync'), {'collections': 'tasks', 'tasks': tasks_cursor})
+
+    def test_cursor_round_trip(self):
+        position = {'rows': (timezone.now(), 3), 'deleted': None}
+        self.assertEqual(decode_cursor(encode_cursor(position)), position)
+
+    def test_follows_the_returned_cursor(self):
+        Task.objects.create(user=self.user, title='Old')
+        Task.objects.filter(user=self.user).update(updated_at=timezone.now() - timedelta(minutes=1))
+
+        first = self.sync('').data['collections']['tasks']
+        self.assertEqual([task['title'] for task in first['updated']], ['Old'])
+        self.assertEqual(self.sync(first['cursor']).data['collections']['tasks']['updated'], [])
+
+    def test_malformed_cursors_are_refused(self):
+        stamp = (timezone.now() - timedelta(days=365)).replace(tzinfo=None).isoformat()
+        for bad in ['not-base64!', cursor(rows='x'), cursor(rows=['2026-01-01', 'one']),
+                    # A naive time can't be compared with the tombstone retention horizon
+                    cursor(deleted=[stamp, 1]), cursor(rows=[stamp, 1])]:
+            response = self.sync(bad)
+            self.assertEqual(response.status_code, 400, bad)
+            self.assertEqual(response.data['error'], 'Invalid sync cursor')
@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI the aggregate reads use async views with concurrent queries
+progress_stats = async_views.progress_stats if settings.ASYNC_VIEWS else views.ProgressStatsView.as_view()
+dashboard_stats = async_views.dashboard_stats if settings.ASYNC_VIEWS else views.dashboard_stats
 
 urlpatterns = [
     # Tasks
@@ -8,14 +13,46 @@ urlpatterns = [
     
     # Progress
     path('progress/', views.ProgressListCreateView.as_view(), name='progress-list'),
-    path('progress/stats/', views.ProgressStatsView.as_view(), name='progress-stats'),
+    path('progress/bulk/', views.ProgressBulkCreateView.as_view(), name='progress-bulk'),
+    path('progress/stats/', progress_stats, name='progress-stats'),
+    path('progress/breakdown/', views.ProgressBreakdownView.as_view(), name='progress-breakdown'),
+    path('progress/coverage/', views.ProgressCoverageView.as_view(), name='progress-coverage'),
+    
+    # Reviews
+    path('reviews/', views.ReviewScheduleListCreateView.as_view(), name='review-list'),
+    path('reviews/due/', views.DueReviewsView.as_view(), name='review-due'),
     
     # Dashboard
-    path('dashboard/', views.dashboard_stats, name='dashboard'),
+    path('dashboard/', dashboard_stats, name='dashboard'),
+    
+    # Metrics
+    path('metrics/', views.metrics_view, name='metrics'),
+    
+    # Sync
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    
+    # Leaderboard
+    path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    
+    # Classes
+    path('my-students/', views.MyStudentsView.as_view(), name='my-students'),
+    path('my-students/<int:pk>/', views.MyStudentDetailView.as_view(), name='my-student-detail'),
+    path('students/<int:pk>/progress/', views.StudentProgressView.as_view(), name='student-progress'),
+    path('my-teachers/', views.MyTeachersView.as_view(), name='my-teachers'),
+    path('my-teachers/<int:pk>/', views.MyTeacherDetailView.as_view(), name='my-teacher-detail'),
+    
+    # Backup
+    path('export/', views.ExportView.as_view(), name='export'),
+    path('import/', views.ImportView.as_view(), name='import'),
+    
+    # Quran text
+    path('quran/text/', views.QuranTextView.as_view(), name='quran-text'),
     
     # Competitions
     path('competitions/', views.CompetitionListView.as_view(), name='competition-list'),
+    path('competitions/scores/batch/', views.submit_competition_scores_batch, name='competition-score-batch'),
     path('competitions/<int:pk>/', views.CompetitionDetailView.as_view(), name='competition-detail'),
     path('competitions/<int:pk>/join/', views.join_competition, name='competition-join'),
     path('competitions/<int:pk>/score/', views.submit_competition_score, name='competition-score'),
+    path('competitions/<int:pk>/leaderboard/', views.CompetitionLeaderboardView.as_view(), name='competition-leaderboard'),
 ]
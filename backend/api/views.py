@@ -1,25 +1,55 @@
-from rest_framework import generics, status, filters
+from rest_framework import exceptions, generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
 
-from .models import Task, Progress, ReviewSchedule, Achievement, Competition, CompetitionScore
+from authentication.jwt import CachedJWTAuthentication
+from .models import (
+    Task, Progress, ReviewSchedule, Competition, CompetitionScore, TeacherStudent
+)
+from .activity import get_streaks
+from .backup import InvalidExport, export_lines, import_lines
+from .classes import OPEN_TASK_STATUSES, build_overview, get_overview, student_ids
+from . import coverage, quran, quran_text
+from .conditional import (
+    conditional, competitions_data, competitions_etag, expire_competitions_at, stats_etag, tasks_etag
+)
+from .dashboard import get_snapshot, stats_payload, dashboard_payload
+from .ingest import bulk_create_progress
+from .metrics import get_store, render_prometheus
+from .leaderboard import WINDOWS, get_board
+from .pagination import TaskCursorPagination, ProgressCursorPagination
+from .permissions import IsTeacher
+from .projections import ProjectedListMixin, ValuesProjection
+from .scheduler import due_schedules
+from .stats import progress_breakdown
+from .sync import COLLECTIONS, PAGE_SIZE, InvalidCursor, sync_collection
+from .rankings import get_final_ranking, get_ranking
+from .scoring import NotJoined, open_competitions, apply_score_deltas, sum_deltas
 from .serializers import (
-    TaskSerializer, ProgressSerializer, ReviewScheduleSerializer,
-    AchievementSerializer, CompetitionSerializer, CompetitionScoreSerializer
+    TaskSerializer, ProgressSerializer, ReviewScheduleSerializer, CompetitionSerializer,
+    ScoreSubmissionSerializer, ScoreBatchSerializer
 )
 
+User = get_user_model()
+
 
 # ============ Tasks ============
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(ProjectedListMixin, generics.ListCreateAPIView):
     serializer_class = TaskSerializer
+    projection = ValuesProjection(TaskSerializer)
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.OrderingFilter]
-    ordering_fields = ['due_date', 'priority', 'created_at']
+    pagination_class = TaskCursorPagination
     
     def get_queryset(self):
         queryset = Task.objects.filter(user=self.request.user)
@@ -33,6 +63,16 @@ class TaskListCreateView(generics.ListCreateAPIView):
         
         return queryset
     
+    @conditional(tasks_etag)
+    def get(self, request, *args, **kwargs):
+        ordering = request.query_params.get('ordering')
+        if ordering and ordering not in TaskCursorPagination.orderings:
+            return Response(
+                {'success': False, 'error': f'ترتيب غير مدعوم، القيم المتاحة: {", ".join(TaskCursorPagination.orderings)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().get(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -47,40 +87,145 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ============ Progress ============
 
-class ProgressListCreateView(generics.ListCreateAPIView):
+class ProgressListCreateView(ProjectedListMixin, generics.ListCreateAPIView):
     serializer_class = ProgressSerializer
+    projection = ValuesProjection(ProgressSerializer)
     permission_classes = [IsAuthenticated]
+    pagination_class = ProgressCursorPagination
     
     def get_queryset(self):
         return Progress.objects.filter(user=self.request.user)
     
+    def stored(self, client_id):
+        return self.get_queryset().filter(client_id=client_id).first() if client_id else None
+    
+    def create(self, request, *args, **kwargs):
+        # A retried record with a known client_id returns the stored row
+        client_id = request.data.get('client_id')
+        existing = self.stored(client_id)
+        if existing is None:
+            try:
+                return super().create(request, *args, **kwargs)
+            except IntegrityError:
+                # A concurrent retry stored the same client_id between the lookup and the insert
+                existing = self.stored(client_id)
+                if existing is None:
+                    raise
+        return Response(self.get_serializer(existing).data)
+    
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        if not serializer.validated_data.get('client_id'):
+            serializer.save(user=self.request.user)
+            return
+        # A savepoint, so a duplicate client_id leaves the request's transaction usable
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+
+class ProgressBulkCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_records = 5000
+    
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'success': False, 'error': 'Expected a list of progress records'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > self.max_records:
+            return Response(
+                {'success': False, 'error': f'At most {self.max_records} records per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = ProgressSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        
+        created, duplicates = bulk_create_progress(request.user, serializer.validated_data)
+        
+        return Response({
+            'success': True,
+            'created': created,
+            'duplicates': duplicates
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 
 class ProgressStatsView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional(stats_etag)
+    def get(self, request):
+        return Response(stats_payload(get_snapshot(request.user)))
+
+
+class ProgressBreakdownView(APIView):
+    """Recitation counts per juz and per mushaf page."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        return Response(progress_breakdown(request.user))
+
+
+class ProgressCoverageView(APIView):
+    """
+    Unique memorized ayahs from the coverage bitmap.
+    
+    ``bitmap`` is base64 of 780 little-endian bytes where bit ``n - 1`` is
+    ayah ``n`` in global order. ``?range=2:1-50`` adds the unmemorized runs
+    of that range.
+    """
+    permission_classes = [IsAuthenticated]
+    
     def get(self, request):
-        user = request.user
-        total_hifz = Progress.objects.filter(user=user, type='hifz').count()
-        total_muraja = Progress.objects.filter(user=user, type='muraja').count()
+        bits = coverage.get_bits(request.user)
+        data = {
+            'ayah_count': bits.bit_count(),
+            'total': quran.AYAH_COUNT,
+            'bitmap': coverage.encode(bits),
+            'surahs': coverage.surah_completion(bits),
+            'juz': coverage.juz_completion(bits)
+        }
         
-        # Get today's activity
-        today = timezone.now().date()
-        today_activity = Progress.objects.filter(
-            user=user,
-            completed_at__date=today
-        ).count()
+        requested = request.query_params.get('range')
+        if requested:
+            try:
+                surah, start, end = quran.parse_range(requested)
+                data['remaining'] = coverage.remaining_in_range(bits, surah, start, end)
+            except ValueError:
+                return Response(
+                    {'success': False, 'error': 'نطاق الآيات غير صحيح'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['range'] = {'surah': surah, 'start_ayah': start, 'end_ayah': end}
         
-        # Calculate streak
-        streak = calculate_streak(user)
+        return Response(data)
+
+
+# ============ Reviews ============
+
+class ReviewScheduleListCreateView(generics.ListCreateAPIView):
+    serializer_class = ReviewScheduleSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return ReviewSchedule.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class DueReviewsView(APIView):
+    """Schedules due today and those already overdue."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        today = timezone.localdate()
+        schedules = ReviewScheduleSerializer(due_schedules(request.user, today), many=True).data
         
         return Response({
-            'total_hifz': total_hifz,
-            'total_muraja': total_muraja,
-            'today_activity': today_activity,
-            'streak': streak
+            'date': today,
+            'due_today': [s for s in schedules if s['next_review_date'] == today.isoformat()],
+            'overdue': [s for s in schedules if s['next_review_date'] < today.isoformat()]
         })
 
 
@@ -89,42 +234,287 @@ class ProgressStatsView(APIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
-    user = request.user
-    
-    # Today's tasks
-    today = timezone.now().date()
-    today_tasks = Task.objects.filter(
-        user=user,
-        due_date=today
-    ).count()
-    
-    # Pending tasks
-    pending_tasks = Task.objects.filter(
-        user=user,
-        status__in=['pending', 'in_progress']
-    ).count()
-    
-    # Total progress (ayahs memorized)
-    total_memorized = Progress.objects.filter(
-        user=user,
-        type='hifz'
-    ).count()
-    
-    # Recent achievements
-    recent_achievements = Achievement.objects.filter(
-        user=user
-    ).order_by('-earned_at')[:5]
-    
-    # Streak
-    streak = calculate_streak(user)
+    # One cached aggregate snapshot instead of a query per figure
+    return Response(dashboard_payload(get_snapshot(request.user)))
+
+
+# ============ Metrics ============
+
+_metrics_authenticator = CachedJWTAuthentication()
+
+
+def _may_scrape(request):
+    """``METRICS_TOKEN`` as a bearer token, or a staff user's session or API token."""
+    token = settings.METRICS_TOKEN
+    supplied = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+    if token and constant_time_compare(supplied, token):
+        return True
+    if request.user.is_staff:
+        return True
+    try:
+        result = _metrics_authenticator.authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; forbidden to everyone else, even when no token is set."""
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(get_store().snapshot()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# ============ Sync ============
+
+class SyncView(APIView):
+    """Rows changed or deleted since each collection's cursor."""
+    permission_classes = [IsAuthenticated]
     
-    return Response({
-        'today_tasks': today_tasks,
-        'pending_tasks': pending_tasks,
-        'total_memorized': total_memorized,
-        'streak': streak,
-        'recent_achievements': AchievementSerializer(recent_achievements, many=True).data
-    })
+    def get(self, request):
+        requested = request.query_params.get('collections')
+        names = requested.split(',') if requested else list(COLLECTIONS)
+        unknown = [name for name in names if name not in COLLECTIONS]
+        if unknown:
+            return Response(
+                {'success': False, 'error': f'Unknown collections: {", ".join(unknown)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        limit = max(_int_param(request, 'limit', PAGE_SIZE, PAGE_SIZE), 1)
+        now = timezone.now()
+        try:
+            collections = {
+                name: sync_collection(request.user, name, request.query_params.get(name), limit, now)
+                for name in names
+            }
+        except InvalidCursor:
+            return Response(
+                {'success': False, 'error': 'Invalid sync cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'server_time': now,
+            'collections': collections
+        })
+
+
+# ============ Classes ============
+
+class MyStudentsView(APIView):
+    """
+    The teacher's class: each student's memorized count, streak, open tasks and last active day.
+    
+    POST invites a student by id or username; they join the class when they accept it.
+    """
+    permission_classes = [IsAuthenticated, IsTeacher]
+    
+    def get(self, request):
+        return Response(get_overview(request.user))
+    
+    def post(self, request):
+        if request.data.get('student'):
+            lookup = {'pk': request.data['student']}
+        else:
+            lookup = {'username': request.data.get('username')}
+        try:
+            student = User.objects.filter(role='student', **lookup).first()
+        except (TypeError, ValueError):
+            student = None
+        if student is None:
+            return Response(
+                {'success': False, 'error': 'الطالب غير موجود'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # The student only joins the class once they accept the invitation
+        link, created = TeacherStudent.objects.get_or_create(teacher=request.user, student=student)
+        if created:
+            message = 'تم إرسال الدعوة إلى الطالب'
+        elif link.accepted_at is None:
+            message = 'الدعوة بانتظار موافقة الطالب'
+        else:
+            message = 'الطالب مسجل بالفعل'
+        return Response({
+            'success': True,
+            'message': message,
+            'student': student.pk,
+            'accepted': link.accepted_at is not None
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class MyStudentDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsTeacher]
+    
+    def delete(self, request, pk):
+        deleted, _ = TeacherStudent.objects.filter(teacher=request.user, student_id=pk).delete()
+        if not deleted:
+            return Response(
+                {'success': False, 'error': 'الطالب غير موجود'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class StudentProgressView(APIView):
+    """One student's overview row and open tasks, for a teacher of that student."""
+    permission_classes = [IsAuthenticated, IsTeacher]
+    max_tasks = 100
+    
+    def get(self, request, pk):
+        if pk not in student_ids(request.user.pk):
+            return Response(
+                {'success': False, 'error': 'الطالب غير موجود'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        student = build_overview([pk], timezone.localdate())[0]
+        tasks = Task.objects.filter(user_id=pk, status__in=OPEN_TASK_STATUSES).order_by(
+            F('due_date').asc(nulls_last=True), 'id'
+        )[:self.max_tasks]
+        return Response({
+            'student': student,
+            'tasks': TaskSerializer(tasks, many=True).data
+        })
+
+
+class MyTeachersView(APIView):
+    """The student's teachers and pending invitations."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        links = TeacherStudent.objects.filter(student=request.user).order_by('-created_at').values(
+            'teacher_id', 'teacher__username', 'teacher__first_name', 'teacher__last_name',
+            'created_at', 'accepted_at'
+        )
+        return Response([{
+            'id': link['teacher_id'],
+            'username': link['teacher__username'],
+            'first_name': link['teacher__first_name'],
+            'last_name': link['teacher__last_name'],
+            'invited_at': link['created_at'],
+            'accepted': link['accepted_at'] is not None,
+        } for link in links])
+
+
+class MyTeacherDetailView(APIView):
+    """Accept a teacher's invitation (POST), or decline it or leave the class (DELETE)."""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        link = TeacherStudent.objects.filter(teacher_id=pk, student=request.user).first()
+        if link is None:
+            return Response(
+                {'success': False, 'error': 'الدعوة غير موجودة'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if link.accepted_at is None:
+            link.accepted_at = timezone.now()
+            link.save(update_fields=['accepted_at'])
+        return Response({'success': True, 'message': 'تم قبول الدعوة'})
+    
+    def delete(self, request, pk):
+        deleted, _ = TeacherStudent.objects.filter(teacher_id=pk, student=request.user).delete()
+        if not deleted:
+            return Response(
+                {'success': False, 'error': 'الدعوة غير موجودة'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ============ Backup ============
+
+class ExportView(APIView):
+    """The user's whole history as NDJSON, streamed a chunk of rows at a time."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        response = StreamingHttpResponse(export_lines(request.user), content_type='application/x-ndjson')
+        response['Content-Disposition'] = (
+            f'attachment; filename="quranreview-export-{timezone.localdate()}.ndjson"'
+        )
+        return response
+
+
+class ImportView(APIView):
+    """Load an export into the user's account; the body is validated line by line before any row is written."""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            imported, skipped = import_lines(request.user, request.stream or [])
+        except InvalidExport as error:
+            return Response(
+                {'success': False, 'error': str(error)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'success': True,
+            'imported': imported,
+            'skipped': skipped
+        }, status=status.HTTP_201_CREATED)
+
+
+# ============ Quran Text ============
+
+class QuranTextView(APIView):
+    """
+    Uthmani text for ayah ranges from the local store.
+    
+    ``?ranges=`` is a comma-separated batch of ``surah:start-end``,
+    ``surah:ayah`` or whole ``surah`` references, answered in order in one
+    response. The text only changes when the corpus is rebuilt, so
+    responses are public, long-lived and validated by the corpus checksum.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    max_ranges = 50
+    max_ayahs = 1000
+    max_age = 30 * 24 * 60 * 60
+    
+    def get(self, request):
+        store = quran_text.get_store()
+        if store is None:
+            return Response(
+                {'success': False, 'error': 'نص القرآن غير متوفر على هذا الخادم'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        try:
+            ranges = [
+                quran.parse_range(text)
+                for text in request.query_params.get('ranges', '').split(',') if text.strip()
+            ]
+        except ValueError:
+            ranges = None
+        if not ranges or len(ranges) > self.max_ranges or sum(
+            end - start + 1 for _, start, end in ranges
+        ) > self.max_ayahs:
+            return Response(
+                {'success': False, 'error': 'نطاق الآيات غير صحيح'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        etag = f'"quran-{store.checksum}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = []
+            for surah, start, end in ranges:
+                texts = store.ayahs(quran.ayah_id(surah, start), quran.ayah_id(surah, end))
+                data.append({
+                    'surah': surah, 'start_ayah': start, 'end_ayah': end,
+                    'ayahs': [{'ayah': ayah, 'text': text} for ayah, text in enumerate(texts, start)]
+                })
+            response = Response({'ranges': data})
+            response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
 
 
 # ============ Competitions ============
@@ -134,20 +524,117 @@ class CompetitionListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Competition.objects.filter(status='active')
+        return open_competitions().annotate(
+            participants_count=Count('participants')
+        )
+    
+    @conditional(competitions_etag)
+    def get(self, request, *args, **kwargs):
+        # Same for every user, so cached once until a competition changes or closes
+        data = competitions_data('active', self.build)
+        return Response(data)
+    
+    def build(self):
+        competitions = list(self.get_queryset())
+        if competitions:
+            expire_competitions_at(min(competition.end_date for competition in competitions))
+        return list(self.get_serializer(competitions, many=True).data)
 
 
 class CompetitionDetailView(generics.RetrieveAPIView):
+    """A competition; once finalized, with the top of its frozen results."""
     serializer_class = CompetitionSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Competition.objects.all()
+    results_limit = 10
+    queryset = Competition.objects.annotate(participants_count=Count('participants'))
+    
+    @conditional(competitions_etag)
+    def get(self, request, *args, **kwargs):
+        data = competitions_data(f'detail:{kwargs["pk"]}', self.build)
+        return Response(data)
+    
+    def build(self):
+        competition = self.get_object()
+        data = dict(self.get_serializer(competition).data)
+        if competition.finalized_at is not None:
+            data['results'] = get_final_ranking(competition.pk).top(self.results_limit)
+        return data
+
+
+class CompetitionLeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_limit = 100
+    max_radius = 50
+    
+    def get(self, request, pk):
+        found = list(
+            Competition.objects.filter(pk=pk)
+            .annotate(participants_count=Count('participants'))
+            .values_list('finalized_at', 'participants_count')
+        )
+        if not found:
+            return Response(
+                {'success': False, 'error': 'المسابقة غير موجودة'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        limit = _int_param(request, 'limit', 10, self.max_limit)
+        radius = _int_param(request, 'around', 5, self.max_radius)
+        
+        finalized_at, participants_count = found[0]
+        final = finalized_at is not None
+        ranking = get_final_ranking(pk) if final else get_ranking(pk)
+        position = ranking.position_of(request.user.id)
+        
+        return Response({
+            'competition': pk,
+            'final': final,
+            'participants_count': participants_count,
+            'top': ranking.top(limit),
+            'me': ranking.entry(position) if position is not None else None,
+            'around_me': ranking.around(request.user.id, radius)
+        })
+
+
+class LeaderboardView(APIView):
+    """
+    Global ranking by points from progress and competition scores.
+    
+    ``?window=`` is ``all`` (default), ``week`` or ``month`` (rolling 7 and
+    30 days).
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 100
+    max_radius = 50
+    
+    def get(self, request):
+        window = request.query_params.get('window', 'all')
+        if window not in WINDOWS:
+            return Response(
+                {'success': False, 'error': 'الفترة غير صحيحة'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        limit = _int_param(request, 'limit', 50, self.max_limit)
+        radius = _int_param(request, 'around', 5, self.max_radius)
+        
+        board = get_board(window)
+        position = board.position_of(request.user.id)
+        
+        return Response({
+            'window': window,
+            'participants_count': len(board),
+            'leaderboard': board.top(limit),
+            'me': board.entry(position) if position is not None else None,
+            'around_me': board.around(request.user.id, radius)
+        })
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def join_competition(request, pk):
     try:
-        competition = Competition.objects.get(pk=pk, status='active')
+        competition = open_competitions().get(pk=pk)
         competition.participants.add(request.user)
         
         # Create or get competition score
@@ -171,60 +658,69 @@ def join_competition(request, pk):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def submit_competition_score(request, pk):
+    serializer = ScoreSubmissionSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    # Membership is an indexed lookup on the participants table, done inside the scoring transaction
     try:
-        competition = Competition.objects.get(pk=pk, status='active')
-        
-        if request.user not in competition.participants.all():
+        totals = apply_score_deltas(request.user, {
+            pk: (serializer.validated_data['score'], serializer.validated_data['ayah_count'])
+        })
+    except NotJoined:
+        if not open_competitions().filter(pk=pk).exists():
             return Response(
-                {'success': False, 'error': 'لم تنضم إلى هذه المسابقة'},
-                status=status.HTTP_403_FORBIDDEN
+                {'success': False, 'error': 'المسابقة غير موجودة'},
+                status=status.HTTP_404_NOT_FOUND
             )
-        
-        score_value = request.data.get('score', 0)
-        ayah_count = request.data.get('ayah_count', 0)
-        
-        score, created = CompetitionScore.objects.get_or_create(
-            competition=competition,
-            user=request.user,
-            defaults={'score': score_value, 'ayah_count': ayah_count}
+        return Response(
+            {'success': False, 'error': 'لم تنضم إلى هذه المسابقة'},
+            status=status.HTTP_403_FORBIDDEN
         )
-        
-        if not created:
-            score.score += score_value
-            score.ayah_count += ayah_count
-            score.save()
-        
-        return Response({
-            'success': True,
-            'total_score': score.score,
-            'total_ayah': score.ayah_count
-        })
-    except Competition.DoesNotExist:
+    total_score, total_ayah = totals[pk]
+    
+    return Response({
+        'success': True,
+        'total_score': total_score,
+        'total_ayah': total_ayah
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_competition_scores_batch(request):
+    serializer = ScoreBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    # One rejected competition refuses the whole batch
+    try:
+        totals = apply_score_deltas(request.user, sum_deltas(serializer.validated_data['scores']))
+    except NotJoined as exc:
         return Response(
-            {'success': False, 'error': 'المسابقة غير موجودة'},
-            status=status.HTTP_404_NOT_FOUND
+            {'success': False, 'error': 'لم تنضم إلى هذه المسابقة', 'competitions': exc.competitions},
+            status=status.HTTP_403_FORBIDDEN
         )
+    
+    return Response({
+        'success': True,
+        'results': [
+            {'competition': pk, 'total_score': score, 'total_ayah': ayah_count}
+            for pk, (score, ayah_count) in totals.items()
+        ]
+    })
 
 
 # ============ Helper Functions ============
 
+def _int_param(request, name, default, maximum):
+    """Read a non-negative integer query param, clamped to ``maximum``."""
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return min(max(value, 0), maximum)
+
+
 def calculate_streak(user):
     """Calculate user's daily activity streak"""
-    progress_dates = Progress.objects.filter(
-        user=user
-    ).dates('completed_at', 'day', order='DESC')
-    
-    if not progress_dates:
-        return 0
-    
-    streak = 0
-    today = timezone.now().date()
-    
-    for i, date in enumerate(progress_dates):
-        expected_date = today - timedelta(days=i)
-        if date == expected_date:
-            streak += 1
-        else:
-            break
-    
+    streak, _ = get_streaks(user)
     return streak
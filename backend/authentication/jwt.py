@@ -0,0 +1,118 @@
+"""
+JWT authentication with cached user resolution.
+
+``CachedJWTAuthentication`` is a drop-in for simplejwt's
+``JWTAuthentication`` that checks revocation in the database and, when
+the cache is shared between workers, keeps the resolved user there for
+``AUTH_USER_CACHE_TIMEOUT`` seconds so an authenticated request no longer
+reads the users table.
+
+Tokens carry the user's ``token_version`` and the ``jti`` of the refresh
+token that started the session. The user is loaded together with whether
+that refresh token is blacklisted, in one query, and a token whose
+version is behind the user's is rejected, so changing a role or password
+revokes every token issued before and logging out revokes every access
+token of the session. The cached user is keyed on the version and a
+logout also marks the session revoked in the cache; with the per-process
+LocMemCache neither would reach other workers, so there the user cache
+is off (see settings) and every request takes the database path.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from api.profiling import track_phase
+
+TOKEN_VERSION_CLAIM = 'ver'
+SESSION_CLAIM = 'sid'
+
+
+def user_cache_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+def revoked_cache_key(jti):
+    return f'auth:revoked:{jti}'
+
+
+def tokens_for_user(user):
+    """Refresh token (and, through it, access tokens) stamped with the user's version."""
+    refresh = RefreshToken.for_user(user)
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
+    # Copied into every access token minted from this refresh token
+    refresh[SESSION_CLAIM] = refresh[api_settings.JTI_CLAIM]
+    return refresh
+
+
+def invalidate_user(user):
+    """Drop cached copies of ``user`` once the current transaction commits."""
+    keys = [user_cache_key(user.pk, user.token_version)]
+    if user.token_version:
+        keys.append(user_cache_key(user.pk, user.token_version - 1))
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def revoke_access_token(token):
+    """Reject ``token`` and every other access token of its session."""
+    session = token.get(SESSION_CLAIM)
+    if session is None:
+        # Not issued by tokens_for_user; it lapses at its expiry
+        return
+    outstanding = OutstandingToken.objects.filter(jti=session).first()
+    if outstanding is not None:
+        BlacklistedToken.objects.get_or_create(token=outstanding)
+    remaining = datetime_from_epoch(token['exp']) - timezone.now()
+    seconds = int(remaining.total_seconds()) + 1
+    if seconds > 0:
+        # Cached users skip the database check, so they must see it too
+        transaction.on_commit(lambda: cache.set(revoked_cache_key(session), True, seconds))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        with track_phase('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        session = validated_token.get(SESSION_CLAIM)
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user_key = user_cache_key(user_id, version)
+        if timeout:
+            revoked_key = revoked_cache_key(session)
+            # One cache round trip for both the user and the revocation check
+            cached = cache.get_many([user_key, revoked_key])
+            if cached.get(revoked_key):
+                raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+            if user_key in cached:
+                return cached[user_key]
+
+        users = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+        if session is not None:
+            # Logout blacklists the session's refresh token; checked in the same query
+            users = users.annotate(revoked=Exists(BlacklistedToken.objects.filter(token__jti=session)))
+        user = users.first()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if getattr(user, 'revoked', False) or user.token_version != version:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        if timeout:
+            cache.set(user_key, user, timeout)
+        return user
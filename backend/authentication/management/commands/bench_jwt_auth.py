@@ -0,0 +1,79 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from authentication.jwt import CachedJWTAuthentication, tokens_for_user
+
+User = get_user_model()
+
+# Cleared before the run, so never the cache the app serves from
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-jwt-auth',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-request user resolution of JWTAuthentication and CachedJWTAuthentication, '
+        'as configured and with the user cache on, against a private cache. Users are only '
+        'cached with a shared cache backend (see AUTH_USER_CACHE_TIMEOUT); without one every '
+        'request checks revocation in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        configured = settings.AUTH_USER_CACHE_TIMEOUT
+
+        with override_settings(CACHES=BENCH_CACHES), transaction.atomic():
+            user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:8]}')
+            token = tokens_for_user(user).access_token
+            request = Request(RequestFactory().get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+            cache.clear()
+
+            results = [
+                ('JWTAuthentication', self._measure(JWTAuthentication(), request, count)),
+                (f'Cached (timeout {configured})', self._measure(CachedJWTAuthentication(), request, count)),
+            ]
+            if not configured:
+                with override_settings(AUTH_USER_CACHE_TIMEOUT=60):
+                    results.append(('Cached (timeout 60)', self._measure(CachedJWTAuthentication(), request, count)))
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{count} authenticated requests')
+        for label, (elapsed, queries) in results:
+            self.stdout.write(
+                f'{label:>24}: {elapsed:8.3f}s  {elapsed / count * 1e6:8.1f}us/req  '
+                f'{queries / count:5.2f} queries/req'
+            )
+        if configured:
+            saved = (results[0][1][1] - results[1][1][1]) / count
+            self.stdout.write(self.style.SUCCESS(f'queries saved per request: {saved:.2f}'))
+        else:
+            # The revocation check joins the blacklist in the one user query
+            self.stdout.write(self.style.WARNING(
+                'AUTH_USER_CACHE_TIMEOUT is 0 (no shared cache): as configured no query is saved and '
+                'each request also checks the token blacklist. Configure a shared cache to cache users.'
+            ))
+
+    def _measure(self, authenticator, request, count):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(count):
+                authenticator.authenticate(request)
+            elapsed = time.perf_counter() - start
+        return elapsed, len(queries)
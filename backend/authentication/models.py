@@ -9,10 +9,33 @@ class User(AbstractUser):
         ('admin', 'مدير'),
     ]
     
+    # Changing any of these bumps token_version, revoking issued tokens
+    SECURITY_FIELDS = ('role', 'password', 'is_active')
+    
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
     phone = models.CharField(max_length=20, blank=True, null=True)
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'users'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_security = user._security_values()
+        return user
+    
+    def _security_values(self):
+        return tuple(getattr(self, name, None) for name in self.SECURITY_FIELDS)
+    
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_security', None)
+        if loaded is not None and loaded != self._security_values():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_security = self._security_values()
@@ -0,0 +1,105 @@
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .jwt import tokens_for_user
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='secret-pass-123')
+        self.refresh = tokens_for_user(self.user)
+        self.authenticate(self.refresh)
+
+    def authenticate(self, refresh):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def shared_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory.name,
+            }},
+            AUTH_USER_CACHE_TIMEOUT=60,
+        )
+
+    def test_user_is_cached_between_requests(self):
+        with self.shared_cache():
+            self.client.get(reverse('profile'))
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('profile'))
+        self.assertEqual(response.data['username'], 'student')
+
+    def test_per_process_cache_is_not_trusted(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('profile'))
+        self.client.get(reverse('profile'))
+
+        # A role change saved by another worker never reaches this one's LocMemCache
+        User.objects.filter(pk=self.user.pk).update(token_version=1)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_profile_update_invalidates_cache(self):
+        self.client.get(reverse('profile'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse('profile'), {'first_name': 'Ahmed'}, format='json')
+
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.data['first_name'], 'Ahmed')
+
+    def test_role_change_revokes_tokens(self):
+        self.client.get(reverse('profile'))
+        user = User.objects.get(pk=self.user.pk)
+        user.role = 'teacher'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+        self.authenticate(tokens_for_user(user))
+        self.assertEqual(self.client.get(reverse('profile')).data['role'], 'teacher')
+
+    def test_logout_revokes_both_tokens(self):
+        response = self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_reaches_every_worker(self):
+        other = self.refresh.access_token
+        self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        # As seen by a worker whose cache never heard of the logout
+        cache.clear()
+
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {other}')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_logout_with_a_shared_cache(self):
+        with self.shared_cache():
+            self.client.get(reverse('profile'))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+            self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_benchmark_leaves_the_cache_alone(self):
+        with self.shared_cache(), override_settings(AUTH_USER_CACHE_TIMEOUT=0):
+            cache.set('kept', 1)
+            out = StringIO()
+            call_command('bench_jwt_auth', requests=5, stdout=out)
+            self.assertEqual(cache.get('kept'), 1)
+        self.assertIn('no query is saved', out.getvalue())
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
 
+from .jwt import revoke_access_token, tokens_for_user
 from .serializers import RegisterSerializer, CustomTokenObtainPairSerializer, UserSerializer
 
 User = get_user_model()
@@ -26,7 +27,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate tokens for the new user
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'success': True,
@@ -56,6 +57,8 @@ class LogoutView(APIView):
             refresh_token = request.data.get('refresh')
             token = RefreshToken(refresh_token)
             token.blacklist()
+            # The access token stays valid until it expires unless revoked too
+            revoke_access_token(request.auth)
             return Response({'message': 'تم تسجيل الخروج بنجاح'})
         except Exception:
             return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,14 @@
+"""
+ASGI config for quranreview project.
+
+Serves the aggregate endpoints with the async views in api/async_views.py.
+Run with an ASGI server, e.g. ``uvicorn quranreview.asgi:application``.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quranreview.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
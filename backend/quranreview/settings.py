@@ -2,6 +2,7 @@
 Django settings for quranreview project.
 """
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -27,6 +28,7 @@ INSTALLED_APPS = [
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     # Local
     'authentication',
@@ -34,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its total covers every other middleware
+    'api.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,12 +69,57 @@ TEMPLATES = [
 WSGI_APPLICATION = 'quranreview.wsgi.application'
 
 # Database
+# Stock SQLite unless SQLITE_PROFILE=production opts into the concurrency
+# profile from quranreview/sqlite3 (WAL, a busy timeout, BEGIN IMMEDIATE for
+# transactions that may write) for several workers sharing the file. Those
+# workers also need a shared CACHE_BACKEND; the system check warns otherwise.
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'data' / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'data' / 'db.sqlite3'),
+    }
+}
+
+if SQLITE_PROFILE == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'quranreview.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds sqlite3 waits for the write lock
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+                'mmap_size': 256 * 1024 * 1024,
+                'cache_size': -64000,
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+    # Reads in GET/HEAD/OPTIONS requests don't need the write lock
+    MIDDLEWARE.insert(1, 'quranreview.sqlite3.middleware.ReadOnlyRequestMiddleware')
+
+# Cache
+# Defaults to per-process memory; point CACHE_BACKEND at a shared backend
+# (e.g. file-based or Redis) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'quranreview'),
     }
 }
+# Seconds before a cache version counter expires (see api/caching.py); unset means never
+CACHE_VERSION_TIMEOUT = int(os.environ.get('CACHE_VERSION_TIMEOUT', 0)) or None
+if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+    # Class overviews read one version key per student; the default of 300 entries churns
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000))}
+    # Each worker keeps its own counters and never sees another worker's bump,
+    # so they lapse quickly to bound how long a worker serves stale data
+    CACHE_VERSION_TIMEOUT = CACHE_VERSION_TIMEOUT or 10
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -105,10 +154,31 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Request metrics: a shared mmap file all workers on a host write to, and the
+# bearer token a scraper sends to /api/metrics/ (otherwise staff only)
+METRICS_PATH = os.environ.get(
+    'METRICS_PATH', os.path.join(tempfile.gettempdir(), 'quranreview-metrics.bin')
+)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Uthmani text store, and the gzipped surah|ayah|text export it is built from
+# (by ``manage.py build_quran_text``, or on first use when the store is missing)
+QURAN_TEXT_PATH = os.environ.get('QURAN_TEXT_PATH', BASE_DIR / 'api' / 'data' / 'quran-uthmani.bin')
+QURAN_TEXT_SOURCE = os.environ.get('QURAN_TEXT_SOURCE', BASE_DIR / 'api' / 'data' / 'quran-uthmani.txt.gz')
+
+# Longest a worker keeps serving a leaderboard that writes have since moved
+LEADERBOARD_REFRESH_SECONDS = float(os.environ.get('LEADERBOARD_REFRESH_SECONDS', 10))
+
+# Route the aggregate endpoints to their async views (set by asgi.py)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Custom user model
+AUTH_USER_MODEL = 'authentication.User'
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -121,6 +191,14 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Seconds an authenticated user stays cached between requests. A cached user
+# skips the database revocation check, so this is off unless the cache is shared.
+# Off, CachedJWTAuthentication saves no query: each request loads the user with
+# an EXISTS join on the token blacklist (see ``manage.py bench_jwt_auth``)
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+    AUTH_USER_CACHE_TIMEOUT = 0
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost",
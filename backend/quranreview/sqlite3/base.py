@@ -0,0 +1,49 @@
+"""
+SQLite backend tuned for several application workers sharing one file.
+
+- Every new connection applies the ``PRAGMAS`` option (WAL, a busy
+  timeout, synchronous=NORMAL, mmap and page cache sizes), so readers
+  never block the writer and a blocked writer waits instead of failing.
+- Transactions that may write open with ``BEGIN IMMEDIATE`` instead of a
+  deferred ``BEGIN``. A deferred transaction that reads first and then
+  writes must upgrade its lock, and if another writer got there first
+  SQLite fails with "database is locked" straight away, without honouring
+  the busy timeout. Taking the write lock up front serializes writers in
+  a queue.
+- Transactions opened inside ``read_only_transactions()`` keep the
+  deferred ``BEGIN``: they never write, and in WAL mode they then run
+  alongside the writer instead of queueing behind it.
+  ``ReadOnlyRequestMiddleware`` applies it to GET, HEAD and OPTIONS
+  requests.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.sqlite3 import base
+
+_read_only = ContextVar('sqlite_read_only', default=False)
+
+
+@contextmanager
+def read_only_transactions():
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = kwargs.pop('pragmas', {})
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN' if _read_only.get() else 'BEGIN IMMEDIATE')
@@ -965,6 +965,22 @@ const QuranReview = {
         this.showNotification('تم تسجيل الخروج بنجاح', 'info');
     },
 
+    // Every row of a cursor-paginated list ({next, previous, results}), following next.
+    // items is null when a page fails; response is the last one fetched
+    async fetchAllPages(url, options) {
+        const items = [];
+        let response;
+        while (url) {
+            response = await fetch(url, options);
+            if (!response.ok) return { response, items: null };
+            const data = await response.json();
+            if (Array.isArray(data)) return { response, items: data };
+            items.push(...(data.results || []));
+            url = data.next;
+        }
+        return { response, items };
+    },
+
     async loadTasksFromApi() {
         if (!this.config.apiBaseUrl) return;
 
@@ -977,7 +993,7 @@ const QuranReview = {
                 return;
             }
             const headers = { Authorization: `Bearer ${token}` };
-            const response = await fetch(`${this.config.apiBaseUrl}/api/tasks/`, { headers });
+            const { response, items } = await this.fetchAllPages(`${this.config.apiBaseUrl}/api/tasks/?page_size=500`, { headers });
 
             Logger.log('API', `Fetch Tasks Response: ${response.status}`);
 
@@ -992,7 +1008,7 @@ const QuranReview = {
                 throw new Error(`API error: ${response.status} ${response.statusText}`);
             }
 
-            const data = await response.json();
+            const data = items;
             Logger.log('API', `Loaded ${Array.isArray(data) ? data.length : 0} tasks`, data);
 
             if (Array.isArray(data)) {
@@ -1482,10 +1498,8 @@ const QuranReview = {
             container.innerHTML = `<div style="text-align:center;">⏳ جاري تحميل الآيات...</div>`;
 
             // Fetch all texts
-            const texts = [];
-            for (let i = startAyah; i <= endAyah; i++) {
-                texts.push(await QuranReview.fetchAyahText(surahId, i));
-            }
+            const texts = await QuranReview.fetchAyahTexts(surahId, startAyah, endAyah)
+                || Array(endAyah - startAyah + 1).fill(null);
 
             let timeLeft = 300; // 5 minutes
             let timerInterval;
@@ -2995,11 +3009,20 @@ const QuranReview = {
     },
 
     async fetchAyahText(surahId, ayahNumber) {
+        const texts = await this.fetchAyahTexts(surahId, ayahNumber, ayahNumber);
+        return texts ? texts[0] : null;
+    },
+
+    // Texts of ayahs startAyah..endAyah in one request to the backend's local Uthmani store
+    async fetchAyahTexts(surahId, startAyah, endAyah) {
         try {
-            const response = await fetch(`https://api.quran.com/api/v4/verses/by_key/${surahId}:${ayahNumber}?fields=text_uthmani`);
+            const ranges = encodeURIComponent(`${surahId}:${startAyah}-${endAyah}`);
+            const response = await fetch(`${this.config.apiBaseUrl}/api/quran/text/?ranges=${ranges}`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
             const data = await response.json();
-            if (data.verse && data.verse.text_uthmani) {
-                return data.verse.text_uthmani;
+            const range = data.ranges && data.ranges[0];
+            if (range && range.ayahs.length) {
+                return range.ayahs.map(ayah => ayah.text);
             }
             throw new Error('Verse text not found');
         } catch (error) {
@@ -3911,13 +3934,13 @@ const QuranReview = {
         }
 
         try {
-            const [tasksRes, subsRes, pointsRes] = await Promise.all([
-                fetch(`${this.config.apiBaseUrl}/api/tasks/`, { headers }),
+            const [tasksPages, subsRes, pointsRes] = await Promise.all([
+                this.fetchAllPages(`${this.config.apiBaseUrl}/api/tasks/?page_size=500`, { headers }),
                 fetch(`${this.config.apiBaseUrl}/api/my-submissions/`, { headers }),
                 fetch(`${this.config.apiBaseUrl}/api/points/`, { headers }),
             ]);
 
-            const tasks = tasksRes.ok ? await tasksRes.json() : [];
+            const tasks = tasksPages.items || [];
             const submissions = subsRes.ok ? await subsRes.json() : [];
             const pointsData = pointsRes.ok ? await pointsRes.json() : { total_points: 0, logs: [] };
 
@@ -4074,15 +4097,15 @@ const QuranReview = {
         this.showLoading();
 
         try {
-            const [studentsRes, pendingRes, tasksRes] = await Promise.all([
+            const [studentsRes, pendingRes, tasksPages] = await Promise.all([
                 fetch(`${this.config.apiBaseUrl}/api/my-students/`, { headers }),
                 fetch(`${this.config.apiBaseUrl}/api/pending-submissions/`, { headers }),
-                fetch(`${this.config.apiBaseUrl}/api/tasks/`, { headers }),
+                this.fetchAllPages(`${this.config.apiBaseUrl}/api/tasks/?page_size=500`, { headers }),
             ]);
 
             const students = studentsRes.ok ? await studentsRes.json() : [];
             const pending = pendingRes.ok ? await pendingRes.json() : [];
-            const tasks = tasksRes.ok ? await tasksRes.json() : [];
+            const tasks = tasksPages.items || [];
 
             // Store for later use
             this._teacherStudents = students;